@@ -0,0 +1,68 @@
+"""Benchmark DelugeString.toDate for each supported date format.
+
+Parses ``--dates`` strings of one format at a time, as a batch job over a
+column of dates does, and compares the current parser with the previous
+toDate, which tried ``datetime.strptime`` with every format in order:
+
+- previous: strptime per format, catching a ValueError for each miss
+- parse_date: hand-written matchers and ``datetime.fromisoformat``,
+  trying the format that succeeded last first
+
+Usage:
+    uv run python benchmarks/bench_dates.py [--dates N] [--repeat N]
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from deluge_compat.dates import DATE_FORMATS, parse_date
+
+
+def previous_to_date(text: str) -> datetime:
+    """The previous toDate: every format in turn via strptime."""
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Unable to parse date: {text}")
+
+
+def best_of(repeat: int, function: Callable[[], object]) -> float:
+    """Return the best wall time in seconds over repeat calls."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def parse_all(parse: Callable[[str], datetime], texts: list[str]) -> None:
+    for text in texts:
+        parse(text)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dates", type=int, default=20_000, help="dates per format")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement")
+    args = parser.parse_args()
+
+    start = datetime(2020, 1, 1, 8, 30, 15)
+    moments = [start + timedelta(hours=7 * n, seconds=n) for n in range(args.dates)]
+
+    print(f"{args.dates:,} dates per format, best of {args.repeat}")
+    print(f"{'format':<22}{'previous':>12}{'parse_date':>12}{'speedup':>10}")
+    for fmt in DATE_FORMATS:
+        texts = [moment.strftime(fmt) for moment in moments]
+        assert all(parse_date(text) == previous_to_date(text) for text in texts[:100])
+        before = best_of(args.repeat, lambda texts=texts: parse_all(previous_to_date, texts))
+        after = best_of(args.repeat, lambda texts=texts: parse_all(parse_date, texts))
+        print(f"{fmt:<22}{before * 1000:>10.1f}ms{after * 1000:>10.1f}ms{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
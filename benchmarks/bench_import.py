@@ -0,0 +1,74 @@
+"""Benchmark the import time of the core runtime.
+
+Runs ``python -X importtime`` in fresh interpreters, reports the cumulative
+import time of ``deluge_compat`` (including creating a DelugeRuntime) and
+fails if it exceeds the budget or if optional heavy dependencies are loaded
+on the core path.
+
+Usage:
+    uv run python benchmarks/bench_import.py [--repeat N] [--budget-ms MS]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+# Modules only deluge-chat, the CLIs or HTTP builtins need
+HEAVY_MODULES = ["faker", "requests", "urllib3", "typer", "rich"]
+
+PROBE = f"""
+import json, sys
+import deluge_compat
+deluge_compat.DelugeRuntime()
+print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))
+"""
+
+
+def measure_once() -> tuple[float, list[str]]:
+    """Return the import time in ms and the heavy modules that got loaded."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative_us = 0
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == "deluge_compat":
+            cumulative_us = int(parts[1])
+    return cumulative_us / 1000, json.loads(result.stdout)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters to start")
+    parser.add_argument(
+        "--budget-ms", type=float, default=100.0, help="fail above this import time"
+    )
+    args = parser.parse_args()
+
+    timings = []
+    loaded: list[str] = []
+    for _ in range(args.repeat):
+        elapsed, loaded = measure_once()
+        timings.append(elapsed)
+
+    best = min(timings)
+    print(f"import deluge_compat: best {best:.1f} ms, worst {max(timings):.1f} ms")
+    print(f"heavy modules loaded: {', '.join(loaded) or 'none'}")
+
+    failed = False
+    if loaded:
+        print(f"FAIL: core import path loads {', '.join(loaded)}")
+        failed = True
+    if best > args.budget_ms:
+        print(f"FAIL: {best:.1f} ms exceeds the {args.budget_ms:.0f} ms budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
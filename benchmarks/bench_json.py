@@ -0,0 +1,169 @@
+"""Benchmark JSON decoding into Deluge types.
+
+Builds a CRM-style API response (a ``data`` array of nested records) and
+compares DelugeString.toMap with the previous two-pass approach, which
+parsed into plain dicts and lists and then converted the whole tree, and
+with toMap(lazy=True) reading the few fields a typical script touches.
+Iterating a JSON array file with toJSONList is then compared with
+JSONListStream, which converts one record at a time. Finally, Map + string
+concatenation, which reuses the cached JSON text of an unchanged Map, is
+compared with serializing a copy every time:
+
+- time: best wall time over ``--repeat`` runs
+- peak: peak traced memory while decoding, measured with tracemalloc
+
+Usage:
+    uv run python benchmarks/bench_json.py [--records N] [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from deluge_compat.json_stream import JSONListStream
+from deluge_compat.types import DelugeString, List, Map, _convert_json_to_deluge_types
+
+HEADERS = Map(
+    {
+        "Authorization": "Zoho-oauthtoken 1000.0b1c2d3e4f5a6b7c8d9e0f",
+        "Content-Type": "application/json",
+        "X-Org-Id": "651234987",
+        "scopes": List(["ZohoCRM.modules.ALL", "ZohoCRM.settings.READ"]),
+    }
+)
+
+
+def generate_records(records: int) -> list[dict]:
+    """Build CRM records with nested maps, lists and strings."""
+    return [
+        {
+            "id": str(4_150_868_000_000_000 + n),
+            "Full_Name": f"Contact {n}",
+            "Email": f"contact{n}@example.com",
+            "Owner": {"id": "4150868000000225013", "name": "Sales Owner", "email": "o@x.com"},
+            "Tag": [{"name": "vip", "id": "1"}, {"name": "newsletter", "id": "2"}],
+            "Mailing_Address": {
+                "Street": f"{n} Main Street",
+                "City": "Springfield",
+                "Zip": "12345",
+                "Coordinates": [38.5 + n / 1e6, -89.9],
+            },
+            "Score": n % 100,
+            "Active": n % 3 != 0,
+            "Description": None,
+        }
+        for n in range(records)
+    ]
+
+
+def generate_document(records: int) -> str:
+    """Build a JSON response with a ``data`` array of records."""
+    data = generate_records(records)
+    info = {"per_page": records, "count": records, "page": 1, "more_records": False}
+    return json.dumps({"data": data, "info": info})
+
+
+def two_pass(text: str) -> object:
+    """The previous toMap: json.loads, then convert every node."""
+    return _convert_json_to_deluge_types(json.loads(text))
+
+
+def read_fields(response) -> object:
+    """Touch three fields, as a script handling the response would."""
+    first = response.get("data").get(0)
+    return first.get("Email"), first.get("Owner").get("name"), response.get("info").get("count")
+
+
+def sum_scores(records) -> int:
+    """A ``for each`` loop reading one field of every record."""
+    total = 0
+    for record in records:
+        total += record.get("Score")
+    return total
+
+
+def concatenate(value: Map, rounds: int, copy: bool) -> None:
+    """Build request bodies from the same Map, as a script loop does."""
+    for n in range(rounds):
+        if copy:
+            json.dumps(dict(value)) + str(n)
+        else:
+            value + str(n)
+
+
+def read_file(path: str) -> DelugeString:
+    with open(path, encoding="utf-8") as f:
+        return DelugeString(f.read())
+
+
+def best_time(repeat: int, function: Callable[[], object]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(function: Callable[[], object]) -> int:
+    tracemalloc.start()
+    try:
+        result = function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=10_000, help="records in the document")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement")
+    args = parser.parse_args()
+
+    text = DelugeString(generate_document(args.records))
+    print(f"{args.records:,} records, {len(text) / 1e6:.1f} MB of JSON, best of {args.repeat}")
+    print(f"{'':<28}{'time':>10}{'peak':>12}")
+    for name, function in [
+        ("json.loads + convert", lambda: two_pass(text)),
+        ("toMap (decoder hooks)", text.toMap),
+        ("toMap + read 3 fields", lambda: read_fields(text.toMap())),
+        ("toMap(lazy) + read 3 fields", lambda: read_fields(text.toMap(lazy=True))),
+    ]:
+        elapsed = best_time(args.repeat, function)
+        peak = peak_memory(function)
+        print(f"{name:<28}{elapsed * 1000:>8.1f}ms{peak / 1e6:>10.1f}MB")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "records.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(generate_records(args.records), f)
+        print()
+        print(f"for each over a {os.path.getsize(path) / 1e6:.1f} MB array file")
+        for name, function in [
+            ("read + toJSONList", lambda: sum_scores(read_file(path).toJSONList())),
+            ("JSONListStream.from_file", lambda: sum_scores(JSONListStream.from_file(path))),
+        ]:
+            elapsed = best_time(args.repeat, function)
+            peak = peak_memory(function)
+            print(f"{name:<28}{elapsed * 1000:>8.1f}ms{peak / 1e6:>10.1f}MB")
+
+    response = text.toMap()
+    for label, value, rounds in [("header Map", HEADERS, 100_000), ("response Map", response, 20)]:
+        print()
+        print(f"{label} + string, {rounds:,} times")
+        for name, copy in [("json.dumps(dict(map))", True), ("cached", False)]:
+            elapsed = best_time(
+                args.repeat,
+                lambda value=value, rounds=rounds, copy=copy: concatenate(value, rounds, copy),
+            )
+            print(f"{name:<28}{elapsed * 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
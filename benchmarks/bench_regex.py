@@ -0,0 +1,101 @@
+"""Benchmark the regex string functions on a per-record validation loop.
+
+Validates and normalizes ``--records`` contact records against a few
+patterns, as a script looping over CRM records does:
+
+- previous: ``re.search`` with the raw pattern and a literal ``str.replace``
+- uncached: translating the Java pattern and compiling it on every call
+- cached: DelugeString.matches / replaceAll with the shared RegexCache
+- script: the same loop inside a Deluge script run by DelugeRuntime
+
+Usage:
+    uv run python benchmarks/bench_regex.py [--records N] [--repeat N]
+"""
+
+import argparse
+import re
+import time
+from collections.abc import Callable
+
+from deluge_compat.regex import default_regex_cache, java_replacement, java_to_python_regex
+from deluge_compat.runtime import DelugeRuntime
+from deluge_compat.types import List, Map, deluge_string
+
+EMAIL = "[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\\.[A-Za-z]{2,}"
+PHONE = "\\+?[0-9 ()-]{7,}"
+NON_DIGITS = "[^0-9]"
+
+SCRIPT = """
+valid = 0;
+for each record in records {
+    if(record.get("email").matches("[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\\\\.[A-Za-z]{2,}")) {
+        if(record.get("phone").matches("\\\\+?[0-9 ()-]{7,}")) {
+            digits = record.get("phone").replaceAll("[^0-9]", "");
+            valid = valid + digits.length();
+        }
+    }
+}
+return valid;
+"""
+
+
+def best_of(repeat: int, function: Callable[[], object]) -> float:
+    """Return the best wall time in seconds over repeat calls."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def previous(records: list) -> None:
+    for record in records:
+        if re.search(EMAIL, record.get("email")) and re.search(PHONE, record.get("phone")):
+            record.get("phone").replace(NON_DIGITS, "")
+
+
+def uncached(records: list) -> None:
+    def compile_each_time(pattern: str) -> re.Pattern[str]:
+        return re.compile(java_to_python_regex(pattern), re.ASCII)
+
+    for record in records:
+        email, phone = record.get("email"), record.get("phone")
+        if compile_each_time(EMAIL).fullmatch(email) and compile_each_time(PHONE).fullmatch(phone):
+            compile_each_time(NON_DIGITS).sub(java_replacement(""), phone)
+
+
+def cached(records: list) -> None:
+    for record in records:
+        phone = record.get("phone")
+        if record.get("email").matches(EMAIL) and phone.matches(PHONE):
+            phone.replaceAll(NON_DIGITS, "")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=20_000, help="records to validate")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement")
+    args = parser.parse_args()
+
+    records = List(
+        Map({"email": f"contact{n}@example.com", "phone": f"+1 (555) {n:07d}"})
+        for n in range(args.records)
+    )
+    script = DelugeRuntime(disk_cache=False).compile(SCRIPT)
+    assert deluge_string("x@example.com").matches(EMAIL)
+
+    default_regex_cache.clear()
+    print(f"{args.records:,} records, best of {args.repeat}")
+    for name, function in [
+        ("previous", lambda: previous(records)),
+        ("uncached", lambda: uncached(records)),
+        ("cached", lambda: cached(records)),
+        ("script", lambda: script.run(records=records)),
+    ]:
+        print(f"{name:<12}{best_of(args.repeat, function) * 1000:>10.1f}ms")
+    print(f"regex cache: {default_regex_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Benchmark the memory-bounded multi-tenant script registry.
+
+Registers thousands of distinct tenant scripts and replays a skewed
+(Zipf-like) stream of lookups, as a host serving many customers' Zobots
+sees: a few hot scripts and a long tail of rarely used ones. For several
+memory budgets it reports resident bytes, hit rate and throughput, with
+evicted scripts either recompiled from source or loaded back from the
+on-disk cache.
+
+Usage:
+    uv run python benchmarks/bench_registry.py [--tenants N] [--lookups N] [--repeat N]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from deluge_compat.cache import DiskCodeCache
+from deluge_compat.registry import TenantScriptRegistry
+
+TEMPLATE = """
+response = Map();
+text = message.get("text");
+if(text.contains("{keyword}")) {{
+    response.put("action", "forward");
+    response.put("department", "{department}");
+}} else {{
+    replies = List();
+    replies.add("Thanks for contacting tenant {n}, " + visitor.get("name"));
+    response.put("action", "reply");
+    response.put("replies", replies);
+}}
+return response;
+"""
+
+
+def tenant_source(n: int) -> str:
+    return TEMPLATE.format(n=n, keyword=f"agent{n % 17}", department=f"support-{n % 5}")
+
+
+def best_of(repeat: int, *functions: Callable[[], object]) -> list[float]:
+    """Return each function's best wall time in seconds over repeat calls.
+
+    The functions are timed in turn within each repeat, so both sides of a
+    comparison see the same machine noise.
+    """
+    best = [float("inf")] * len(functions)
+    for _ in range(repeat):
+        for index, function in enumerate(functions):
+            start = time.perf_counter()
+            function()
+            best[index] = min(best[index], time.perf_counter() - start)
+    return best
+
+
+def replay(registry: TenantScriptRegistry, stream: list[int]) -> float:
+    """Look up every script in the stream and return the elapsed seconds."""
+    start = time.perf_counter()
+    for n in stream:
+        registry.get(str(n), "1")
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tenants", type=int, default=3_000, help="distinct scripts")
+    parser.add_argument("--lookups", type=int, default=50_000, help="lookups replayed")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs (best is reported)")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    weights = [1 / (rank + 1) for rank in range(args.tenants)]
+    stream = rng.choices(range(args.tenants), weights, k=args.lookups)
+
+    full = TenantScriptRegistry(max_bytes=2**62)
+    for n in range(args.tenants):
+        full.add(str(n), "1", tenant_source(n))
+    total = full.stats()["resident_bytes"]
+    print(f"{args.tenants:,} scripts, {total / 2**20:.1f} MiB when all resident")
+    print(f"{args.lookups:,} Zipf-distributed lookups")
+    print()
+    print(f"{'budget':<10}{'evicted to':<12}{'resident':>10}{'hit rate':>10}{'lookups/s':>12}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for fraction in (1.0, 0.25, 0.1):
+            for spill in (False, True) if fraction < 1 else (False,):
+                disk_cache = DiskCodeCache(Path(tmp) / f"{fraction}") if spill else None
+                registry = TenantScriptRegistry(
+                    max_bytes=int(total * fraction), disk_cache=disk_cache
+                )
+                for n in range(args.tenants):
+                    registry.add(str(n), "1", tenant_source(n))
+                replay(registry, stream)  # warm up and settle the resident set
+                before = registry.stats()
+                elapsed = replay(registry, stream)
+                after = registry.stats()
+                hits = after["hits"] - before["hits"]
+                where = "-" if fraction == 1 else "disk" if spill else "recompile"
+                print(
+                    f"{fraction:<10.0%}{where:<12}"
+                    f"{after['resident_bytes'] / 2**20:>7.1f}MiB"
+                    f"{hits / args.lookups:>10.1%}"
+                    f"{args.lookups / elapsed:>12,.0f}"
+                )
+
+        # Cost of bringing back one evicted script
+        disk_cache = DiskCodeCache(Path(tmp) / "miss")
+        spilling = TenantScriptRegistry(max_bytes=0, disk_cache=disk_cache)
+        compiling = TenantScriptRegistry(max_bytes=0)
+        misses = 200
+        for registry in (spilling, compiling):
+            for n in range(misses):
+                registry.add(str(n), "1", tenant_source(n))
+            registry.add("last", "1", tenant_source(misses))
+
+        def miss_all(registry: TenantScriptRegistry) -> Callable[[], None]:
+            return lambda: [registry.get(str(n), "1") for n in range(misses)]
+
+        from_disk, recompiled = (
+            t / misses for t in best_of(args.repeat, miss_all(spilling), miss_all(compiling))
+        )
+        print()
+        print(f"miss loaded from disk: {from_disk * 1e6:8.1f}µs")
+        print(f"miss recompiled:       {recompiled * 1e6:8.1f}µs  ({recompiled / from_disk:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark per-run overhead of tiny scripts.
+
+Runs small compiled scripts, where building the globals for each run is a
+large share of the total, and compares the current layered globals with
+the previous approach of copying the whole runtime context per run:
+
+- previous: copy the builtin functions, constants and runtime variables,
+  then apply the run's variables
+- layered: shared builtins installed as ``__builtins__``, the runtime's own
+  variables as globals, and a small dict only when a run has variables
+
+Usage:
+    uv run python benchmarks/bench_runtime.py [--runs N] [--repeat N]
+"""
+
+import argparse
+import builtins
+import time
+from collections.abc import Callable
+from types import FunctionType
+
+from deluge_compat import DelugeRuntime
+from deluge_compat.functions import BUILTIN_FUNCTIONS
+from deluge_compat.runtime import SCRIPT_BUILTINS, CompiledScript
+from deluge_compat.types import Map, deluge_string
+
+SCRIPTS = {
+    "constant": ("return 1;", {}),
+    "one variable": ("return n + 1;", {"n": 1}),
+    "routing": (
+        """
+        reply = Map();
+        if(message.contains("help")) {
+            reply.put("action", "forward");
+        } else {
+            reply.put("action", "reply");
+        }
+        return reply;
+        """,
+        {"message": deluge_string("I need help"), "visitor": Map({"name": "Ada"})},
+    ),
+}
+
+CONSTANTS = ("NULL", "null", "true", "false", "True", "False", "deluge_string", "_invokeurl")
+
+
+def previous_globals(runtime: DelugeRuntime) -> dict:
+    """The previous runtime context: builtin functions copied into one dict."""
+    context = BUILTIN_FUNCTIONS.copy()
+    context.update({name: SCRIPT_BUILTINS[name] for name in CONSTANTS})
+    context.update(runtime.context.maps[0])
+    context["__builtins__"] = builtins
+    return context
+
+
+def previous_run(script: CompiledScript, context: dict, **variables: object) -> object:
+    """The previous CompiledScript.run: copy the context for every run."""
+    script_globals = context.copy()
+    if variables:
+        script_globals.update(variables)
+    return FunctionType(script._function_code, script_globals)()
+
+
+def best_of(repeat: int, *functions: Callable[[], object]) -> list[float]:
+    """Return each function's best wall time in seconds over repeat calls.
+
+    The functions are timed in turn within each repeat, so both sides of a
+    comparison see the same machine noise.
+    """
+    best = [float("inf")] * len(functions)
+    for _ in range(repeat):
+        for index, function in enumerate(functions):
+            start = time.perf_counter()
+            function()
+            best[index] = min(best[index], time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=50_000, help="runs per measurement")
+    parser.add_argument("--repeat", type=int, default=9, help="timed runs (best is reported)")
+    args = parser.parse_args()
+
+    runtime = DelugeRuntime(disk_cache=False)
+    context = previous_globals(runtime)
+    runs = range(args.runs)
+
+    print(f"{args.runs:,} runs per script, best of {args.repeat}")
+    print(f"{'script':<14}{'previous':>12}{'layered':>12}{'speedup':>10}")
+    for name, (source, variables) in SCRIPTS.items():
+        script = runtime.compile(source)
+        assert previous_run(script, context, **variables) == script.run(**variables)
+
+        def run_previous(script=script, variables=variables):
+            for _ in runs:
+                previous_run(script, context, **variables)
+
+        def run_layered(script=script, variables=variables):
+            for _ in runs:
+                script.run(**variables)
+
+        before, after = (t / args.runs for t in best_of(args.repeat, run_previous, run_layered))
+        print(f"{name:<14}{before * 1e6:>10.2f}µs{after * 1e6:>10.2f}µs{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
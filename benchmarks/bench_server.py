@@ -0,0 +1,96 @@
+"""Benchmark deluge-serve webhook throughput on localhost.
+
+Starts a ScriptServer with a small Zobot routing script and posts
+``--requests`` webhook payloads from ``--clients`` threads, comparing:
+
+- new connection: a fresh TCP connection for every request
+- keep-alive: each client reuses one connection for all its requests
+
+Usage:
+    uv run python benchmarks/bench_server.py [--requests N] [--clients N] [--workers N]
+"""
+
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlparse
+
+from deluge_compat import DelugeRuntime
+from deluge_compat.server import ScriptServer
+
+SCRIPT = """
+response = Map();
+text = message.get("text");
+if(text.contains("agent")) {
+    response.put("action", "forward");
+} else {
+    response.put("action", "reply");
+    replies = List();
+    replies.add("Hi " + visitor.getJSON("name") + ", how can I help?");
+    response.put("replies", replies);
+}
+return response;
+"""
+
+PAYLOAD = json.dumps(
+    {
+        "handler": "message",
+        "visitor": {"name": "Ada", "email": "ada@example.com"},
+        "message": {"text": "hello"},
+    }
+).encode("utf-8")
+
+
+def client(url: str, requests: int, keep_alive: bool) -> None:
+    """Post requests webhooks, on one connection or a new one each time."""
+    address = urlparse(url)
+    connection = None
+    for _ in range(requests):
+        if connection is None:
+            connection = http.client.HTTPConnection(address.hostname, address.port)
+        connection.request("POST", "/bot", PAYLOAD, {"Content-Type": "application/json"})
+        response = connection.getresponse()
+        response.read()
+        assert response.status == 200, response.status
+        if not keep_alive:
+            connection.close()
+            connection = None
+    if connection is not None:
+        connection.close()
+
+
+def measure(url: str, requests: int, clients: int, keep_alive: bool) -> float:
+    """Return requests per second with clients posting concurrently."""
+    per_client = requests // clients
+    threads = [
+        threading.Thread(target=client, args=(url, per_client, keep_alive)) for _ in range(clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return per_client * clients / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=4000, help="requests per measurement")
+    parser.add_argument("--clients", type=int, default=8, help="concurrent client threads")
+    parser.add_argument("--workers", type=int, default=16, help="server worker threads")
+    args = parser.parse_args()
+
+    scripts = {"bot": DelugeRuntime(disk_cache=False).compile(SCRIPT)}
+    with ScriptServer(scripts, port=0, workers=args.workers) as server:
+        # Warm up the connection pool and the script
+        measure(server.url, args.clients * 10, args.clients, True)
+        print(f"{args.requests:,} requests from {args.clients} clients, {args.workers} workers")
+        for name, keep_alive in [("new connection", False), ("keep-alive", True)]:
+            rate = measure(server.url, args.requests, args.clients, keep_alive)
+            print(f"{name:<16}{rate:>10,.0f} requests/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Benchmark Deluge-to-Python translation throughput.
+
+Generates large synthetic scripts and reports how many source lines per
+second DelugeTranslator.translate processes for each workload:
+
+- handlers: short statements and control flow, typical of Zobot routing
+- messages: long reply strings, HTML bodies and commented-out code
+
+Usage:
+    uv run python benchmarks/bench_translator.py [--blocks N] [--repeat N]
+"""
+
+import argparse
+import time
+
+from deluge_compat.translator import DelugeTranslator
+
+HANDLER_BLOCK = """
+// Block {n}: typical Zobot handler logic
+response_{n} = Map();
+msg_{n} = message.get("text");
+name_{n} = "Visitor {n}"; // inline comment with a "quote"
+if(msg_{n} != null && msg_{n}.contains("help") || msg_{n} == "support") {{
+    response_{n}.put("action", "reply");
+    replies_{n} = List();
+    replies_{n}.add("How can I help, " + name_{n} + "?");
+    response_{n}.put("replies", replies_{n});
+}} else if(size_{n} > 100) {{
+    response_{n}.put("action", "forward");
+}} else {{
+    response_{n}.put("action", "end");
+}}
+for each item in replies_{n} {{
+    info item;
+}}
+total_{n} = 0;
+total_{n} += {n};
+"""
+
+MESSAGE_BLOCK = """
+// Block {n}: canned replies for the support flow. Keep the wording in sync
+// with the help centre article and the agent macros.
+/* Reviewed by the support team lead before every release of the bot. */
+greeting_{n} = "Hi there! Thanks for reaching out to the support team. We usually reply within a few minutes during business hours.";
+hours_{n} = "Our agents are available Monday to Friday, 9am to 6pm (GMT), and on Saturdays from 10am to 2pm for urgent requests.";
+// replies_{n}.add("Legacy greeting that we no longer send to visitors, kept here for reference only.");
+body_{n} = "<div><p>Hello,</p><p>A visitor asked for help with order {n}. Please follow up from the CRM record.</p></div>";
+replies_{n} = List();
+replies_{n}.add(greeting_{n});
+replies_{n}.add(hours_{n});
+"""
+
+WORKLOADS = {"handlers": HANDLER_BLOCK, "messages": MESSAGE_BLOCK}
+
+
+def generate_script(blocks: int, block: str = HANDLER_BLOCK) -> str:
+    """Build a script made of repeated blocks."""
+    return "".join(block.format(n=n) for n in range(blocks))
+
+
+def measure(script: str, repeat: int) -> float:
+    """Return the best translation time in seconds over repeat runs."""
+    translator = DelugeTranslator()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        translator.translate(script)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--blocks", type=int, default=2000, help="blocks per script")
+    parser.add_argument("--repeat", type=int, default=10, help="timed runs (best is reported)")
+    args = parser.parse_args()
+
+    print(f"{'workload':<10} {'lines':>8} {'best ms':>9} {'lines/sec':>12}")
+    for name, block in WORKLOADS.items():
+        script = generate_script(args.blocks, block)
+        line_count = script.count("\n")
+        best = measure(script, args.repeat)
+        print(f"{name:<10} {line_count:>8} {best * 1000:>9.1f} {line_count / best:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
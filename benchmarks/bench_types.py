@@ -0,0 +1,228 @@
+"""Benchmark the Deluge collection types.
+
+Compares the current List and Map, which wrap strings once when they are
+stored, with the previous designs that wrapped them on every read.
+
+List (``--size`` plain strings):
+
+- iterate: ``for each`` over the list, several passes
+- script: the same loop inside a Deluge script run by DelugeRuntime
+- build: constructing the list and adding elements one by one
+
+Map (``--reads`` lookups on a small record):
+
+- get: repeated ``get`` calls on string values
+- script: a Deluge loop branching on the same keys over and over
+- build: ``put`` of every field
+
+Set operations (``--contacts`` email addresses, half overlapping), compared
+with the previous linear scans:
+
+- removeAll, intersect, distinct
+
+Usage:
+    uv run python benchmarks/bench_types.py [--size N] [--reads N] [--contacts N] [--repeat N]
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+
+from deluge_compat.runtime import DelugeRuntime
+from deluge_compat.types import DelugeString, List, Map
+
+
+class GeneratorList(list):
+    """The previous List iteration: a generator wrapping every string."""
+
+    def add(self, element):
+        self.append(element)
+
+    def __iter__(self):
+        for item in super().__iter__():
+            if isinstance(item, str) and not isinstance(item, DelugeString):
+                yield DelugeString(item)
+            else:
+                yield item
+
+
+class WrapOnReadMap(dict):
+    """The previous Map.get: wrap plain strings on every read."""
+
+    def put(self, key, value):
+        self[key] = value
+
+    def get(self, key, default=None):
+        value = super().get(key, default)
+        if isinstance(value, str) and not isinstance(value, DelugeString):
+            return DelugeString(value)
+        return value
+
+
+def scan_remove_all(items: list, remove_list: list) -> None:
+    """The previous List.removeAll: repeated scans and shifts."""
+    for item in remove_list:
+        while item in items:
+            items.remove(item)
+
+
+def scan_intersect(items: list, other_list: list) -> list:
+    """The previous List.intersect: a linear scan per element."""
+    return [item for item in items if item in other_list]
+
+
+RECORD = {
+    "status": "open",
+    "channel": "whatsapp",
+    "language": "en",
+    "department": "sales",
+    "name": "Ada Lovelace",
+    "email": "ada@example.com",
+    "visits": 12,
+}
+
+MAP_SCRIPT = """
+matches = 0;
+for each n in rounds {
+    if(visitor.get("status") == "open" && visitor.get("channel") == "whatsapp") {
+        if(visitor.get("language") == "en" || visitor.get("department") == "support") {
+            matches = matches + visitor.get("name").length();
+        }
+    }
+}
+return matches;
+"""
+
+LOOP_SCRIPT = """
+total = 0;
+for each item in items {
+    total = total + item.length();
+}
+return total;
+"""
+
+
+def best_of(repeat: int, function: Callable[[], object]) -> float:
+    """Return the best wall time in seconds over repeat calls."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def iterate(items: list, passes: int = 5) -> None:
+    for _ in range(passes):
+        for item in items:
+            item.length()
+
+
+def build(list_type: type, values: list[str]) -> None:
+    items = list_type()
+    for value in values:
+        items.add(value)
+
+
+def read_fields(record: dict, reads: int) -> None:
+    get = record.get
+    for _ in range(reads // 4):
+        get("status")
+        get("channel")
+        get("name")
+        get("visits")
+
+
+def build_record(map_type: type) -> None:
+    for _ in range(1000):
+        record = map_type()
+        for key, value in RECORD.items():
+            record.put(key, value)
+
+
+def print_table(title: str, columns: list[str], rows: list[tuple]) -> None:
+    print(title)
+    print(f"{'':<20}" + "".join(f"{column:>14}" for column in columns))
+    for name, *timings in rows:
+        print(f"{name:<20}" + "".join(f"{timing * 1000:>12.1f}ms" for timing in timings))
+    print()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100_000, help="list elements")
+    parser.add_argument("--reads", type=int, default=1_000_000, help="Map.get calls")
+    parser.add_argument("--contacts", type=int, default=10_000, help="set operation size")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement")
+    args = parser.parse_args()
+
+    values = [f"contact-{n}@example.com" for n in range(args.size)]
+    runtime = DelugeRuntime(disk_cache=False)
+    script = runtime.compile(LOOP_SCRIPT)
+
+    rows = []
+    for name, list_type in [("generator __iter__", GeneratorList), ("wrap on write", List)]:
+        items = list_type(values)
+        rows.append(
+            (
+                name,
+                best_of(args.repeat, lambda items=items: iterate(items)),
+                best_of(args.repeat, lambda items=items: script.run(items=items)),
+                best_of(args.repeat, lambda list_type=list_type: build(list_type, values)),
+            )
+        )
+
+    print_table(
+        f"List: {args.size:,} strings, best of {args.repeat}",
+        ["iterate x5", "script", "build"],
+        rows,
+    )
+
+    map_script = runtime.compile(MAP_SCRIPT)
+    rounds = List(range(args.reads // 5))
+    rows = []
+    for name, map_type in [("wrap on read", WrapOnReadMap), ("wrap on write", Map)]:
+        record = map_type(RECORD)
+        rows.append(
+            (
+                name,
+                best_of(args.repeat, lambda record=record: read_fields(record, args.reads)),
+                best_of(
+                    args.repeat, lambda record=record: map_script.run(visitor=record, rounds=rounds)
+                ),
+                best_of(args.repeat, lambda map_type=map_type: build_record(map_type)),
+            )
+        )
+    print_table(
+        f"Map: {args.reads:,} reads, best of {args.repeat}",
+        ["get", "script", "build x1000"],
+        rows,
+    )
+
+    half = args.contacts // 2
+    contacts = List(f"user{n}@example.com" for n in range(args.contacts))
+    others = List(f"user{n}@example.com" for n in range(half, args.contacts + half))
+    duplicated = List(contacts + contacts)
+    repeat = min(args.repeat, 2)
+    rows = [
+        (
+            "linear scans",
+            best_of(repeat, lambda: scan_remove_all(list(contacts), others)),
+            best_of(repeat, lambda: scan_intersect(contacts, others)),
+        ),
+        (
+            "hashed",
+            best_of(args.repeat, lambda: List(contacts).removeAll(others)),
+            best_of(args.repeat, lambda: contacts.intersect(others)),
+            best_of(args.repeat, duplicated.distinct),
+        ),
+    ]
+    print_table(
+        f"Set operations: {args.contacts:,} contacts, best of {args.repeat}",
+        ["removeAll", "intersect", "distinct"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -5,24 +5,51 @@ This module provides compatibility for running Deluge scripts in Python.
 
 __version__ = "1.2.11"
 
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from .runtime import DelugeRuntime
+from .cache import CompiledScriptCache
+from .http_client import HttpClient, configure_http
+from .json_stream import JSONListStream
+from .regex import RegexCache
+from .runtime import CompiledScript, DelugeRuntime
 from .translator import DelugeTranslator
 from .types import DelugeString, List, Map, deluge_string
 
+if TYPE_CHECKING:
+    from .batch import BatchResult, run_deluge_batch
+
 __all__ = [
+    "BatchResult",
+    "CompiledScript",
+    "CompiledScriptCache",
     "DelugeRuntime",
     "DelugeTranslator",
+    "HttpClient",
+    "JSONListStream",
+    "RegexCache",
     "Map",
     "List",
     "DelugeString",
     "deluge_string",
+    "configure_http",
+    "run_deluge_batch",
     "run_deluge_script",
     "translate_deluge_to_python",
 ]
 
 
+# The batch API pulls in multiprocessing, so it is imported on first access
+_LAZY_BATCH = frozenset(["BatchResult", "run_deluge_batch"])
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_BATCH:
+        from . import batch
+
+        return getattr(batch, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def run_deluge_script(script: str, **context) -> Any:
     """Execute a Deluge script string in Python.
 
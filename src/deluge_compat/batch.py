@@ -0,0 +1,117 @@
+"""Run one Deluge script over many input contexts in parallel."""
+
+import itertools
+import os
+from collections import deque
+from collections.abc import Generator, Iterable, Mapping
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any
+
+from .runtime import CompiledScript, DelugeRuntime
+
+
+class BatchResult:
+    """Outcome of running the script for one input context.
+
+    ``index`` is the position of the context in the input. Exactly one of
+    ``result`` and ``error`` is meaningful: a failing item records the
+    error message instead of aborting the batch.
+    """
+
+    __slots__ = ("index", "result", "error")
+
+    def __init__(self, index: int, result: Any = None, error: str | None = None):
+        self.index = index
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        """Whether the script ran without raising."""
+        return self.error is None
+
+    def __repr__(self) -> str:
+        if self.error is not None:
+            return f"BatchResult(index={self.index}, error={self.error!r})"
+        return f"BatchResult(index={self.index}, result={self.result!r})"
+
+
+def _run_item(script: CompiledScript, index: int, context: Mapping[str, Any]) -> BatchResult:
+    """Run the script for one context, capturing any error."""
+    try:
+        return BatchResult(index, script.run(**context))
+    except Exception as e:
+        return BatchResult(index, error=str(e))
+
+
+# Compiled once per worker process by _init_worker
+_worker_script: CompiledScript | None = None
+
+
+def _init_worker(deluge_code: str) -> None:
+    global _worker_script
+    _worker_script = DelugeRuntime(disk_cache=False).compile(deluge_code)
+
+
+def _run_chunk(chunk: list[tuple[int, Mapping[str, Any]]]) -> list[BatchResult]:
+    assert _worker_script is not None
+    return [_run_item(_worker_script, index, context) for index, context in chunk]
+
+
+def run_deluge_batch(
+    script: str,
+    contexts: Iterable[Mapping[str, Any]],
+    workers: int | None = None,
+    chunksize: int = 64,
+    ordered: bool = True,
+) -> Generator[BatchResult, None, None]:
+    """Run a Deluge script once per input context across worker processes.
+
+    The script is compiled once in every worker. Contexts are consumed
+    lazily in chunks of ``chunksize``, with at most two chunks per worker in
+    flight, so arbitrarily long input streams run in bounded memory.
+    Results are yielded in input order, or as soon as their chunk finishes
+    when ``ordered`` is False.
+
+    ``workers`` defaults to the number of CPUs; ``workers=1`` runs in the
+    calling process without starting a pool. Contexts and results must be
+    picklable when running in a pool. Closing the returned generator before
+    it is exhausted shuts the pool down.
+
+    Raises:
+        DelugeRuntimeError: If the script does not compile.
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be >= 1")
+    workers = workers or os.cpu_count() or 1
+
+    # Surface syntax errors before any worker starts
+    compiled = DelugeRuntime(disk_cache=False).compile(script)
+    if workers == 1:
+        for index, context in enumerate(contexts):
+            yield _run_item(compiled, index, context)
+        return
+
+    items = enumerate(contexts)
+    chunks = iter(lambda: list(itertools.islice(items, chunksize)), [])
+    max_pending = workers * 2
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(script,)) as pool:
+        pending: deque[Future[list[BatchResult]]] = deque(
+            pool.submit(_run_chunk, chunk) for chunk in itertools.islice(chunks, max_pending)
+        )
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                done = [future for future in pending if future in finished]
+                for future in done:
+                    pending.remove(future)
+
+            for future in done:
+                # Keep the workers busy while results are consumed
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    pending.append(pool.submit(_run_chunk, chunk))
+                yield from future.result()
@@ -0,0 +1,292 @@
+"""Caches for compiled Deluge scripts."""
+
+import hashlib
+import importlib.util
+import marshal
+import os
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from types import CodeType
+from typing import Any
+
+from .translator import TRANSLATOR_VERSION
+
+
+def script_key(deluge_code: str) -> str:
+    """Return the content-addressed cache key for a Deluge script."""
+    digest = hashlib.sha256()
+    digest.update(TRANSLATOR_VERSION.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(deluge_code.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class CompiledScriptCache:
+    """Bounded in-process LRU cache of compiled Deluge scripts.
+
+    Entries are keyed by :func:`script_key`, so identical script text always
+    maps to the same code object regardless of which runtime compiled it.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        if maxsize < 0:
+            raise ValueError("maxsize must be >= 0")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, CodeType] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CodeType | None:
+        """Return the cached code object for key, or None on a miss."""
+        with self._lock:
+            code = self._entries.get(key)
+            if code is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return code
+
+    def put(self, key: str, code: CodeType) -> None:
+        """Store a code object, evicting the least recently used entries."""
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            self._entries[key] = code
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counters and current occupancy."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+
+# Shared by every runtime that isn't given its own cache
+default_cache = CompiledScriptCache()
+
+# Code object attributes holding memory of their own; the last ones only
+# exist on newer interpreters
+_CODE_PARTS = (
+    "co_code",
+    "co_consts",
+    "co_names",
+    "co_varnames",
+    "co_freevars",
+    "co_cellvars",
+    "co_filename",
+    "co_name",
+    "co_linetable",
+    "co_qualname",
+    "co_exceptiontable",
+)
+
+
+def code_size(code: CodeType) -> int:
+    """Estimate the bytes held by a code object, its constants and nested code.
+
+    Objects reachable more than once are counted once. Strings and other
+    constants shared with the rest of the process are counted too, so the
+    estimate is an upper bound on what dropping the code would free.
+    """
+    seen: set[int] = set()
+    total = 0
+    stack: list[object] = [code]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, CodeType):
+            stack.extend(getattr(obj, name) for name in _CODE_PARTS if hasattr(obj, name))
+        elif isinstance(obj, (tuple, frozenset)):
+            stack.extend(obj)
+    return total
+
+
+def with_filename(code: CodeType, filename: str) -> CodeType:
+    """Return code, and the code nested in it, labelled with another filename.
+
+    Cache entries are keyed by script text alone, so the same script
+    compiled under several names shares one entry; each caller relabels it
+    so tracebacks name its own file.
+    """
+    if code.co_filename == filename:
+        return code
+    consts = tuple(
+        with_filename(const, filename) if isinstance(const, CodeType) else const
+        for const in code.co_consts
+    )
+    return code.replace(co_filename=filename, co_consts=consts)
+
+
+# Cache files kept in a directory before the least recently used are removed
+MAX_DISK_ENTRIES = 4096
+
+# Stores between checks of how many files the cache directory holds
+_PRUNE_INTERVAL = 64
+
+
+class DiskCodeCache:
+    """Persistent cache of marshalled code objects, a ``__pycache__`` for Deluge.
+
+    Files are named after the script key (source hash plus translator version)
+    and the interpreter's cache tag, and start with the interpreter's bytecode
+    magic number, so entries from another Python or translator version are
+    never loaded. Writes go through a temporary file and ``os.replace`` so
+    concurrent processes never observe a partially written entry.
+
+    Every edited version of a script is a new entry, so the directory is
+    capped at ``max_entries`` files (``None`` for no cap). Loading an entry
+    refreshes its modification time, and :meth:`prune`, run on the first
+    store and every 64 stores after, removes the files used least recently.
+    """
+
+    suffix = ".dgc"
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str] | None = None,
+        max_entries: int | None = MAX_DISK_ENTRIES,
+    ):
+        if max_entries is not None and max_entries < 0:
+            raise ValueError("max_entries must be >= 0")
+        self.directory = Path(directory) if directory is not None else default_cache_dir()
+        self.max_entries = max_entries
+        self._stores = 0
+
+    @classmethod
+    def from_env(cls) -> "DiskCodeCache | None":
+        """Build the default disk cache, or None if disabled via the environment.
+
+        ``DELUGE_COMPAT_NO_CACHE`` set to any non-empty value disables the
+        cache; ``DELUGE_COMPAT_CACHE_DIR`` overrides its location.
+        """
+        if os.environ.get("DELUGE_COMPAT_NO_CACHE"):
+            return None
+        return cls()
+
+    def path_for(self, key: str) -> Path:
+        """Return the cache file path for a script key."""
+        tag = sys.implementation.cache_tag or sys.implementation.name
+        return self.directory / f"{key}.{tag}{self.suffix}"
+
+    def load(self, key: str) -> CodeType | None:
+        """Load a cached code object, or None if missing, stale or unreadable."""
+        path = self.path_for(key)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        try:
+            # Mark the entry as recently used so pruning keeps it
+            os.utime(path)
+        except OSError:
+            pass
+
+        magic = importlib.util.MAGIC_NUMBER
+        if data[: len(magic)] != magic:
+            return None
+        try:
+            code = marshal.loads(data[len(magic) :])
+        except (EOFError, ValueError, TypeError):
+            return None
+        return code if isinstance(code, CodeType) else None
+
+    def store(self, key: str, code: CodeType) -> None:
+        """Atomically write a code object; failures are silently ignored."""
+        path = self.path_for(key)
+        tmp_name = None
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(
+                dir=self.directory, prefix=f".{key[:16]}.", suffix=".tmp"
+            )
+            with os.fdopen(fd, "wb") as f:
+                f.write(importlib.util.MAGIC_NUMBER)
+                f.write(marshal.dumps(code))
+            os.replace(tmp_name, path)
+            tmp_name = None
+            if self.max_entries is not None and self._stores % _PRUNE_INTERVAL == 0:
+                self.prune()
+            self._stores += 1
+        except OSError:
+            # Like CPython's bytecode cache, an unwritable cache is not an error
+            pass
+        finally:
+            if tmp_name is not None:
+                try:
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
+
+    def prune(self) -> int:
+        """Remove the least recently used files beyond max_entries; return how many."""
+        if self.max_entries is None:
+            return 0
+        entries = []
+        try:
+            with os.scandir(self.directory) as scan:
+                for entry in scan:
+                    if entry.name.endswith(self.suffix):
+                        try:
+                            entries.append((entry.stat().st_mtime_ns, entry.path))
+                        except OSError:
+                            pass
+        except OSError:
+            return 0
+        entries.sort()
+        removed = 0
+        for _, path in entries[: max(len(entries) - self.max_entries, 0)]:
+            try:
+                os.unlink(path)
+                removed += 1
+            except OSError:
+                # Another process pruning the same directory got there first
+                pass
+        return removed
+
+    def clear(self) -> None:
+        """Remove all cache files from the cache directory."""
+        if not self.directory.is_dir():
+            return
+        for entry in self.directory.glob(f"*{self.suffix}"):
+            try:
+                entry.unlink()
+            except OSError:
+                pass
+
+
+def default_cache_dir() -> Path:
+    """Return the directory used for the on-disk code cache."""
+    override = os.environ.get("DELUGE_COMPAT_CACHE_DIR")
+    if override:
+        return Path(override)
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "deluge-compat"
@@ -1,6 +1,7 @@
 """Command-line interface for deluge-compat."""
 
 import sys
+from collections.abc import Iterable
 from pathlib import Path
 
 import typer
@@ -9,9 +10,12 @@ from rich.console import Console
 from rich.panel import Panel
 from rich.syntax import Syntax
 
-from . import run_deluge_script, translate_deluge_to_python
+from . import translate_deluge_to_python
+from .runtime import run_deluge_file
 
 console = Console()
+# Batch mode writes JSONL to stdout, so progress and summaries go to stderr
+err_console = Console(stderr=True)
 
 run_app = typer.Typer(help="Run Deluge scripts")
 translate_app = typer.Typer(help="Translate Deluge scripts to Python")
@@ -39,18 +43,56 @@ def run_command(
         "-v",
         help="Enable verbose output",
     ),
+    no_cache: bool = typer.Option(
+        False,
+        "--no-cache",
+        help="Do not read or write the on-disk compiled script cache",
+    ),
+    cache_dir: Path | None = typer.Option(
+        None,
+        "--cache-dir",
+        help="Directory for the compiled script cache (defaults to ~/.cache/deluge-compat)",
+    ),
+    input_file: str | None = typer.Option(
+        None,
+        "--input",
+        "-i",
+        help="Run once per JSON object in this JSONL file ('-' for stdin), "
+        "writing one JSON result per line to stdout",
+    ),
+    workers: int = typer.Option(
+        1,
+        "--workers",
+        "-w",
+        min=1,
+        help="Worker processes for --input batches",
+    ),
+    chunk_size: int = typer.Option(
+        64,
+        "--chunk-size",
+        min=1,
+        help="Input lines handed to a worker at a time",
+    ),
+    unordered: bool = typer.Option(
+        False,
+        "--unordered",
+        help="Write batch results as they complete instead of in input order",
+    ),
 ) -> None:
     """Run a Deluge script file and display the result."""
-    try:
-        if verbose:
-            rprint(f"[blue]Reading script from:[/blue] {script_file}")
-
-        script_content = script_file.read_text(encoding="utf-8")
+    if input_file is not None:
+        run_batch(script_file, input_file, workers, chunk_size, not unordered, verbose)
+        return
 
+    try:
         if verbose:
-            rprint("[blue]Executing Deluge script...[/blue]")
+            rprint(f"[blue]Executing Deluge script:[/blue] {script_file}")
 
-        result = run_deluge_script(script_content)
+        result = run_deluge_file(
+            str(script_file),
+            cache_dir=str(cache_dir) if cache_dir is not None else None,
+            use_cache=not no_cache,
+        )
 
         if result is not None:
             if output_json:
@@ -79,6 +121,80 @@ def run_command(
         raise typer.Exit(1) from e
 
 
+def run_batch(
+    script_file: Path,
+    input_file: str,
+    workers: int = 1,
+    chunk_size: int = 64,
+    ordered: bool = True,
+    verbose: bool = False,
+) -> None:
+    """Run a script once per JSONL context and stream JSONL results to stdout.
+
+    Each input line holds a JSON object whose keys become script variables.
+    Each output line is ``{"index": n, "result": ...}`` or
+    ``{"index": n, "error": "..."}``; a summary is printed to stderr.
+    """
+    import json
+    import time
+
+    from .batch import run_deluge_batch
+    from .types import _decode_json
+
+    script = script_file.read_text(encoding="utf-8")
+    stream = None
+
+    def contexts(lines: Iterable[str]):
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            # Values become Deluge types, as they do for deluge-serve payloads
+            try:
+                context = _decode_json(line)
+            except ValueError as e:
+                raise typer.BadParameter(f"line {line_number}: {e}", param_hint="--input") from e
+            if not isinstance(context, dict):
+                raise typer.BadParameter(
+                    f"line {line_number}: expected a JSON object", param_hint="--input"
+                )
+            yield context
+
+    if verbose:
+        err_console.print(f"[blue]Running[/blue] {script_file} [blue]over[/blue] {input_file}")
+
+    count = errors = 0
+    start = time.perf_counter()
+    try:
+        stream = sys.stdin if input_file == "-" else open(input_file, encoding="utf-8")
+        for item in run_deluge_batch(script, contexts(stream), workers, chunk_size, ordered):
+            count += 1
+            if item.ok:
+                record = {"index": item.index, "result": item.result}
+            else:
+                errors += 1
+                record = {"index": item.index, "error": item.error}
+            sys.stdout.write(json.dumps(record, default=str) + "\n")
+    except typer.BadParameter as e:
+        err_console.print(f"[red]Invalid input:[/red] {e.message}")
+        raise typer.Exit(1) from e
+    except Exception as e:
+        err_console.print(f"[red]Error executing script:[/red] {e}")
+        raise typer.Exit(1) from e
+    finally:
+        sys.stdout.flush()
+        if stream is not None and stream is not sys.stdin:
+            stream.close()
+
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed else 0.0
+    err_console.print(
+        f"[green]Processed {count} records[/green] ({errors} errors) "
+        f"in {elapsed:.2f}s, {rate:,.0f} records/s with {workers} worker(s)"
+    )
+    if errors:
+        raise typer.Exit(1)
+
+
 @translate_app.command()
 def translate_command(
     script_file: Path = typer.Argument(
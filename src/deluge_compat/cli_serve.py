@@ -0,0 +1,122 @@
+"""Webhook server CLI for serving Zobot scripts over HTTP."""
+
+from collections.abc import Mapping
+from pathlib import Path
+
+import typer
+from rich import print as rprint
+
+from .http_client import configure_http
+from .registry import POLL_INTERVAL, ScriptRegistry
+from .runtime import CompiledScript, DelugeRuntime
+from .server import MAX_BODY_SIZE, ScriptServer, load_scripts
+
+serve_app = typer.Typer(help="Serve Deluge scripts as SalesIQ webhook endpoints")
+
+
+@serve_app.command()
+def serve_command(
+    script_files: list[Path] = typer.Argument(
+        ...,
+        help="Deluge script files; each is served at POST /<file name without extension>",
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+        readable=True,
+    ),
+    host: str = typer.Option("127.0.0.1", "--host", help="Address to listen on"),
+    port: int = typer.Option(8080, "--port", "-p", help="Port to listen on"),
+    workers: int = typer.Option(32, "--workers", "-w", min=1, help="Threads serving connections"),
+    max_concurrency: int | None = typer.Option(
+        None,
+        "--max-concurrency",
+        min=1,
+        help="Scripts allowed to run at once; more are refused with 503 (defaults to --workers)",
+    ),
+    keep_alive: float = typer.Option(
+        5.0,
+        "--keep-alive",
+        min=0.1,
+        help="Seconds an idle keep-alive connection is held open",
+    ),
+    max_body_size: int = typer.Option(
+        MAX_BODY_SIZE, "--max-body-size", min=1, help="Largest accepted request body in bytes"
+    ),
+    parallel_invokeurl: bool = typer.Option(
+        False,
+        "--parallel-invokeurl",
+        help="Send independent consecutive invokeurl calls concurrently",
+    ),
+    reload: bool = typer.Option(
+        False,
+        "--reload",
+        help="Recompile scripts in the background when their files change",
+    ),
+    reload_interval: float = typer.Option(
+        POLL_INTERVAL,
+        "--reload-interval",
+        min=0.1,
+        help="Seconds between checks for changed scripts with --reload",
+    ),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Log every request"),
+) -> None:
+    """Serve Deluge scripts as SalesIQ webhook endpoints."""
+    runtime = DelugeRuntime(parallel_invokeurl=parallel_invokeurl)
+    if parallel_invokeurl:
+        # Every worker may be waiting on a group of calls at once
+        configure_http(max_workers=workers)
+    registry: ScriptRegistry | None = None
+    try:
+        scripts: Mapping[str, CompiledScript]
+        if reload:
+            registry = ScriptRegistry(runtime, reload_interval, on_reload=_report_reload)
+            for path in script_files:
+                registry.add(path)
+            scripts = registry
+        else:
+            scripts = load_scripts(script_files, runtime)
+        server = ScriptServer(
+            scripts,
+            host=host,
+            port=port,
+            workers=workers,
+            max_concurrency=max_concurrency,
+            keep_alive_timeout=keep_alive,
+            max_body_size=max_body_size,
+            access_log=verbose,
+        )
+    except Exception as e:
+        rprint(f"[red]Error starting server:[/red] {e}")
+        raise typer.Exit(1) from e
+
+    for name in scripts:
+        rprint(f"[green]POST[/green] {server.url}/{name}")
+    rprint(f"[blue]Metrics:[/blue] {server.url}/metrics")
+
+    if registry is not None:
+        registry.start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        rprint("\n[yellow]Shutting down.[/yellow]")
+    finally:
+        if registry is not None:
+            registry.stop()
+        server.shutdown()
+
+
+def _report_reload(name: str, error: Exception | None) -> None:
+    """Print the outcome of reloading a changed script."""
+    if error is None:
+        rprint(f"[green]Reloaded[/green] {name}")
+    else:
+        rprint(f"[red]Kept the previous version of {name}:[/red] {error}")
+
+
+def serve_main():
+    """Entry point for deluge-serve command."""
+    serve_app()
+
+
+if __name__ == "__main__":
+    serve_main()
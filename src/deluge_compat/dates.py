@@ -0,0 +1,126 @@
+"""Fast parsing of the date formats accepted by DelugeString.toDate."""
+
+from collections.abc import Callable
+from datetime import datetime
+
+# The formats toDate accepts, in the order they are tried
+DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M:%SZ",
+    "%Y-%m-%d %H:%M:%S",
+    "%d-%m-%Y",
+    "%m/%d/%Y",
+)
+
+
+def _iso_date(text: str) -> datetime | None:
+    """YYYY-MM-DD, and Y-M-D with one-digit month or day."""
+    if len(text) == 10 and text[4] == "-" and text[7] == "-":
+        try:
+            return datetime.fromisoformat(text)
+        except ValueError:
+            return None
+    parts = text.split("-")
+    if len(parts) == 3 and len(parts[0]) == 4:
+        return _from_parts(parts[0], parts[1], parts[2])
+    return None
+
+
+def _iso_datetime(text: str) -> datetime | None:
+    """YYYY-MM-DDTHH:MM:SS, optionally ending in Z, or with a space."""
+    length = len(text)
+    if length == 20:
+        if text[19] not in "Zz" or text[10] not in "Tt":
+            return None
+        text = text[:19]
+    elif length != 19:
+        return None
+    if text[4] != "-" or text[7] != "-" or text[13] != ":" or text[16] != ":":
+        return None
+    separator = text[10]
+    if separator != "T":
+        if separator != "t" and not separator.isspace():
+            return None
+        text = text[:10] + "T" + text[11:]
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return None
+
+
+def _day_month_year(text: str) -> datetime | None:
+    """DD-MM-YYYY."""
+    parts = text.split("-")
+    if len(parts) == 3 and len(parts[2]) == 4:
+        return _from_parts(parts[2], parts[1], parts[0])
+    return None
+
+
+def _month_day_year(text: str) -> datetime | None:
+    """MM/DD/YYYY."""
+    parts = text.split("/")
+    if len(parts) == 3:
+        return _from_parts(parts[2], parts[0], parts[1])
+    return None
+
+
+def _from_parts(year: str, month: str, day: str) -> datetime | None:
+    """Build a date from ASCII digit fields as strptime's %Y, %m and %d read them."""
+    if (
+        len(year) == 4
+        and 0 < len(month) < 3
+        and 0 < len(day) < 3
+        and (year + month + day).isdigit()
+        and (year + month + day).isascii()
+    ):
+        try:
+            return datetime(int(year), int(month), int(day))
+        except ValueError:
+            return None
+    return None
+
+
+# Hand-written matchers, each accepting a subset of one or two of
+# DATE_FORMATS. The shapes they accept don't overlap, so the order they
+# are tried in never changes the result.
+_PARSERS: list[Callable[[str], datetime | None]] = [
+    _iso_date,
+    _iso_datetime,
+    _day_month_year,
+    _month_day_year,
+]
+
+# Index of the matcher that succeeded last; batches of dates tend to share
+# one format, which is then tried first
+_last_parser = 0
+
+
+def parse_date(text: str) -> datetime:
+    """Parse text in any of DATE_FORMATS, like trying strptime with each in turn.
+
+    Common spellings are handled by hand-written matchers and
+    :meth:`datetime.fromisoformat` without raising exceptions. Rarer
+    variants that strptime also accepts, such as space-padded days or
+    non-ASCII digits, fall back to strptime.
+
+    Raises:
+        ValueError: If text is in none of the formats.
+    """
+    global _last_parser
+    result = _PARSERS[_last_parser](text)
+    if result is not None:
+        return result
+    for index, parser in enumerate(_PARSERS):
+        if index != _last_parser:
+            result = parser(text)
+            if result is not None:
+                _last_parser = index
+                return result
+
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Unable to parse date: {text}")
@@ -6,15 +6,15 @@ import random
 import urllib.parse
 from typing import Any
 
-import requests
-
+from .http_client import default_client
+from .regex import regex_replace
 from .types import DelugeString, List, Map, deluge_string
 
 
 def getUrl(url: str, simple: bool = True, headers: dict[str, str] | None = None) -> str | Map:
     """Perform a GET request to URL."""
     try:
-        response = requests.get(url, headers=headers or {})
+        response = default_client.get(url, headers=headers or {})
         if simple:
             return deluge_string(response.text)
         else:
@@ -45,13 +45,13 @@ def postUrl(
         # Handle different body types
         if isinstance(body, dict) or hasattr(body, "items"):
             post_data = dict(body) if body else {}
-            response = requests.post(url, json=post_data, headers=post_headers)
+            response = default_client.post(url, json=post_data, headers=post_headers)
         elif isinstance(body, str):
             # For string bodies, send as data instead of json
-            response = requests.post(url, data=body, headers=post_headers)
+            response = default_client.post(url, data=body, headers=post_headers)
         else:
             # For other types (lists, etc.), try to send as json
-            response = requests.post(url, json=body, headers=post_headers)
+            response = default_client.post(url, json=body, headers=post_headers)
         if simple:
             return deluge_string(response.text)
         else:
@@ -257,8 +257,8 @@ def ifnull(value: Any, default: Any) -> Any:
 
 
 def replaceAll(text: str, search: str, replace: str) -> DelugeString:
-    """Replace all occurrences in string."""
-    return deluge_string(text.replace(search, replace))
+    """Replace all matches of the regex search in string."""
+    return deluge_string(regex_replace(text, search, replace))
 
 
 # Create aliases for math functions to match Deluge naming
@@ -0,0 +1,206 @@
+"""Pooled HTTP client shared by the Deluge HTTP builtins."""
+
+import threading
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Any, TypeVar
+
+if TYPE_CHECKING:
+    import requests
+
+# (connect, read) seconds; requests itself waits forever by default
+DEFAULT_TIMEOUT: tuple[float, float] = (10.0, 40.0)
+
+# Distinguishes "leave unchanged" from timeout=None (wait forever)
+_UNCHANGED: Any = object()
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+
+class HttpClient:
+    """Managed ``requests.Session`` used by getUrl, postUrl and invokeurl.
+
+    Connections are kept alive and reused across calls and scripts, so a
+    script calling the same host repeatedly pays for the TCP and TLS
+    handshake once. Cookies are never stored, as with one-off
+    ``requests.get`` calls, so nothing a server sets for one script is
+    sent on behalf of another. ``pool_connections`` is the number of hosts whose
+    pools are kept, ``pool_maxsize`` the connections kept per host, and
+    ``host_pool_sizes`` overrides the latter for individual URL prefixes
+    such as ``"https://www.zohoapis.com"``.
+
+    An application that already manages its own session (proxies, auth,
+    retries, instrumentation) can pass it as ``session``; it is then used
+    as-is and never closed by the client.
+
+    Independent requests can be sent concurrently with :meth:`fan_out`.
+    The calling thread sends the first of them and a shared thread pool
+    the rest. The pool has at least ``pool_maxsize`` and by default 32
+    threads. It is shared by every script in the process, so a server
+    should size ``max_workers`` for its own concurrency.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        host_pool_sizes: dict[str, int] | None = None,
+        timeout: float | tuple[float, float] | None = DEFAULT_TIMEOUT,
+        session: "requests.Session | None" = None,
+        max_workers: int = 32,
+    ):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.host_pool_sizes = dict(host_pool_sizes or {})
+        self.timeout = timeout
+        self._session = session
+        self._owns_session = session is None
+        self.max_workers = max_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> "requests.Session":
+        """Return the session, creating the pooled default on first use."""
+        session = self._session
+        if session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._create_session()
+                session = self._session
+        return session
+
+    def _create_session(self) -> "requests.Session":
+        """Create a keep-alive session with the configured pool sizes."""
+        # requests is only imported once a script actually makes a request
+        from http.cookiejar import DefaultCookiePolicy
+
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        # The session is shared by every script, so it must not keep cookies
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        # Longer prefixes take precedence when requests picks an adapter
+        for prefix, maxsize in self.host_pool_sizes.items():
+            session.mount(prefix, HTTPAdapter(pool_connections=1, pool_maxsize=maxsize))
+        return session
+
+    def configure(
+        self,
+        *,
+        pool_connections: int | None = None,
+        pool_maxsize: int | None = None,
+        host_pool_sizes: dict[str, int] | None = None,
+        timeout: float | tuple[float, float] | None = _UNCHANGED,
+        session: "requests.Session | None" = None,
+        max_workers: int | None = None,
+    ) -> None:
+        """Change the pool settings or install an application session.
+
+        The current pooled session is closed; a new one is created with the
+        new settings on the next request. Passing ``session`` installs an
+        application session; omitting it goes back to a pooled one.
+        """
+        with self._lock:
+            if pool_connections is not None:
+                self.pool_connections = pool_connections
+            if pool_maxsize is not None:
+                self.pool_maxsize = pool_maxsize
+            if host_pool_sizes is not None:
+                self.host_pool_sizes = dict(host_pool_sizes)
+            if timeout is not _UNCHANGED:
+                self.timeout = timeout
+            if max_workers is not None:
+                self.max_workers = max_workers
+            # The fan-out pool is sized from both settings
+            if max_workers is not None or pool_maxsize is not None:
+                self._shutdown_executor()
+            self._close_session()
+            self._session = session
+            self._owns_session = session is None
+
+    def request(self, method: str, url: str, **kwargs: Any) -> "requests.Response":
+        """Send a request through the shared session with the default timeout."""
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs: Any) -> "requests.Response":
+        """Send a GET request through the shared session."""
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> "requests.Response":
+        """Send a POST request through the shared session."""
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.post(url, **kwargs)
+
+    def fan_out(self, function: Callable[[_T], _R], items: Iterable[_T]) -> list[_R]:
+        """Call function on every item concurrently and return the results in order.
+
+        Every call runs to completion; the first failure in item order is
+        then raised, just as if the calls had been made one after another.
+        """
+        items = list(items)
+        if len(items) < 2:
+            return [function(item) for item in items]
+        executor = self._get_executor()
+        futures = [executor.submit(function, item) for item in items[1:]]
+        # The calling thread would only wait, so it makes the first call itself
+        try:
+            first = function(items[0])
+        except Exception:
+            wait(futures)
+            raise
+        errors = [future.exception() for future in futures]
+        for error in errors:
+            if error is not None:
+                raise error
+        return [first, *(future.result() for future in futures)]
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(self.max_workers, self.pool_maxsize),
+                    thread_name_prefix="deluge-http",
+                )
+            return self._executor
+
+    def close(self) -> None:
+        """Close pooled connections and stop the fan-out threads.
+
+        Both are recreated on demand by the next request.
+        """
+        with self._lock:
+            self._close_session()
+            self._shutdown_executor()
+
+    def _shutdown_executor(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._executor = None
+
+    def _close_session(self) -> None:
+        if self._session is not None and self._owns_session:
+            self._session.close()
+        self._session = None
+        self._owns_session = True
+
+
+# Shared by every runtime, like the compiled script cache
+default_client = HttpClient()
+
+
+def configure_http(**settings: Any) -> None:
+    """Configure the HTTP client used by getUrl, postUrl and invokeurl.
+
+    Accepts the keyword arguments of :meth:`HttpClient.configure`.
+    """
+    default_client.configure(**settings)
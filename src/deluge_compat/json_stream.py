@@ -0,0 +1,150 @@
+"""Incremental iteration over large JSON arrays."""
+
+import json
+import os
+import re
+from collections.abc import Callable, Iterator
+from typing import IO, Any
+
+from .types import _JSON_DECODER, List, _json_value
+
+# Characters read from a file at a time; more is read at once while a
+# single element spans more than the buffered text
+CHUNK_SIZE = 64 * 1024
+
+# Characters that can follow a complete array element
+_DELIMITERS = frozenset(",] \t\n\r")
+
+# JSON insignificant whitespace; matches empty text too, so match() never fails
+_WHITESPACE = re.compile(r"[ \t\n\r]*", re.VERBOSE | re.MULTILINE | re.DOTALL)
+
+
+class JSONListStream:
+    """Iterate over the elements of a JSON array without converting all of it.
+
+    Elements are decoded one at a time into Map, List and DelugeString
+    values, so ``for each record in stream`` holds one record at a time
+    instead of the whole converted array. Streams over text or a file path
+    can be iterated repeatedly; a stream over an open file reads it once.
+    """
+
+    def __init__(self, text: str):
+        self._open: Callable[[], Iterator[str]] | None = lambda: iter((text,))
+
+    @classmethod
+    def from_file(
+        cls, file: str | os.PathLike[str] | IO[str], chunk_size: int = CHUNK_SIZE
+    ) -> "JSONListStream":
+        """Stream a JSON array from a file path or an open text file.
+
+        Only ``chunk_size`` characters plus the element being decoded are
+        held in memory, so arrays larger than memory can be processed.
+        """
+        stream = cls.__new__(cls)
+        if isinstance(file, (str, os.PathLike)):
+            path = file
+
+            def open_path() -> Iterator[str]:
+                with open(path, encoding="utf-8") as f:
+                    yield from _read_chunks(f, chunk_size)
+
+            stream._open = open_path
+        else:
+            stream._open = lambda: _read_chunks(file, chunk_size)
+            stream._once = True
+        return stream
+
+    _once = False
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._open is None:
+            raise ValueError("A JSONListStream over an open file can only be iterated once")
+        chunks = self._open()
+        if self._once:
+            self._open = None
+        return _iter_elements(chunks)
+
+    def toList(self) -> List:
+        """Read every element into a List."""
+        result = List()
+        list.extend(result, self)
+        return result
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}()"
+
+
+def _read_chunks(f: IO[str], chunk_size: int) -> Iterator[str]:
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _iter_elements(chunks: Iterator[str]) -> Iterator[Any]:
+    """Decode the elements of a JSON array arriving as text chunks."""
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill(minimum: int = 1) -> bool:
+        """Buffer at least minimum more characters; False at end of input."""
+        nonlocal buffer, pos, eof
+        parts: list[str] = []
+        added = 0
+        while not eof and added < minimum:
+            chunk = next(chunks, None)
+            if chunk is None:
+                eof = True
+            else:
+                parts.append(chunk)
+                added += len(chunk)
+        if not parts:
+            return False
+        # Drop the text consumed so far
+        buffer = buffer[pos:] + "".join(parts)
+        pos = 0
+        return True
+
+    def next_char() -> str:
+        """Skip whitespace and return the next character ('' at end)."""
+        nonlocal pos
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()  # pyright: ignore[reportOptionalMemberAccess]
+            if pos < len(buffer):
+                return buffer[pos]
+            if not fill():
+                return ""
+
+    if next_char() != "[":
+        raise ValueError("String does not represent a JSON array")
+    pos += 1
+    if next_char() == "]":
+        return
+
+    while True:
+        # An element only counts as decoded once it is followed by a
+        # delimiter, since "12" or "1." at the end of the buffer could be
+        # the start of "123" or "1.5"
+        while True:
+            try:
+                value, end = _JSON_DECODER.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if not fill(max(len(buffer) - pos, 1)):
+                    raise ValueError(f"Invalid JSON: {e}") from e
+                continue
+            if end < len(buffer) and buffer[end] in _DELIMITERS:
+                break
+            if not fill(max(len(buffer) - pos, 1)):
+                break
+        pos = end
+        yield _json_value(value)
+
+        separator = next_char()
+        pos += 1
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(f"Invalid JSON: expected ',' or ']' in array, got {separator!r}")
+        next_char()
@@ -0,0 +1,119 @@
+"""Single-pass tokenizer for Deluge scripts."""
+
+import re
+
+# Token kinds
+NAME = "NAME"
+NUMBER = "NUMBER"
+STRING = "STRING"
+OP = "OP"
+ERRORTOKEN = "ERRORTOKEN"
+
+# A token is a plain (kind, value, line, ws) tuple; ws is the whitespace that
+# preceded it on its line, so the original spacing can be reproduced when
+# tokens are rendered back to text. Plain tuples keep tokenizing cheap.
+Token = tuple[str, str, int, str]
+KIND, VALUE, LINE, WS = 0, 1, 2, 3
+
+# Each match is optional leading whitespace followed by exactly one token.
+# Alternatives are ordered by frequency, except that comments must win over
+# "/" and longer operators must come before their single-character prefixes.
+_TOKEN_PATTERN = re.compile(
+    r"""
+    ([ \t\r\f\v]*)
+    (
+        [A-Za-z_]\w*
+        | [(){}\[\];:,.?^~@]
+        | \n
+        | "(?:[^"\\\n]|\\.)*"
+        | \d+(?:\.\d+)?(?:[eE][+-]?\d+)?
+        | &&|\|\||[=!<>+\-*/%]=|\*\*
+        | //[^\n]*|\#[^\n]*|/\*.*?(?:\*/|\Z)
+        | '(?:[^'\\\n]|\\.)*'
+        | [^ \t\r\f\v]
+    )
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+# Token kind by first character; "/" and "#" may start comments instead
+_KIND_BY_FIRST_CHAR: dict[str, str] = {
+    **dict.fromkeys("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_", NAME),
+    **dict.fromkeys("0123456789", NUMBER),
+    **dict.fromkeys("\"'", STRING),
+    **dict.fromkeys("(){}[];:,.?^~@=!<>+-*%&|", OP),
+    "/": "/",
+    "#": "#",
+    "\n": "\n",
+}
+
+
+def tokenize(source: str) -> list[list[Token]]:
+    """Tokenize a Deluge script in a single pass, grouped into logical lines.
+
+    Comments and whitespace are dropped (whitespace is kept on the following
+    token) and lines without tokens are skipped. A closing brace followed by
+    ``else`` on the same line (``} else {``) is split in two so the ``else``
+    branch is handled as its own line.
+    """
+    lines: list[list[Token]] = []
+    current: list[Token] = []
+    append = current.append
+    line = 1
+    pending_ws = None  # Spacing carried over an inline block comment
+    kind_of = _KIND_BY_FIRST_CHAR.get
+
+    # findall does the scanning in C and hands back one (ws, text) pair per token
+    for ws, text in _TOKEN_PATTERN.findall(source):
+        kind = kind_of(text[0], ERRORTOKEN)
+
+        if kind == "\n":
+            if current:
+                lines.append(current)
+                current = []
+                append = current.append
+            line += 1
+            pending_ws = None
+            continue
+
+        if pending_ws is not None:
+            ws = ws or pending_ws
+            pending_ws = None
+
+        if kind == NAME:
+            if text == "else" and current and current[-1][VALUE] == "}":
+                lines.append(current)
+                current = []
+                append = current.append
+                ws = ""
+        elif kind == "/" or kind == "#":
+            if kind == "/" and text[:2] not in ("//", "/*"):
+                kind = OP
+            else:
+                # Block comments may span lines; line comments stop before "\n"
+                newlines = text.count("\n")
+                if newlines:
+                    if current:
+                        lines.append(current)
+                        current = []
+                        append = current.append
+                    line += newlines
+                elif text[:2] == "/*":
+                    pending_ws = ws or " "
+                continue
+        elif kind == STRING and len(text) == 1:
+            # A quote with no closing quote on its line
+            kind = ERRORTOKEN
+
+        append((kind, text, line, ws))
+
+    if current:
+        lines.append(current)
+    return lines
+
+
+def render(tokens: list[Token]) -> str:
+    """Render tokens back to source text using their recorded spacing."""
+    if not tokens:
+        return ""
+    return tokens[0][VALUE] + "".join([token[WS] + token[VALUE] for token in tokens[1:]])
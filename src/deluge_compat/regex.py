@@ -0,0 +1,355 @@
+"""Java-style regular expressions for the Deluge string functions.
+
+Deluge evaluates ``matches``, ``replaceAll`` and ``replaceFirst`` with Java's
+regex engine. Patterns are translated to Python syntax and compiled once,
+then kept in a bounded LRU cache, so validating every record of a loop
+against the same pattern never recompiles it.
+"""
+
+import functools
+import re
+import sys
+from typing import Any
+
+# Java's \d, \w, \s and \b are ASCII-only unless the pattern opts out
+_FLAGS = re.ASCII
+
+# Possessive quantifiers (a*+) are native from Python 3.11; before that
+# they are compiled as greedy ones, which match the same strings except in
+# patterns that rely on possessive matching to fail early
+_POSSESSIVE = sys.version_info >= (3, 11)
+
+# Contents of the POSIX classes, usable inside or outside brackets
+_POSIX_CLASSES = {
+    "Lower": "a-z",
+    "Upper": "A-Z",
+    "ASCII": "\\x00-\\x7f",
+    "Alpha": "a-zA-Z",
+    "Digit": "0-9",
+    "Alnum": "a-zA-Z0-9",
+    "Punct": "!-/:-@\\[-`{-~",
+    "Graph": "!-~",
+    "Print": " -~",
+    "Blank": " \\t",
+    "Cntrl": "\\x00-\\x1f\\x7f",
+    "XDigit": "0-9a-fA-F",
+    "Space": " \\t\\n\\x0b\\f\\r",
+}
+
+# Unicode properties that Python can only express outside brackets:
+# name -> (pattern, negated pattern)
+_UNICODE_PROPERTIES = {
+    "L": ("(?u:[^\\W\\d_])", "(?u:[\\W\\d_])"),
+    "N": ("(?u:\\d)", "(?u:\\D)"),
+}
+for _alias, _name in [
+    ("IsL", "L"),
+    ("IsLetter", "L"),
+    ("IsAlphabetic", "L"),
+    ("Nd", "N"),
+    ("IsDigit", "N"),
+]:
+    _UNICODE_PROPERTIES[_alias] = _UNICODE_PROPERTIES[_name]
+
+_HORIZONTAL_SPACE = " \\t\\xa0\\u1680\\u180e\\u2000-\\u200a\\u202f\\u205f\\u3000"
+_VERTICAL_SPACE = "\\n\\x0b\\f\\r\\x85\\u2028\\u2029"
+_LINEBREAK = "(?:\\r\\n|[" + _VERTICAL_SPACE + "])"
+
+
+def java_to_python_regex(pattern: str) -> str:
+    """Translate a Java regular expression to Python ``re`` syntax.
+
+    Handles the constructs whose spelling differs: named groups and
+    backreferences, ``\\p{...}`` classes, ``\\Q...\\E`` quoting, ``\\z``,
+    ``\\Z``, ``\\h``, ``\\v``, ``\\R``, ``\\e``, ``\\x{...}``, Java octal
+    escapes, class unions such as ``[a-c[x-z]]`` and possessive
+    quantifiers. Everything else is passed through unchanged.
+
+    Raises:
+        re.error: For malformed escapes and for Java constructs Python has
+            no equivalent for, such as class intersections.
+    """
+    out: list[str] = []
+    i = 0
+    n = len(pattern)
+    depth = 0  # nesting of character classes
+    after_quantifier = False
+    after_group_open = False
+
+    def unsupported(construct: str) -> re.error:
+        return re.error(f"unsupported Java regex construct {construct}", pattern, i)
+
+    while i < n:
+        char = pattern[i]
+        quantifier = False
+
+        if char == "\\" and i + 1 < n:
+            escaped = pattern[i + 1]
+            i += 2
+            if escaped == "Q":
+                end = pattern.find("\\E", i)
+                end = n if end == -1 else end
+                out.append(re.escape(pattern[i:end]))
+                i = end + 2
+            elif escaped in "pP":
+                if i < n and pattern[i] == "{":
+                    end = pattern.find("}", i)
+                    if end == -1:
+                        raise re.error("unclosed \\p{...}", pattern, i)
+                    name = pattern[i + 1 : end]
+                    i = end + 1
+                else:
+                    name = pattern[i : i + 1]
+                    i += 1
+                if name.startswith("Is") and name[2:] in _POSIX_CLASSES:
+                    name = name[2:]
+                if name in _POSIX_CLASSES:
+                    contents = _POSIX_CLASSES[name]
+                    if depth:
+                        if escaped == "P":
+                            raise unsupported("\\P inside a character class")
+                        out.append(contents)
+                    else:
+                        out.append(f"[{'^' if escaped == 'P' else ''}{contents}]")
+                elif name in _UNICODE_PROPERTIES and not depth:
+                    out.append(_UNICODE_PROPERTIES[name][escaped == "P"])
+                else:
+                    raise unsupported(f"\\{escaped}{{{name}}}")
+            elif escaped == "z":
+                out.append("\\Z")
+            elif escaped == "Z":
+                out.append("(?=\\n?\\Z)")
+            elif escaped in "hH":
+                if depth:
+                    if escaped == "H":
+                        raise unsupported("\\H inside a character class")
+                    out.append(_HORIZONTAL_SPACE)
+                else:
+                    out.append(f"[{'^' if escaped == 'H' else ''}{_HORIZONTAL_SPACE}]")
+            elif escaped in "vV":
+                if depth:
+                    if escaped == "V":
+                        raise unsupported("\\V inside a character class")
+                    out.append(_VERTICAL_SPACE)
+                else:
+                    out.append(f"[{'^' if escaped == 'V' else ''}{_VERTICAL_SPACE}]")
+            elif escaped == "R":
+                out.append(_LINEBREAK)
+            elif escaped == "e":
+                out.append("\\x1b")
+            elif escaped == "c" and i < n:
+                out.append(f"\\x{ord(pattern[i]) ^ 64:02x}")
+                i += 1
+            elif escaped == "x" and i < n and pattern[i] == "{":
+                end = pattern.find("}", i)
+                if end == -1:
+                    raise re.error("unclosed \\x{...}", pattern, i)
+                try:
+                    code_point = int(pattern[i + 1 : end], 16)
+                except ValueError:
+                    raise re.error("illegal hexadecimal escape sequence", pattern, i) from None
+                out.append(f"\\U{code_point:08x}")
+                i = end + 1
+            elif escaped == "0":
+                # Java octal: \0n, \0nn or \0mnn with m <= 3
+                digits = ""
+                while i < n and len(digits) < 3 and pattern[i] in "01234567":
+                    if len(digits) == 2 and digits[0] > "3":
+                        break
+                    digits += pattern[i]
+                    i += 1
+                if not digits:
+                    raise re.error("illegal octal escape sequence", pattern, i)
+                out.append(f"\\x{int(digits, 8):02x}")
+            elif escaped == "k" and i < n and pattern[i] == "<":
+                end = pattern.find(">", i)
+                if end == -1:
+                    raise re.error("unclosed \\k<...>", pattern, i)
+                out.append(f"(?P={pattern[i + 1 : end]})")
+                i = end + 1
+            elif escaped == "G":
+                raise unsupported("\\G")
+            else:
+                out.append(char + escaped)
+            after_quantifier = after_group_open = False
+            continue
+
+        if depth:
+            if char == "[":
+                if pattern.startswith("[^", i):
+                    raise unsupported("negated class nested in a class")
+                # A union: its members simply join the enclosing class
+                depth += 1
+            elif char == "]":
+                depth -= 1
+                if not depth:
+                    out.append("]")
+            elif pattern.startswith("&&", i):
+                raise unsupported("class intersection &&")
+            else:
+                out.append(char)
+            i += 1
+            continue
+
+        if char == "[":
+            depth = 1
+            out.append("[")
+            i += 1
+            # A leading ] or ^] is a literal in both dialects
+            if pattern.startswith("^", i):
+                out.append("^")
+                i += 1
+            if pattern.startswith("]", i):
+                out.append("\\]")
+                i += 1
+        elif char == "(" and pattern.startswith("(?<", i) and pattern[i + 3 : i + 4] not in "=!":
+            out.append("(?P<")
+            i += 3
+        elif char in "*+?" and not (char == "?" and after_group_open):
+            if char == "+" and after_quantifier:
+                # Possessive quantifier
+                if _POSSESSIVE:
+                    out.append("+")
+            else:
+                out.append(char)
+                quantifier = char != "?" or not after_quantifier
+            i += 1
+        elif char == "{" and re.match(r"\{\d+(,\d*)?\}", pattern[i:]):
+            end = pattern.index("}", i)
+            out.append(pattern[i : end + 1])
+            i = end + 1
+            quantifier = True
+        else:
+            out.append(char)
+            i += 1
+        after_quantifier = quantifier
+        after_group_open = char == "("
+
+    return "".join(out)
+
+
+# Compiled on first use (re caches it) to keep it out of import time
+_GROUP_REFERENCE = r"\$(?:(\d+)|\{([A-Za-z][A-Za-z0-9]*)\})"
+
+
+@functools.lru_cache(maxsize=256)
+def java_replacement(replacement: str) -> str:
+    """Translate a Java replacement string to a Python ``re.sub`` template.
+
+    ``$n`` and ``${name}`` refer to groups and a backslash makes the next
+    character literal; everything else is copied as-is.
+
+    Raises:
+        ValueError: For a ``$`` not followed by a group reference, or a
+            trailing backslash.
+    """
+    if "$" not in replacement and "\\" not in replacement:
+        return replacement
+    out: list[str] = []
+    i = 0
+    n = len(replacement)
+    while i < n:
+        char = replacement[i]
+        if char == "\\":
+            if i + 1 == n:
+                raise ValueError("character to be escaped is missing")
+            literal = replacement[i + 1]
+            out.append("\\\\" if literal == "\\" else literal)
+            i += 2
+        elif char == "$":
+            match = re.compile(_GROUP_REFERENCE).match(replacement, i)
+            if match is None:
+                raise ValueError(f"Illegal group reference in replacement {replacement!r}")
+            out.append(f"\\g<{match.group(1) or match.group(2)}>")
+            i = match.end()
+        else:
+            out.append(char)
+            i += 1
+    return "".join(out)
+
+
+class RegexCache:
+    """Bounded LRU cache of compiled Deluge (Java-style) regular expressions.
+
+    Built on :func:`functools.lru_cache`, whose lookups are cheap enough to
+    sit on every ``matches`` call. Patterns that fail to compile are cached
+    as well, so a script looping over an invalid pattern reports the same
+    error without retranslating it; each call raises a new exception.
+    """
+
+    def __init__(self, maxsize: int = 512):
+        if maxsize < 0:
+            raise ValueError("maxsize must be >= 0")
+        self.maxsize = maxsize
+        self._lookup = functools.lru_cache(maxsize=maxsize)(_compile_java_regex)
+
+    def compile(self, pattern: str) -> re.Pattern[str]:
+        """Return the compiled form of a Java-style pattern.
+
+        Raises:
+            re.error: If the pattern is not a valid regular expression.
+        """
+        compiled = self._lookup(pattern)
+        if isinstance(compiled, re.error):
+            raise _fresh_error(compiled)
+        return compiled
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        self._lookup.cache_clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counters and current occupancy."""
+        info = self._lookup.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "maxsize": self.maxsize,
+            "hit_rate": info.hits / lookups if lookups else 0.0,
+        }
+
+    def __len__(self) -> int:
+        return self._lookup.cache_info().currsize
+
+
+def _compile_java_regex(pattern: str) -> re.Pattern[str] | re.error:
+    try:
+        return re.compile(java_to_python_regex(pattern), _FLAGS)
+    except re.error as e:
+        return e.with_traceback(None)
+
+
+def _fresh_error(error: re.error) -> re.error:
+    """Copy a cached compile failure so it can be raised.
+
+    Raising the cached instance would add every caller's frames to its
+    traceback and keep them, and their locals, alive.
+    """
+    return re.error(error.msg, error.pattern, error.pos)
+
+
+# Shared by every script, like the compiled script cache
+default_regex_cache = RegexCache()
+
+
+def regex_matches(text: str, pattern: str) -> bool:
+    """Return whether the whole of text matches a Java-style pattern."""
+    compiled = default_regex_cache._lookup(pattern)
+    if isinstance(compiled, re.error):
+        raise _fresh_error(compiled)
+    return compiled.fullmatch(text) is not None
+
+
+def regex_replace(text: str, pattern: str, replacement: str, count: int = 0) -> str:
+    """Replace matches of a Java-style pattern, all of them when count is 0.
+
+    A pattern that is not a valid regular expression is replaced as plain
+    text, as these functions did before they supported regexes, so scripts
+    replacing characters such as a lone ``(`` keep working.
+    """
+    compiled = default_regex_cache._lookup(pattern)
+    if isinstance(compiled, re.error):
+        return text.replace(pattern, replacement, count or -1)
+    return compiled.sub(java_replacement(replacement), text, count)
@@ -0,0 +1,427 @@
+"""Registries of compiled scripts for long-running servers.
+
+:class:`ScriptRegistry` serves a set of script files by name and reloads
+them when they change on disk. When a file changes, the registry's watcher
+thread waits for the file to stop changing, then translates and compiles
+the new version in the background and swaps it in with a single
+assignment, so requests never wait for a compile. Executions that already fetched the previous :class:`CompiledScript`
+finish on it undisturbed. If the new version fails to compile, or the file
+disappears, the previous version keeps being served and the error is
+recorded.
+
+:class:`TenantScriptRegistry` holds many scripts, such as one per customer,
+by id and version, and keeps only as many compiled in memory as fit in a
+byte budget. The least recently used are evicted first and can spill to
+the on-disk cache, so bringing them back skips translation.
+"""
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, Mapping
+from pathlib import Path
+from types import CodeType
+from typing import Any
+
+from .cache import CompiledScriptCache, DiskCodeCache, code_size, script_key, with_filename
+from .runtime import CompiledScript, DelugeRuntime
+
+# Seconds between checks of the watched files
+POLL_INTERVAL = 1.0
+
+
+class _Entry:
+    """A watched file and the version of it being served."""
+
+    __slots__ = ("path", "script", "stamp", "pending", "version", "error")
+
+    def __init__(self, path: str, script: CompiledScript, stamp: tuple[int, int]):
+        self.path = path
+        self.script = script
+        self.stamp = stamp
+        # New stamp seen by the last check, waiting to be seen again
+        self.pending: tuple[int, int] | None = None
+        self.version = 1
+        self.error: str | None = None
+
+
+def _stamp(path: str) -> tuple[int, int]:
+    """Return the modification time and size used to notice changes."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ScriptRegistry(Mapping[str, CompiledScript]):
+    """Compiled scripts by name, reloaded when their files change.
+
+    The registry is a read-only mapping from name to the current
+    :class:`CompiledScript`, so it can be handed to
+    :class:`~deluge_compat.server.ScriptServer` in place of a dict.
+    Files are compiled with :meth:`DelugeRuntime.compile_file`, so new
+    versions are also persisted to the on-disk cache.
+
+    Call :meth:`check` to look for changes once, or :meth:`start` a
+    watcher thread that checks every ``poll_interval`` seconds. A changed
+    file is only compiled once two consecutive checks see the same
+    modification time and size, so a file caught in the middle of being
+    written is not served.
+    ``on_reload`` is called from the checking thread with the script name
+    and ``None`` after a new version is swapped in, or the error when a
+    new version is rejected.
+    """
+
+    def __init__(
+        self,
+        runtime: DelugeRuntime | None = None,
+        poll_interval: float = POLL_INTERVAL,
+        on_reload: Callable[[str, Exception | None], Any] | None = None,
+    ):
+        self.runtime = runtime or DelugeRuntime()
+        self.poll_interval = poll_interval
+        self.on_reload = on_reload
+        self.reloads = 0
+        self.failures = 0
+        self._entries: dict[str, _Entry] = {}
+        # Serializes checks and additions; lookups never take it
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def add(self, path: str | Path, name: str | None = None) -> CompiledScript:
+        """Compile a file and serve it as name (the file stem by default).
+
+        Raises:
+            ValueError: If another file is already registered under name.
+            DelugeRuntimeError: If the file can't be read or compiled.
+        """
+        path = str(path)
+        name = name or Path(path).stem
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry.path != path:
+                raise ValueError(f"Duplicate script name {name!r}: {path}")
+            stamp = _stamp(path)
+            script = self.runtime.compile_file(path)
+            self._entries[name] = _Entry(path, script, stamp)
+            return script
+
+    def __getitem__(self, name: str) -> CompiledScript:
+        return self._entries[name].script
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def run(self, name: str, **context: Any) -> Any:
+        """Run the current version of a script."""
+        return self[name].run(**context)
+
+    def version(self, name: str) -> int:
+        """Return how many versions of a script have been served, starting at 1."""
+        return self._entries[name].version
+
+    def error(self, name: str) -> str | None:
+        """Return why the latest change to a script was rejected, if it was."""
+        return self._entries[name].error
+
+    def check(self) -> list[str]:
+        """Reload the scripts whose files changed; return the reloaded names.
+
+        A change is picked up by the second check that sees it.
+        """
+        reloaded = []
+        with self._lock:
+            for name, entry in list(self._entries.items()):
+                try:
+                    stamp = _stamp(entry.path)
+                except OSError as e:
+                    # Keep serving the last good version of a deleted file
+                    if entry.error is None:
+                        self._reject(name, entry, e)
+                    continue
+                if stamp == entry.stamp:
+                    entry.pending = None
+                    continue
+                if stamp != entry.pending:
+                    # The file may still be being written; a script cut off
+                    # at a statement boundary would compile, so wait until
+                    # the next check sees the same stamp
+                    entry.pending = stamp
+                    continue
+                entry.pending = None
+                entry.stamp = stamp
+                try:
+                    script = self.runtime.compile_file(entry.path)
+                except Exception as e:
+                    self._reject(name, entry, e)
+                    continue
+                entry.error = None
+                # Touched but unchanged files come back from the compiled
+                # script cache as the same code object
+                if script.code is entry.script.code:
+                    continue
+                entry.script = script
+                entry.version += 1
+                self.reloads += 1
+                reloaded.append(name)
+                if self.on_reload is not None:
+                    self.on_reload(name, None)
+        return reloaded
+
+    def _reject(self, name: str, entry: _Entry, error: Exception) -> None:
+        entry.error = str(error)
+        self.failures += 1
+        if self.on_reload is not None:
+            self.on_reload(name, error)
+
+    def start(self) -> None:
+        """Check for changes every poll_interval seconds on a background thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._watch, name="deluge-script-registry", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the watcher thread."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception:
+                # An on_reload callback failed; keep watching
+                continue
+
+    def __enter__(self) -> "ScriptRegistry":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+
+# Default budget for the compiled scripts a TenantScriptRegistry keeps resident
+MAX_RESIDENT_BYTES = 64 * 1024 * 1024
+
+
+def _filename(ident: tuple[str, str]) -> str:
+    """The name tracebacks show for a script version."""
+    return f"<{ident[0]}@{ident[1]}>"
+
+
+class _Resident:
+    """A compiled script held in memory and its estimated size."""
+
+    __slots__ = ("script", "size", "on_disk")
+
+    def __init__(self, script: CompiledScript, size: int, on_disk: bool):
+        self.script = script
+        self.size = size
+        self.on_disk = on_disk
+
+
+class TenantScriptRegistry:
+    """Compiled scripts by id and version, bounded by their memory use.
+
+    Scripts are registered with :meth:`add`, or fetched on first use from
+    ``loader(script_id, version)``, which returns the Deluge source. Each
+    compiled script is charged the estimated size of its code object and
+    constants (see :func:`~deluge_compat.cache.code_size`). When the
+    resident scripts exceed ``max_bytes``, the least recently used are
+    evicted; a single script larger than the budget is still kept while it
+    is the only one.
+
+    With ``disk_cache`` set, evicted scripts are written to it and loaded
+    back from it on their next use instead of being translated again.
+    Without a loader, the registry keeps the source of every script it was
+    given so evicted scripts can always be recompiled.
+
+    The default runtime disables the runtime's own compiled script cache,
+    which would otherwise keep evicted code alive. Lookups are thread-safe
+    and compiles run outside the registry's lock, so a cold script never
+    holds up the others.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str, str], str] | None = None,
+        runtime: DelugeRuntime | None = None,
+        max_bytes: int = MAX_RESIDENT_BYTES,
+        disk_cache: DiskCodeCache | None = None,
+    ):
+        if max_bytes < 0:
+            raise ValueError("max_bytes must be >= 0")
+        self.loader = loader
+        self.runtime = runtime or DelugeRuntime(
+            cache=CompiledScriptCache(maxsize=0), disk_cache=False
+        )
+        self.max_bytes = max_bytes
+        self.disk_cache = disk_cache
+        self.hits = 0
+        self.misses = 0
+        self.disk_loads = 0
+        self.compiles = 0
+        self.evictions = 0
+        self.resident_bytes = 0
+        self._resident: OrderedDict[tuple[str, str], _Resident] = OrderedDict()
+        # Script key and, without a loader, source of every known script
+        self._known: dict[tuple[str, str], tuple[str, str | None]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, script_id: str, version: str, source: str) -> CompiledScript:
+        """Compile a script version and make it resident.
+
+        Raises:
+            DelugeRuntimeError: If the script does not compile.
+        """
+        ident = (script_id, str(version))
+        script = self._compile(ident, source)
+        with self._lock:
+            self._known[ident] = (script_key(source), None if self.loader else source)
+            spilled = self._insert(ident, script, on_disk=False)
+        self._spill(spilled)
+        return script
+
+    def get(self, script_id: str, version: str) -> CompiledScript:
+        """Return a compiled script version, loading or compiling it if evicted.
+
+        Raises:
+            KeyError: If the version was never added and there is no loader.
+            DelugeRuntimeError: If the script does not compile.
+        """
+        ident = (script_id, str(version))
+        with self._lock:
+            resident = self._resident.get(ident)
+            if resident is not None:
+                self._resident.move_to_end(ident)
+                self.hits += 1
+                return resident.script
+            self.misses += 1
+            known = self._known.get(ident)
+
+        if known is None:
+            # Never added: the loader is the only way to get the source
+            if self.loader is None:
+                raise KeyError(ident)
+            source = self.loader(*ident)
+            known = (script_key(source), None)
+        else:
+            source = known[1]
+
+        script = None
+        if self.disk_cache is not None:
+            code = self.disk_cache.load(known[0])
+            if code is not None:
+                # Another script id may have stored the same source
+                script = CompiledScript(with_filename(code, _filename(ident)), self.runtime)
+        on_disk = script is not None
+        if script is None:
+            if source is None:
+                if self.loader is None:
+                    raise KeyError(ident)
+                source = self.loader(*ident)
+            script = self._compile(ident, source)
+
+        with self._lock:
+            if on_disk:
+                self.disk_loads += 1
+            # Another thread may have brought the script back meanwhile
+            resident = self._resident.get(ident)
+            if resident is not None:
+                self._resident.move_to_end(ident)
+                return resident.script
+            self._known.setdefault(ident, known)
+            spilled = self._insert(ident, script, on_disk)
+        self._spill(spilled)
+        return script
+
+    def run(self, script_id: str, version: str, **context: Any) -> Any:
+        """Run a script version with per-run variables."""
+        return self.get(script_id, version).run(**context)
+
+    def remove(self, script_id: str, version: str) -> None:
+        """Forget a script version, resident or not."""
+        ident = (script_id, str(version))
+        with self._lock:
+            self._known.pop(ident, None)
+            resident = self._resident.pop(ident, None)
+            if resident is not None:
+                self.resident_bytes -= resident.size
+
+    def __contains__(self, ident: object) -> bool:
+        """Whether a (script_id, version) pair is resident."""
+        if not isinstance(ident, tuple) or len(ident) != 2:
+            return False
+        return (ident[0], str(ident[1])) in self._resident
+
+    def __len__(self) -> int:
+        return len(self._resident)
+
+    def sizes(self) -> dict[tuple[str, str], int]:
+        """Return the estimated bytes of each resident script, least recently used first."""
+        with self._lock:
+            return {ident: resident.size for ident, resident in self._resident.items()}
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit, load and eviction counters and current memory use."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_loads": self.disk_loads,
+                "compiles": self.compiles,
+                "evictions": self.evictions,
+                "size": len(self._resident),
+                "known": len(self._known),
+                "resident_bytes": self.resident_bytes,
+                "max_bytes": self.max_bytes,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _compile(self, ident: tuple[str, str], source: str) -> CompiledScript:
+        script = self.runtime.compile(source, _filename(ident))
+        with self._lock:
+            self.compiles += 1
+        return script
+
+    def _insert(
+        self, ident: tuple[str, str], script: CompiledScript, on_disk: bool
+    ) -> list[tuple[str, CodeType]]:
+        """Make a script resident and evict down to the budget; needs the lock.
+
+        Returns the evicted code to write to the disk cache, which is done
+        after the lock is released.
+        """
+        previous = self._resident.pop(ident, None)
+        if previous is not None:
+            self.resident_bytes -= previous.size
+        size = code_size(script.code) + sys.getsizeof(script)
+        self._resident[ident] = _Resident(script, size, on_disk)
+        self.resident_bytes += size
+        spilled = []
+        while self.resident_bytes > self.max_bytes and len(self._resident) > 1:
+            evicted_ident, evicted = self._resident.popitem(last=False)
+            self.resident_bytes -= evicted.size
+            self.evictions += 1
+            known = self._known.get(evicted_ident)
+            if self.disk_cache is not None and not evicted.on_disk and known is not None:
+                spilled.append((known[0], evicted.script.code))
+        return spilled
+
+    def _spill(self, spilled: list[tuple[str, CodeType]]) -> None:
+        """Write evicted code to the disk cache."""
+        if self.disk_cache is not None:
+            for key, code in spilled:
+                self.disk_cache.store(key, code)
@@ -1,40 +1,122 @@
 """Deluge script runtime environment."""
 
-from typing import Any
-
+import builtins
+import threading
+from collections import ChainMap
+from collections.abc import MutableMapping
+from concurrent.futures import Executor, ThreadPoolExecutor
+from types import CodeType, FunctionType, MappingProxyType
+from typing import Any, cast
+
+from .cache import (
+    CompiledScriptCache,
+    DiskCodeCache,
+    default_cache,
+    script_key,
+    with_filename,
+)
 from .functions import BUILTIN_FUNCTIONS
-from .translator import DelugeTranslator, _invokeurl
+from .translator import (
+    INVOKEURL_ALL,
+    SCRIPT_FUNCTION,
+    DelugeTranslator,
+    _invokeurl,
+    _invokeurl_all,
+    _invokeurl_concurrent,
+)
 from .types import deluge_string
 
 
-class DelugeRuntime:
-    """Runtime environment for executing Deluge scripts."""
+def _build_script_builtins() -> dict[str, Any]:
+    """Build the builtins layer shared by every runtime."""
+    script_builtins = vars(builtins).copy()
+    script_builtins.update(BUILTIN_FUNCTIONS)
+    script_builtins.update(
+        {
+            "NULL": None,
+            "null": None,
+            "true": True,
+            "false": False,
+            "True": True,
+            "False": False,
+            "deluge_string": deluge_string,
+            "_invokeurl": _invokeurl,
+        }
+    )
+    return script_builtins
 
-    def __init__(self):
-        self.translator = DelugeTranslator()
-        self.context = self._create_base_context()
 
-    def _create_base_context(self) -> dict[str, Any]:
-        """Create the base execution context with built-in functions and types."""
-        context = BUILTIN_FUNCTIONS.copy()
-
-        # Add built-in variables and constants
-        context.update(
-            {
-                "NULL": None,
-                "null": None,
-                "true": True,
-                "false": False,
-                "True": True,
-                "False": False,
-                "deluge_string": deluge_string,
-                "_invokeurl": _invokeurl,
-                # Add zoho namespace for SalesIQ compatibility
-                "zoho": self._create_zoho_namespace(),
-            }
+# Python's builtins, the Deluge builtin functions and constants. Installed as
+# the __builtins__ of every script, so it must never be modified
+_SCRIPT_BUILTINS = _build_script_builtins()
+SCRIPT_BUILTINS = MappingProxyType(_SCRIPT_BUILTINS)
+
+
+class DelugeRuntime:
+    """Runtime environment for executing Deluge scripts.
+
+    Script globals are layered: the builtin functions and constants are
+    shared by every runtime, :attr:`context` adds this runtime's variables
+    on top, and variables passed to a single run are applied last, so
+    creating a runtime or running a script never copies the builtins.
+
+    With parallel_invokeurl set, consecutive invokeurl blocks that do not
+    use each other's results are sent concurrently through the shared HTTP
+    client, so their latency is that of the slowest call instead of the sum.
+
+    :meth:`execute_async` runs scripts on ``executor`` (a shared thread pool
+    by default) so blocking HTTP builtins never stall the event loop.
+
+    A runtime is thread-safe: :meth:`execute`, :meth:`execute_file`,
+    :meth:`compile` and :meth:`CompiledScript.run` may be called from many
+    threads at once, each with its own variables, so a multi-threaded
+    server needs a single runtime rather than one per request or thread.
+    :meth:`update_context` changes what every later execution sees; call it
+    while setting the runtime up and pass per-request variables to the
+    execution instead.
+    """
+
+    def __init__(
+        self,
+        cache: CompiledScriptCache | None = None,
+        disk_cache: DiskCodeCache | bool = True,
+        parallel_invokeurl: bool = False,
+        executor: Executor | None = None,
+    ):
+        self.translator = DelugeTranslator()
+        self.parallel_invokeurl = parallel_invokeurl
+        self.executor = executor
+        # Scripts run with this layer as their globals; context views it
+        # on top of the shared builtins. ChainMap only writes to its first
+        # mapping, so the read-only builtins are never modified through it
+        self._globals = self._create_base_context()
+        self.context: ChainMap[str, Any] = ChainMap(
+            self._globals, cast(MutableMapping[str, Any], SCRIPT_BUILTINS)
         )
+        # Compiled scripts are shared across runtimes unless a cache is supplied
+        self.cache = cache if cache is not None else default_cache
+        # Script files additionally persist their code objects across processes
+        if disk_cache is True:
+            self.disk_cache = DiskCodeCache.from_env()
+        elif disk_cache is False:
+            self.disk_cache = None
+        else:
+            self.disk_cache = disk_cache
 
-        return context
+    def _create_base_context(self) -> dict[str, Any]:
+        """Create the per-runtime layer of the execution globals.
+
+        Builtin functions and constants live in the shared, read-only
+        SCRIPT_BUILTINS, which this layer installs as ``__builtins__``;
+        only the entries that differ between runtimes are added here.
+        """
+        return {
+            # Names missing from the globals are looked up in __builtins__
+            "__builtins__": _SCRIPT_BUILTINS,
+            INVOKEURL_ALL: _invokeurl_concurrent if self.parallel_invokeurl else _invokeurl_all,
+            # Add zoho namespace for SalesIQ compatibility
+            "zoho": self._create_zoho_namespace(),
+        }
 
     def _create_zoho_namespace(self) -> Any:
         """Create the zoho namespace with SalesIQ functions."""
@@ -43,68 +125,107 @@ class DelugeRuntime:
         return ZohoNamespace()
 
     def update_context(self, additional_context: dict[str, Any]) -> None:
-        """Add additional variables to the execution context."""
+        """Add variables to the execution context of every later execution."""
         self.context.update(additional_context)
 
-    def execute(self, deluge_code: str) -> Any:
-        """Execute Deluge code and return the result."""
-        try:
-            # Translate Deluge code to Python
-            python_code = self.translator.translate(deluge_code)
-
-            # Debug: print translated code (disabled for tests)
-            # print("=== Translated Python Code ===")
-            # print(python_code)
-            # print("==============================")
+    def execute(self, deluge_code: str, **context: Any) -> Any:
+        """Execute Deluge code and return the result.
 
-            # Create a clean execution environment
-            exec_globals = self.context.copy()
-            exec_locals = {}
-
-            # Wrap the code in a function to handle return statements
-            # Handle empty scripts by adding 'pass' statement
-            indented_code = self._indent_code(python_code, 1)
-            if not indented_code.strip():
-                indented_code = "    pass"
+        Variables passed as keyword arguments only apply to this execution.
+        """
+        try:
+            code = self._compile(deluge_code)
+        except Exception as e:
+            raise DelugeRuntimeError(f"Error executing Deluge script: {e}") from e
+        return CompiledScript(code, self).run(**context)
 
-            wrapped_code = f"""
-def _deluge_script():
-{indented_code}
+    async def execute_async(self, deluge_code: str, **context: Any) -> Any:
+        """Execute Deluge code without blocking the running event loop.
 
-_result = _deluge_script()
-"""
+        The script runs on the runtime's executor, where getUrl, postUrl,
+        invokeurl and zoho.invokeurl may block without holding up other
+        coroutines. Variables passed as keyword arguments only apply to this
+        execution, so many executions can share one runtime concurrently.
+        """
+        import asyncio
 
-            # Execute the wrapped Python code
-            exec(wrapped_code, exec_globals, exec_locals)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor or _default_executor(), lambda: self.execute(deluge_code, **context)
+        )
 
-            # Return the result
-            return exec_locals.get("_result", None)
+    def compile(self, deluge_code: str, filename: str = "<deluge>") -> "CompiledScript":
+        """Compile Deluge code once for repeated execution.
 
+        The returned script runs against this runtime's context; variables
+        passed to :meth:`CompiledScript.run` only apply to that run.
+        """
+        try:
+            code = self._compile(deluge_code, filename)
         except Exception as e:
-            raise DelugeRuntimeError(f"Error executing Deluge script: {e}") from e
-
-    def _indent_code(self, code: str, levels: int) -> str:
-        """Add indentation to code."""
-        indent = "    " * levels
-        lines = code.split("\n")
-        indented_lines = []
-        for line in lines:
-            if line.strip():
-                indented_lines.append(indent + line)
-            else:
-                indented_lines.append("")
-        return "\n".join(indented_lines)
+            raise DelugeRuntimeError(f"Error compiling Deluge script: {e}") from e
+        return CompiledScript(code, self)
+
+    def _compile(
+        self, deluge_code: str, filename: str = "<deluge>", persist: bool = False
+    ) -> CodeType:
+        """Translate and compile Deluge code, reusing cached code objects.
+
+        With persist set, the on-disk cache is consulted after the in-process
+        cache misses, and newly compiled code is written back to it. Cached
+        code compiled under another filename is relabelled with this one.
+        """
+        key = script_key(deluge_code)
+        code = self.cache.get(key)
+        if code is not None:
+            return with_filename(code, filename)
+
+        disk_cache = self.disk_cache if persist else None
+        if disk_cache is not None:
+            code = disk_cache.load(key)
+            if code is not None:
+                self.cache.put(key, code)
+                return with_filename(code, filename)
+
+        code = _compile_script(self.translator.translate_script(deluge_code), filename)
+        self.cache.put(key, code)
+        if disk_cache is not None:
+            disk_cache.store(key, code)
+        return code
+
+    def compile_file(self, file_path: str) -> "CompiledScript":
+        """Compile a Deluge script file once for repeated execution.
+
+        Like :meth:`execute_file`, the compiled code is persisted to the
+        on-disk cache, so another process compiling the same file loads it.
+        """
+        try:
+            with open(file_path, encoding="utf-8") as f:
+                deluge_code = f.read()
+        except FileNotFoundError as e:
+            raise DelugeRuntimeError(f"Deluge script file not found: {file_path}") from e
+        except OSError as e:
+            raise DelugeRuntimeError(f"Error reading Deluge script file: {e}") from e
+        try:
+            code = self._compile(deluge_code, filename=file_path, persist=True)
+        except Exception as e:
+            raise DelugeRuntimeError(f"Error compiling Deluge script: {e}") from e
+        return CompiledScript(code, self)
 
     def execute_file(self, file_path: str, **context) -> Any:
-        """Execute Deluge code from a file."""
+        """Execute Deluge code from a file.
+
+        Variables passed as keyword arguments only apply to this execution.
+        """
         try:
             with open(file_path, encoding="utf-8") as f:
                 deluge_code = f.read()
 
-            if context:
-                self.update_context(context)
-
-            return self.execute(deluge_code)
+            try:
+                code = self._compile(deluge_code, filename=file_path, persist=True)
+            except Exception as e:
+                raise DelugeRuntimeError(f"Error executing Deluge script: {e}") from e
+            return CompiledScript(code, self).run(**context)
 
         except FileNotFoundError as e:
             raise DelugeRuntimeError(f"Deluge script file not found: {file_path}") from e
@@ -112,15 +233,108 @@ _result = _deluge_script()
             raise DelugeRuntimeError(f"Error reading Deluge script file: {e}") from e
 
 
+class CompiledScript:
+    """A Deluge script compiled once and runnable many times.
+
+    The script body is compiled to a function whose code object is reused
+    for every run. Script variables are locals of that function, so a run
+    without variables uses the runtime's globals as they are; a run with
+    variables binds a fresh globals dict made of the runtime's own
+    variables and those passed to :meth:`run`, so concurrent runs never
+    see each other's variables. Builtins are never copied.
+    """
+
+    def __init__(self, code: CodeType, runtime: DelugeRuntime):
+        self.code = code
+        self.runtime = runtime
+        self._function_code = _script_function_code(code)
+
+    def run(self, **context: Any) -> Any:
+        """Run the script with additional context variables and return its result."""
+        script_globals = self.runtime._globals
+        if context:
+            script_globals = {**script_globals, **context}
+        try:
+            return FunctionType(self._function_code, script_globals)()
+        except Exception as e:
+            raise DelugeRuntimeError(f"Error executing Deluge script: {e}") from e
+
+    async def run_async(self, **context: Any) -> Any:
+        """Run the script on the runtime's executor without blocking the event loop."""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        executor = self.runtime.executor or _default_executor()
+        return await loop.run_in_executor(executor, lambda: self.run(**context))
+
+
+# Scripts mostly wait on HTTP, so the pool is sized for I/O, not CPU
+ASYNC_MAX_WORKERS = 128
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _default_executor() -> ThreadPoolExecutor:
+    """Return the thread pool shared by async executions, creating it once."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=ASYNC_MAX_WORKERS, thread_name_prefix="deluge-script"
+            )
+        return _executor
+
+
+def _compile_script(source: str, filename: str) -> CodeType:
+    """Compile a translated script so its line numbers are the Deluge ones.
+
+    The translator puts every statement one line below its Deluge line, so
+    syntax errors are reported a line up and the compiled code is moved up
+    a line, which makes tracebacks show the script's own lines.
+    """
+    try:
+        code = compile(source, filename, "exec")
+    except SyntaxError as e:
+        line = max((e.lineno or 1) - 1, 1)
+        raise SyntaxError(e.msg, (filename, line, e.offset, e.text)) from None
+    return _move_up(code)
+
+
+def _move_up(code: CodeType) -> CodeType:
+    """Move a code object and the functions it defines up by one line."""
+    consts = tuple(
+        _move_up(const) if isinstance(const, CodeType) else const for const in code.co_consts
+    )
+    return code.replace(co_firstlineno=code.co_firstlineno - 1, co_consts=consts)
+
+
+def _script_function_code(code: CodeType) -> CodeType:
+    """Return the code object of the function wrapping a compiled script."""
+    for const in code.co_consts:
+        if isinstance(const, CodeType) and const.co_name == SCRIPT_FUNCTION:
+            return const
+    raise ValueError(f"{code.co_filename} is not a compiled Deluge script")
+
+
 class DelugeRuntimeError(Exception):
     """Exception raised during Deluge script execution."""
 
     pass
 
 
-def run_deluge_file(file_path: str, **context) -> Any:
-    """Convenience function to run a Deluge script file."""
-    runtime = DelugeRuntime()
+def run_deluge_file(
+    file_path: str, cache_dir: str | None = None, use_cache: bool = True, **context
+) -> Any:
+    """Convenience function to run a Deluge script file.
+
+    Compiled scripts are persisted to the on-disk cache unless use_cache is
+    False; cache_dir overrides the default cache location.
+    """
+    disk_cache: DiskCodeCache | bool = use_cache
+    if use_cache and cache_dir is not None:
+        disk_cache = DiskCodeCache(cache_dir)
+    runtime = DelugeRuntime(disk_cache=disk_cache)
     return runtime.execute_file(file_path, **context)
 
 
@@ -1,8 +1,12 @@
 """Zoho SalesIQ compatibility module for deluge-compat."""
 
+from typing import TYPE_CHECKING, Any
+
 from .core import Message, Visitor
 from .functions import visitorsession_get, visitorsession_set
-from .mocks import APIMockSource, MessageMockSource, MockManager, VisitorMockSource
+
+if TYPE_CHECKING:
+    from .mocks import APIMockSource, MessageMockSource, MockManager, VisitorMockSource
 
 __all__ = [
     "Visitor",
@@ -14,3 +18,15 @@ __all__ = [
     "MessageMockSource",
     "APIMockSource",
 ]
+
+# Mock sources pull in faker and requests, which the runtime itself never
+# needs, so they are only imported when first accessed
+_LAZY_MOCKS = frozenset(["MockManager", "VisitorMockSource", "MessageMockSource", "APIMockSource"])
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_MOCKS:
+        from . import mocks
+
+        return getattr(mocks, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,411 @@
+"""HTTP server exposing compiled Zobot scripts as SalesIQ webhook endpoints.
+
+Each script is compiled once at startup and served at ``POST /<name>``. The
+request body is the SalesIQ webhook payload; its ``visitor`` and
+``message`` objects become the script's ``visitor`` and ``message``
+variables and the whole payload is available as ``payload``. The script's
+return value, normally a Map with ``action`` and ``replies``, is sent back
+as JSON.
+
+Connections are served by a fixed pool of worker threads and kept alive
+between requests. At most ``max_concurrency`` scripts run at once; requests
+over the limit are answered with 503 straight away instead of queueing.
+``GET /metrics`` reports request counts and latencies in the Prometheus
+text format.
+"""
+
+import json
+import socket
+import threading
+import time
+from collections.abc import Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import Any, cast
+
+from .registry import ScriptRegistry
+from .runtime import CompiledScript, DelugeRuntime
+from .salesiq.core import Message, Visitor
+from .types import _convert_json_to_deluge_types
+
+# Request bodies larger than this are rejected with 413
+MAX_BODY_SIZE = 1024 * 1024
+
+
+def load_scripts(
+    paths: Iterable[str | Path], runtime: DelugeRuntime | None = None
+) -> dict[str, CompiledScript]:
+    """Compile script files for serving, named after their file stem.
+
+    Raises:
+        ValueError: If two files share a name.
+        DelugeRuntimeError: If a script does not compile.
+    """
+    runtime = runtime or DelugeRuntime()
+    scripts: dict[str, CompiledScript] = {}
+    for path in map(Path, paths):
+        if path.stem in scripts:
+            raise ValueError(f"Duplicate script name {path.stem!r}: {path}")
+        scripts[path.stem] = runtime.compile_file(str(path))
+    return scripts
+
+
+def webhook_context(payload: Mapping[str, Any]) -> dict[str, Any]:
+    """Build the script variables for a SalesIQ webhook payload.
+
+    ``message`` may be an object with a ``text`` member or a plain string.
+    Visitor fields missing from the payload keep the :class:`Visitor`
+    defaults.
+    """
+    visitor = Visitor()
+    visitor_data = payload.get("visitor")
+    if isinstance(visitor_data, Mapping):
+        visitor.update(dict(visitor_data))
+
+    message_data = payload.get("message")
+    if isinstance(message_data, Mapping):
+        message = Message(str(message_data.get("text") or ""), dict(message_data))
+    else:
+        message = Message("" if message_data is None else str(message_data))
+
+    return {
+        "visitor": visitor,
+        "message": message,
+        "payload": _convert_json_to_deluge_types(dict(payload)),
+    }
+
+
+class ServerMetrics:
+    """Thread-safe request counters rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+        self._requests: dict[tuple[str, int], int] = {}
+        self._durations: dict[str, list[float]] = {}
+
+    def started(self) -> None:
+        """Count a script that started running."""
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, script: str, status: int, duration: float) -> None:
+        """Record a script that finished running."""
+        with self._lock:
+            self.in_flight -= 1
+            key = (script, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            total = self._durations.setdefault(script, [0.0, 0])
+            total[0] += duration
+            total[1] += 1
+
+    def refused(self, script: str, status: int) -> None:
+        """Record a request answered without running the script."""
+        with self._lock:
+            key = (script, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            if status == 503:
+                self.rejected += 1
+
+    def requests(self, script: str, status: int) -> int:
+        """Return how many requests for a script were answered with status."""
+        with self._lock:
+            return self._requests.get((script, status), 0)
+
+    def render(
+        self,
+        gauges: Mapping[str, float] | None = None,
+        counters: Mapping[str, float] | None = None,
+    ) -> str:
+        """Render the counters, plus any extra gauges and counters, as Prometheus text."""
+        with self._lock:
+            lines = [
+                "# HELP deluge_serve_requests_total Webhook requests by script and status code.",
+                "# TYPE deluge_serve_requests_total counter",
+            ]
+            for (script, status), count in sorted(self._requests.items()):
+                lines.append(
+                    f'deluge_serve_requests_total{{script="{script}",status="{status}"}} {count}'
+                )
+            lines += [
+                "# HELP deluge_serve_request_duration_seconds Time spent running scripts.",
+                "# TYPE deluge_serve_request_duration_seconds summary",
+            ]
+            for script, (seconds, count) in sorted(self._durations.items()):
+                labels = f'{{script="{script}"}}'
+                lines.append(f"deluge_serve_request_duration_seconds_sum{labels} {seconds:.6f}")
+                lines.append(f"deluge_serve_request_duration_seconds_count{labels} {count}")
+            lines += [
+                "# HELP deluge_serve_rejected_total Requests refused by the concurrency limit.",
+                "# TYPE deluge_serve_rejected_total counter",
+                f"deluge_serve_rejected_total {self.rejected}",
+                "# HELP deluge_serve_in_flight Scripts running right now.",
+                "# TYPE deluge_serve_in_flight gauge",
+                f"deluge_serve_in_flight {self.in_flight}",
+            ]
+        for name, value in (gauges or {}).items():
+            lines += [f"# TYPE {name} gauge", f"{name} {value:g}"]
+        for name, value in (counters or {}).items():
+            lines += [f"# TYPE {name} counter", f"{name} {value:g}"]
+        return "\n".join(lines) + "\n"
+
+
+class _PooledHTTPServer(HTTPServer):
+    """HTTPServer that serves each connection on a fixed pool of threads.
+
+    Connections waiting for their next keep-alive request are tracked, so
+    closing the server hangs up on them at once instead of waiting for
+    their idle timeout, while requests being served still finish.
+    """
+
+    def __init__(self, address: tuple[str, int], app: "ScriptServer", workers: int):
+        self.app = app
+        self.closing = False
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="deluge-serve")
+        self._idle: set[socket.socket] = set()
+        self._idle_lock = threading.Lock()
+        super().__init__(address, _WebhookHandler)
+
+    def wait_for_request(self, connection: socket.socket) -> bool:
+        """Mark a connection idle; False once the server is closing."""
+        with self._idle_lock:
+            if self.closing:
+                return False
+            self._idle.add(connection)
+            return True
+
+    def request_started(self, connection: socket.socket) -> None:
+        with self._idle_lock:
+            self._idle.discard(connection)
+
+    def process_request(self, request, client_address) -> None:
+        self._pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.request_started(request)
+            self.shutdown_request(request)
+
+    def server_close(self) -> None:
+        super().server_close()
+        with self._idle_lock:
+            self.closing = True
+            for connection in self._idle:
+                try:
+                    connection.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+        self._pool.shutdown(wait=True)
+
+
+class _WebhookHandler(BaseHTTPRequestHandler):
+    """Routes webhook posts to scripts and serves /metrics."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "deluge-serve"
+    # Headers and body are written separately; without TCP_NODELAY the body
+    # of every keep-alive response waits for the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def setup(self) -> None:
+        super().setup()
+        # Idle keep-alive connections are closed after this many seconds,
+        # returning their worker to the pool
+        server = cast(_PooledHTTPServer, self.server)
+        self.connection.settimeout(server.app.keep_alive_timeout)
+
+    def handle_one_request(self) -> None:
+        if not cast(_PooledHTTPServer, self.server).wait_for_request(self.connection):
+            self.close_connection = True
+            return
+        super().handle_one_request()
+
+    def parse_request(self) -> bool:
+        # Called once the request line has arrived
+        cast(_PooledHTTPServer, self.server).request_started(self.connection)
+        return super().parse_request()
+
+    def do_GET(self) -> None:
+        app = cast(_PooledHTTPServer, self.server).app
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            body = app.render_metrics().encode("utf-8")
+            self._send(200, body, "text/plain; version=0.0.4; charset=utf-8")
+        elif path.strip("/") in app.scripts:
+            self._send_json(405, {"error": "Use POST"}, {"Allow": "POST"})
+        else:
+            self._send_json(404, {"error": f"No script at {path}"})
+
+    def do_POST(self) -> None:
+        app = cast(_PooledHTTPServer, self.server).app
+        if "chunked" in self.headers.get("Transfer-Encoding", "").lower():
+            self.close_connection = True
+            self._send_json(411, {"error": "Content-Length is required"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0 or length > app.max_body_size:
+            # The body is left unread, so the connection can't be reused
+            self.close_connection = True
+            self._send_json(413, {"error": "Request body too large"})
+            return
+        body = self.rfile.read(length) if length else b""
+
+        name = self.path.split("?", 1)[0].strip("/")
+        if name not in app.scripts:
+            self._send_json(404, {"error": f"No script named {name!r}"})
+            return
+        status, result = app.handle_webhook(name, body)
+        headers = {"Retry-After": "1"} if status == 503 else None
+        self._send_json(status, result, headers)
+
+    def _send_json(
+        self, status: int, payload: Any, headers: Mapping[str, str] | None = None
+    ) -> None:
+        body = json.dumps(payload, default=str).encode("utf-8")
+        self._send(status, body, "application/json", headers)
+
+    def _send(
+        self,
+        status: int,
+        body: bytes,
+        content_type: str,
+        headers: Mapping[str, str] | None = None,
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection or cast(_PooledHTTPServer, self.server).closing:
+            self.send_header("Connection", "close")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if cast(_PooledHTTPServer, self.server).app.access_log:
+            super().log_message(format, *args)
+
+
+class ScriptServer:
+    """Serve compiled Deluge scripts as SalesIQ webhook endpoints.
+
+    ``workers`` threads serve connections; an idle keep-alive connection
+    holds its worker for up to ``keep_alive_timeout`` seconds. At most
+    ``max_concurrency`` scripts (``workers`` by default) run at once.
+
+    ``scripts`` may be a :class:`~deluge_compat.registry.ScriptRegistry`,
+    whose reloaded versions are served from the next request on.
+
+    The server binds when created, so ``port=0`` picks a free port that
+    :attr:`url` reports. Run it with :meth:`serve_forever`, or
+    :meth:`start` it on a background thread.
+    """
+
+    def __init__(
+        self,
+        scripts: Mapping[str, CompiledScript],
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        workers: int = 32,
+        max_concurrency: int | None = None,
+        keep_alive_timeout: float = 5.0,
+        max_body_size: int = MAX_BODY_SIZE,
+        access_log: bool = False,
+    ):
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        # A registry is kept as is, so the scripts it reloads are served
+        self.scripts = scripts if isinstance(scripts, ScriptRegistry) else dict(scripts)
+        self.workers = workers
+        self.max_concurrency = max_concurrency or workers
+        self.keep_alive_timeout = keep_alive_timeout
+        self.max_body_size = max_body_size
+        self.access_log = access_log
+        self.metrics = ServerMetrics()
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._httpd = _PooledHTTPServer((host, port), self, workers)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """Base URL the server is listening on."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def handle_webhook(self, name: str, body: bytes) -> tuple[int, Any]:
+        """Run a script for a webhook body; return the status and JSON payload."""
+        try:
+            payload = json.loads(body) if body.strip() else {}
+        except ValueError as e:
+            self.metrics.refused(name, 400)
+            return 400, {"error": f"Invalid JSON: {e}"}
+        if not isinstance(payload, dict):
+            self.metrics.refused(name, 400)
+            return 400, {"error": "Expected a JSON object"}
+
+        if not self._slots.acquire(blocking=False):
+            self.metrics.refused(name, 503)
+            return 503, {"error": "Too many concurrent requests"}
+        self.metrics.started()
+        start = time.perf_counter()
+        status = 200
+        try:
+            result = self.scripts[name].run(**webhook_context(payload))
+        except Exception as e:
+            status, result = 500, {"error": str(e)}
+        finally:
+            self._slots.release()
+            self.metrics.finished(name, status, time.perf_counter() - start)
+        return status, result
+
+    def render_metrics(self) -> str:
+        """Return the metrics served at /metrics."""
+        counters = {}
+        if isinstance(self.scripts, ScriptRegistry):
+            counters = {
+                "deluge_serve_reloads_total": self.scripts.reloads,
+                "deluge_serve_reload_failures_total": self.scripts.failures,
+            }
+        return self.metrics.render(
+            {
+                "deluge_serve_scripts": len(self.scripts),
+                "deluge_serve_workers": self.workers,
+                "deluge_serve_max_concurrency": self.max_concurrency,
+            },
+            counters,
+        )
+
+    def serve_forever(self) -> None:
+        """Serve requests until :meth:`shutdown` is called."""
+        self._httpd.serve_forever()
+
+    def start(self) -> None:
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        """Stop serving, wait for open connections and release the socket."""
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self) -> "ScriptServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.shutdown()
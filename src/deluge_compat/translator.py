@@ -1,478 +1,542 @@
 """Deluge to Python code translator."""
 
-import re
 from typing import Any
 
+from .lexer import KIND, LINE, NAME, OP, STRING, VALUE, WS, Token, render, tokenize
 
-class DelugeTranslator:
-    """Translates Deluge script syntax to Python code."""
+# Bump whenever the generated Python changes so cached code objects are invalidated
+TRANSLATOR_VERSION = "5"
 
-    def __init__(self):
-        self.indent_level = 0
-        self.in_invokeurl = False
-        self.in_sendmail = False
-        self.brace_stack = []  # Track opening braces and their contexts
+# Name of the function the script body is wrapped in; the module then stores
+# its return value in _result
+SCRIPT_FUNCTION = "_deluge_script"
 
-    def translate(self, deluge_code: str) -> str:
-        """Translate Deluge code to Python code."""
-        # Reset state for each translation
-        self.indent_level = 0
-        self.in_invokeurl = False
-        self.in_sendmail = False
-        self.brace_stack = []
+# Runs consecutive independent invokeurl calls; the runtime decides whether
+# they are sent one after another or concurrently
+INVOKEURL_ALL = "_invokeurl_all"
 
-        # Preprocess the code to handle } else { patterns
-        preprocessed = self._preprocess_code(deluge_code)
+_ASSIGNMENT_OPS = frozenset(["=", "+=", "-=", "*=", "/=", "%="])
+_LITERAL_WORDS = frozenset(["true", "false", "True", "False", "null", "None", "NULL"])
+_NULL_WORDS = frozenset(["null", "NULL"])
+_NULL_COMPARISONS = {"==": "is", "!=": "is not"}
+_OPENING = frozenset(["(", "[", "{"])
+_CLOSING = frozenset([")", "]", "}"])
+_CONSTRUCTORS = {"list": "List", "Collection": "Map"}
 
-        lines = preprocessed.split("\n")
-        python_lines = []
+# sendmail parameters that can't be passed as plain keyword arguments
+_SENDMAIL_RESERVED = frozenset(
+    ["from", "to", "import", "class", "def", "if", "else", "for", "while"]
+)
 
-        self._last_line = ""
-        for line in lines:
-            original_line = line.strip()
-            if not original_line:
-                continue
-
-            translated = self._translate_line(original_line)
-            if translated:
-                python_lines.append(translated)
-
-            self._last_line = original_line
 
-        return "\n".join(python_lines)
-
-    def _preprocess_code(self, code: str) -> str:
-        """Preprocess Deluge code to handle special patterns."""
-        # Handle inline } else { patterns by breaking them into separate lines
-        code = re.sub(r"}\s*else\s*{", "}\nelse {", code)
-
-        # Handle } else if { patterns
-        code = re.sub(r"}\s*else\s+if\s*\([^)]*\)\s*{", lambda m: "}\n" + m.group(0)[1:], code)
+class DelugeTranslator:
+    """Translates Deluge script syntax to Python code.
 
-        return code
+    The script is tokenized once by :mod:`deluge_compat.lexer`; every stage
+    below works on the resulting token lists rather than rescanning text.
 
-    def _remove_inline_comments(self, line: str) -> str:
-        """Remove inline comments but preserve // inside string literals."""
-        in_string = False
-        quote_char = None
-        result = []
+    The state kept while translating lives on a fresh instance for each
+    call, so one translator can be shared by many threads.
+    """
 
-        i = 0
-        while i < len(line):
-            char = line[i]
+    def __init__(self):
+        self._reset()
 
-            if not in_string:
-                if char in ['"', "'"]:
-                    in_string = True
-                    quote_char = char
-                    result.append(char)
-                elif char == "/" and i + 1 < len(line) and line[i + 1] == "/":
-                    # Found // comment outside string, stop here
+    def translate(self, deluge_code: str) -> str:
+        """Translate Deluge code to Python code."""
+        return self._new_pass()._translate(deluge_code)
+
+    def translate_script(self, deluge_code: str) -> str:
+        """Translate Deluge code to the Python module the runtime compiles.
+
+        The script body is wrapped in a ``_deluge_script()`` function whose
+        return value the module stores in ``_result``. Every statement sits
+        one line below its Deluge line, under the function header, so the
+        compiled code only has to move up a line for tracebacks to point
+        into the script. Empty blocks get a ``pass``, and runs of independent
+        invokeurl assignments are merged into one ``_invokeurl_all`` call.
+        """
+        return self._new_pass()._translate_script(deluge_code)
+
+    def _new_pass(self):
+        """Return an instance with fresh state for a single translation."""
+        translation = object.__new__(type(self))
+        translation._reset()
+        return translation
+
+    def _translate(self, deluge_code: str) -> str:
+        self._translate_lines(deluge_code)
+        return "\n".join(self._python_lines)
+
+    def _translate_lines(self, deluge_code: str) -> None:
+        """Translate every line, recording the Deluge line of each Python line."""
+        python_lines = self._python_lines
+        deluge_lines = self._deluge_lines
+        for tokens in tokenize(deluge_code):
+            translated = self._translate_line(tokens)
+            if translated:
+                python_lines.append(translated)
+                deluge_lines.append(tokens[0][LINE])
+
+    def _translate_script(self, deluge_code: str) -> str:
+        self._translate_lines(deluge_code)
+        python_lines = self._python_lines
+        if len(self._invokeurl_calls) > 1:
+            self._group_invokeurl_calls()
+
+        # source[n] is Python line n + 1, so Deluge line n goes at index n
+        source = [f"def {SCRIPT_FUNCTION}():"]
+        last = len(python_lines) - 1
+        for index, text in enumerate(python_lines):
+            line = self._deluge_lines[index]
+            if line > len(source):
+                source.extend([""] * (line - len(source)))
+            # Blocks with no statements (e.g. "if(x) { }") still need a body
+            if text[-1] == ":" and (
+                index == last or _indent(python_lines[index + 1]) <= _indent(text)
+            ):
+                text += " pass"
+            source.append("    " + text)
+        if not python_lines:
+            source.append("    pass")
+        source.append(f"_result = {SCRIPT_FUNCTION}()")
+        return "\n".join(source)
+
+    def _group_invokeurl_calls(self) -> None:
+        """Merge runs of independent invokeurl assignments into one call.
+
+        ``a = invokeurl [...]; b = invokeurl [...];`` becomes
+        ``a, b = _invokeurl_all([{...}, {...}])`` when the blocks are
+        adjacent, at the same depth, assign different variables, and no
+        block's parameters read a variable assigned earlier in the run.
+        """
+        python_lines = self._python_lines
+        calls = self._invokeurl_calls
+        index = 0
+        while index < len(calls):
+            run = [calls[index]]
+            targets = {run[0][2]}
+            for call in calls[index + 1 :]:
+                start, _end, target, names, indent = call
+                previous = run[-1]
+                if start != previous[1] + 1 or indent != previous[4] or target in targets:
                     break
-                elif char == "#":
-                    # Found # comment outside string, stop here
+                if not targets.isdisjoint(names):
                     break
-                else:
-                    result.append(char)
-            else:
-                result.append(char)
-                if char == quote_char and (i == 0 or line[i - 1] != "\\"):
-                    # End of string literal
-                    in_string = False
-                    quote_char = None
-
-            i += 1
-
-        return "".join(result).strip()
-
-    def _translate_line(self, line: str) -> str:
-        """Translate a single line of Deluge code."""
-        line = line.strip()
-
-        # Remove inline comments (but not // inside strings)
-        line = self._remove_inline_comments(line)
-
-        # Skip empty lines and comments
-        if not line or line.startswith("//"):
-            return ""
+                run.append(call)
+                targets.add(target)
+            index += len(run)
+            if len(run) < 2:
+                continue
 
-        # Handle multi-line comments
-        if line.startswith("/*") or line.endswith("*/"):
-            return ""
+            pad = "    " * run[0][4]
+            assigned = ", ".join(call[2] for call in run)
+            python_lines[run[0][0]] = f"{pad}{assigned} = {INVOKEURL_ALL}([{{"
+            for call in run[1:]:
+                python_lines[call[0]] = pad + "{"
+            for call in run[:-1]:
+                python_lines[call[1]] = pad + "},"
+            python_lines[run[-1][1]] = pad + "}])"
+
+    def _reset(self) -> None:
+        """Reset state for each translation."""
+        self.indent_level = 0
+        self.in_invokeurl = False
+        self.in_sendmail = False
+        self.brace_stack = []  # Track opening braces and their contexts
+        self._sendmail_pending = False  # Saw "sendmail", waiting for "["
+        self._python_lines: list[str] = []
+        self._deluge_lines: list[int] = []  # Deluge line of each Python line
+        # (start, end, target, names read, indent level) of each invokeurl
+        # block assigned to a plain variable, by Python line index
+        self._invokeurl_calls: list[tuple[int, int, str, set[str], int]] = []
+        self._invokeurl_call: tuple[int, str, set[str], int] | None = None
+
+    def _translate_line(self, tokens: list[Token]) -> str:
+        """Translate a single logical line of Deluge tokens."""
+        first = tokens[0][VALUE]
+        count = len(tokens)
+        opens_block = tokens[-1][VALUE] == "{"
+
+        # A sendmail keyword only opens a block if "[" follows immediately
+        sendmail_pending = self._sendmail_pending
+        self._sendmail_pending = False
 
         # Handle closing braces first (decrease indent before processing)
-        if line == "}":
-            self.indent_level -= 1
-            if self.brace_stack:
-                self.brace_stack.pop()
+        if count == 1 and first == "}":
+            self._close_block()
             return ""
 
         # Handle control structures that end with opening brace
-        if line.startswith("if(") or line.startswith("if "):
-            result = self._translate_if(line)
-            if line.rstrip().endswith("{"):
-                self.indent_level += 1
-                self.brace_stack.append("if")
+        if first == "if":
+            result = self._translate_if(tokens)
+            if opens_block:
+                self._open_block("if")
             return result
-        elif line.startswith("for each"):
-            result = self._translate_for_each(line)
-            if line.rstrip().endswith("{"):
-                self.indent_level += 1
-                self.brace_stack.append("for")
+        elif first == "for" and count > 1 and tokens[1][VALUE] == "each":
+            result = self._translate_for_each(tokens)
+            if opens_block:
+                self._open_block("for")
             return result
-        elif line.startswith("while("):
-            result = self._translate_while(line)
-            if line.rstrip().endswith("{"):
-                self.indent_level += 1
-                self.brace_stack.append("while")
+        elif first == "while":
+            result = self._translate_while(tokens)
+            if opens_block:
+                self._open_block("while")
             return result
-        elif line.startswith("else"):
-            result = self._translate_else(line)
-            if line.rstrip().endswith("{"):
-                self.indent_level += 1
-                self.brace_stack.append("else")
+        elif first == "else":
+            result = self._translate_else(tokens)
+            if opens_block:
+                self._open_block("else")
             return result
 
         # Handle standalone opening braces
-        elif line == "{":
-            self.indent_level += 1
-            self.brace_stack.append("block")
+        elif count == 1 and first == "{":
+            self._open_block("block")
             return ""
 
         # Handle sendmail blocks (check before invokeurl since they can both use ];)
-        elif line.startswith("sendmail["):
-            # Handle sendmail[ on the same line
-            self.in_sendmail = True
-            return self._translate_sendmail_start(line)
-        elif line.startswith("sendmail"):
-            return self._translate_sendmail_start(line)
-        elif line == "[" and hasattr(self, "_last_line") and self._last_line.startswith("sendmail"):
+        elif first == "sendmail" and tokens[0][KIND] == NAME:
+            if count > 1 and tokens[1][VALUE] == "[":
+                self.in_sendmail = True
+            else:
+                self._sendmail_pending = True
+            return self._translate_sendmail_start(tokens)
+        elif count == 1 and first == "[" and sendmail_pending:
             self.in_sendmail = True
             return ""  # Skip the opening bracket
-        elif (line == "];" or line == "];") and self.in_sendmail:
-            # Handle closing bracket with semicolon
-            return self._translate_sendmail_end()
-        elif line == "]" and self.in_sendmail:
-            return self._translate_sendmail_end()
-        elif self.in_sendmail and ":" in line:
-            return self._translate_sendmail_param(line)
+        elif first == "]" and self.in_sendmail:
+            return self._translate_sendmail_end(tokens)
+        elif self.in_sendmail and self._find(tokens, ":") != -1:
+            return self._translate_sendmail_param(tokens)
 
         # Handle invokeurl blocks (check this early, before error detection)
-        elif line.startswith("invokeurl"):
-            return self._translate_invokeurl_start(line)
-        elif line == "];":
-            return self._translate_invokeurl_end()
-        elif self.in_invokeurl and ":" in line:
-            return self._translate_invokeurl_param(line)
+        elif first == "invokeurl":
+            return self._translate_invokeurl_start(tokens)
+        elif first == "]" and (count == 1 or (count == 2 and tokens[1][VALUE] == ";")):
+            return self._translate_invokeurl_end(tokens)
+        elif self.in_invokeurl and self._find(tokens, ":") != -1:
+            return self._translate_invokeurl_param(tokens)
 
         # Handle function calls and statements
-        elif line.startswith("info "):
-            return self._translate_info(line)
-        elif line.startswith("return"):
-            return self._translate_return(line)
+        elif first == "info" and count > 1 and tokens[1][WS]:
+            return self._translate_info(tokens)
+        elif first == "return":
+            return self._translate_return(tokens)
 
         # Handle variable declarations and assignments
-        elif "=" in line and not any(op in line for op in ["==", "!=", "<=", ">="]):
+        elif self._find_assignment(tokens) != -1:
             # Check if this is an invokeurl assignment
-            if "invokeurl" in line:
-                return self._translate_invokeurl_start(line)
+            if any(token[KIND] == NAME and token[VALUE] == "invokeurl" for token in tokens):
+                return self._translate_invokeurl_start(tokens)
             else:
-                return self._translate_assignment(line)
+                return self._translate_assignment(tokens)
 
         # Handle statements ending with semicolon
-        elif line.endswith(";"):
-            return self._translate_statement(line)
+        elif tokens[-1][VALUE] == ";":
+            return self._translate_statement(tokens)
 
         # If we reach here, the line couldn't be translated
-        # But skip error for invokeurl context or comment lines
-        elif (
-            line.strip()
-            and not line.startswith("//")
-            and not line.startswith("#")
-            and not self.in_invokeurl
-        ):
-            raise ValueError(f"Unable to translate Deluge syntax: '{line}'")
+        # But skip error for invokeurl context
+        elif not self.in_invokeurl:
+            raise ValueError(f"Unable to translate Deluge syntax: '{render(tokens)}'")
 
         return ""
 
+    def _open_block(self, kind: str) -> None:
+        """Enter a brace-delimited block."""
+        self.indent_level += 1
+        self.brace_stack.append(kind)
+
+    def _close_block(self) -> None:
+        """Leave the innermost brace-delimited block."""
+        self.indent_level -= 1
+        if self.brace_stack:
+            self.brace_stack.pop()
+
     def _get_indent(self) -> str:
         """Get current indentation string."""
         return "    " * self.indent_level
 
-    def _translate_assignment(self, line: str) -> str:
+    @staticmethod
+    def _find(tokens: list[Token], value: str) -> int:
+        """Return the index of the first OP token with the given value, or -1."""
+        for index, token in enumerate(tokens):
+            if token[KIND] == OP and token[VALUE] == value:
+                return index
+        return -1
+
+    @staticmethod
+    def _find_assignment(tokens: list[Token]) -> int:
+        """Return the index of a top-level assignment operator, or -1."""
+        depth = 0
+        for index, token in enumerate(tokens):
+            if token[KIND] != OP:
+                continue
+            value = token[VALUE]
+            if value in _OPENING:
+                depth += 1
+            elif value in _CLOSING:
+                depth -= 1
+            elif depth == 0 and value in _ASSIGNMENT_OPS:
+                return index
+        return -1
+
+    @staticmethod
+    def _strip_terminator(tokens: list[Token], value: str) -> list[Token]:
+        """Drop trailing OP tokens with the given value (e.g. ';' or ',')."""
+        end = len(tokens)
+        while end and tokens[end - 1][KIND] == OP and tokens[end - 1][VALUE] == value:
+            end -= 1
+        return tokens[:end]
+
+    @staticmethod
+    def _render(tokens: list[Token], wrap_strings: bool = False, condition: bool = False) -> str:
+        """Render tokens as Python source.
+
+        Logical operators are always translated. String literals are wrapped
+        in deluge_string() when wrap_strings is set, and conditions also get
+        null checks and boolean literals translated.
+        """
+        parts: list[str] = []
+        append = parts.append
+        force_space = False
+
+        for kind, value, _line, ws in tokens:
+            if kind == NAME:
+                if condition:
+                    if value in _NULL_WORDS and parts and parts[-1] in _NULL_COMPARISONS:
+                        # "x == null" becomes "x is None"
+                        parts[-1] = _NULL_COMPARISONS[parts[-1]]
+                        parts[-2] = parts[-2] or " "
+                        value = "None"
+                        ws = " "
+                    elif value == "true" or value == "false":
+                        value = "True" if value == "true" else "False"
+            elif kind == OP:
+                if value == "&&" or value == "||":
+                    value = "and" if value == "&&" else "or"
+                    ws = ws or " "
+                    append(ws + value)
+                    force_space = True
+                    continue
+                if condition and (value == "==" or value == "!="):
+                    # Kept separate from its spacing so a following null can rewrite it
+                    append(ws or " " if force_space else ws)
+                    append(value)
+                    force_space = False
+                    continue
+            elif kind == STRING and wrap_strings:
+                value = f"deluge_string({value})"
+
+            if force_space:
+                ws = ws or " "
+                force_space = False
+            append(ws + value)
+
+        if parts:
+            parts[0] = parts[0].lstrip()
+        return "".join(parts)
+
+    @staticmethod
+    def _condition_tokens(tokens: list[Token]) -> list[Token]:
+        """Strip a trailing '{' and one pair of enclosing parentheses."""
+        if tokens and tokens[-1][KIND] == OP and tokens[-1][VALUE] == "{":
+            tokens = tokens[:-1]
+        if len(tokens) >= 2 and tokens[0][VALUE] == "(" and tokens[-1][VALUE] == ")":
+            depth = 0
+            for index, token in enumerate(tokens):
+                if token[KIND] != OP:
+                    continue
+                if token[VALUE] in _OPENING:
+                    depth += 1
+                elif token[VALUE] in _CLOSING:
+                    depth -= 1
+                    if depth == 0:
+                        if index == len(tokens) - 1:
+                            return tokens[1:-1]
+                        break
+        return tokens
+
+    def _translate_assignment(self, tokens: list[Token]) -> str:
         """Translate variable assignment."""
-        line = line.rstrip(";")
-
-        # Handle special constructors
-        if "Map()" in line:
-            line = line.replace("Map()", "Map()")
-        elif "List()" in line:
-            line = line.replace("List()", "List()")
-        elif "list()" in line:
-            line = line.replace("list()", "List()")
-        elif "Collection()" in line:
-            line = line.replace("Collection()", "Map()")
-
-        # Handle string literals - wrap in deluge_string
-        line = self._wrap_string_literals(line)
-
-        # Handle method calls on strings
-        line = self._translate_string_methods(line)
-
-        # Handle logical operators
-        line = self._translate_logical_operators(line)
-
-        return self._get_indent() + line
-
-    def _translate_if(self, line: str) -> str:
+        converted = self._convert_constructors(self._strip_terminator(tokens, ";"))
+
+        # Wrap string literals in deluge_string and translate logical operators
+        return self._get_indent() + self._render(converted, wrap_strings=True)
+
+    @staticmethod
+    def _convert_constructors(tokens: list[Token]) -> list[Token]:
+        """Map legacy constructors such as list() and Collection() to List() and Map()."""
+        converted = list(tokens)
+        for index in range(len(converted) - 2):
+            token = converted[index]
+            if (
+                token[KIND] == NAME
+                and token[VALUE] in _CONSTRUCTORS
+                and converted[index + 1][VALUE] == "("
+                and converted[index + 2][VALUE] == ")"
+                and (index == 0 or converted[index - 1][VALUE] != ".")
+            ):
+                converted[index] = (NAME, _CONSTRUCTORS[token[VALUE]], *token[2:])
+        return converted
+
+    def _translate_if(self, tokens: list[Token]) -> str:
         """Translate if statement."""
-        # Handle both 'if(' and 'if ' syntax
-        if line.startswith("if("):
-            # Extract condition from if(condition) {
-            paren_start = line.find("(")
-            paren_end = line.rfind(")")
-            if paren_start != -1 and paren_end != -1:
-                condition = line[paren_start + 1 : paren_end]
-            else:
-                condition = line[3:].rstrip("{").strip()
-        else:
-            # Handle 'if ' syntax
-            condition = line[3:].rstrip("{").strip()
-
-        # Translate condition
-        condition = self._translate_condition(condition)
-
+        condition = self._render(self._condition_tokens(tokens[1:]), condition=True)
         return self._get_indent() + f"if {condition}:"
 
-    def _translate_else(self, line: str) -> str:
+    def _translate_else(self, tokens: list[Token]) -> str:
         """Translate else statement."""
-        line_clean = line.rstrip("{").strip()
-
         # else/elif should be at the same level as the corresponding if
         # When we encounter else, we want to be at the current indent level
         # (which should be correct after processing the closing brace)
         indent_str = self._get_indent()
 
-        if line_clean == "else":
-            return indent_str + "else:"
-        elif line_clean.startswith("else if"):
+        if len(tokens) > 1 and tokens[1][VALUE] == "if":
             # else if case
-            condition = line_clean[7:].strip()  # Remove 'else if'
-            if condition.startswith("(") and condition.endswith(")"):
-                condition = condition[1:-1]
-            condition = self._translate_condition(condition)
+            condition = self._render(self._condition_tokens(tokens[2:]), condition=True)
             return indent_str + f"elif {condition}:"
-        else:
-            return indent_str + "else:"
+        return indent_str + "else:"
 
-    def _translate_for_each(self, line: str) -> str:
+    def _translate_for_each(self, tokens: list[Token]) -> str:
         """Translate for each loop."""
         # Extract variable and iterable from 'for each var in iterable'
-        line_clean = line.rstrip("{").strip()
-        match = re.match(r"for each\s+(\w+)\s+in\s+(.+)", line_clean)
-        if match:
-            var_name = match.group(1)
-            iterable = match.group(2).strip()
-            return self._get_indent() + f"for {var_name} in {iterable}:"
-        return self._get_indent() + line_clean + ":"
-
-    def _translate_while(self, line: str) -> str:
+        body = self._strip_terminator(tokens, "{")
+        if len(body) > 4 and body[2][KIND] == NAME and body[3][VALUE] == "in":
+            iterable = self._render(body[4:])
+            return self._get_indent() + f"for {body[2][VALUE]} in {iterable}:"
+        return self._get_indent() + self._render(body) + ":"
+
+    def _translate_while(self, tokens: list[Token]) -> str:
         """Translate while loop."""
-        condition = line[6:].rstrip("{").strip()
-        if condition.startswith("(") and condition.endswith(")"):
-            condition = condition[1:-1]
-        condition = self._translate_condition(condition)
+        condition = self._render(self._condition_tokens(tokens[1:]), condition=True)
         return self._get_indent() + f"while {condition}:"
 
-    def _translate_condition(self, condition: str) -> str:
-        """Translate condition expressions."""
-        # Handle method calls
-        condition = self._translate_string_methods(condition)
-
-        # Handle null checks
-        condition = condition.replace("== NULL", "is None")
-        condition = condition.replace("!= NULL", "is not None")
-        condition = condition.replace("== null", "is None")
-        condition = condition.replace("!= null", "is not None")
-
-        # Handle boolean values
-        condition = condition.replace(" true", " True")
-        condition = condition.replace(" false", " False")
-
-        # Handle logical operators
-        condition = condition.replace("&&", " and ")
-        condition = condition.replace("||", " or ")
-
-        return condition
-
-    def _translate_invokeurl_start(self, line: str) -> str:
+    def _translate_invokeurl_start(self, tokens: list[Token]) -> str:
         """Start of invokeurl block."""
+        self.in_invokeurl = True
         # Extract variable assignment if present
-        if "=" in line:
-            var_name = line.split("=")[0].strip()
-            self.in_invokeurl = True
+        equals = self._find_assignment(tokens)
+        if equals > 0:
+            if equals == 1 and tokens[0][KIND] == NAME:
+                start = len(self._python_lines)
+                self._invokeurl_call = (start, tokens[0][VALUE], set(), self.indent_level)
+            var_name = self._render(tokens[:equals])
             return self._get_indent() + f"{var_name} = _invokeurl({{"
-        else:
-            self.in_invokeurl = True
-            return self._get_indent() + "_invokeurl({"
+        return self._get_indent() + "_invokeurl({"
 
-    def _translate_invokeurl_param(self, line: str) -> str:
+    def _translate_invokeurl_param(self, tokens: list[Token]) -> str:
         """Translate invokeurl parameter."""
-        line = line.strip()
-        if line.endswith(","):
-            line = line[:-1]
+        key, value_tokens = self._split_invokeurl_param(tokens)
+        if self._invokeurl_call is not None:
+            # Variables read by the call, leaving out attribute names
+            self._invokeurl_call[2].update(
+                token[VALUE]
+                for index, token in enumerate(value_tokens)
+                if token[KIND] == NAME and (index == 0 or value_tokens[index - 1][VALUE] != ".")
+            )
+        return self._get_indent() + f"    {key}: {self._render(value_tokens)},"
+
+    def _split_invokeurl_param(self, tokens: list[Token]) -> tuple[str, list[Token]]:
+        """Split an invokeurl parameter into a quoted key and its value tokens.
+
+        Bare constants such as ``type: POST`` and empty values are turned
+        into string literal tokens.
+        """
+        tokens = self._strip_terminator(tokens, ",")
 
         # Split on first ':'
-        parts = line.split(":", 1)
-        if len(parts) == 2:
-            key = parts[0].strip()
-            value = parts[1].strip()
-
-            # Wrap string values in quotes if not already quoted
-            if not (value.startswith('"') and value.endswith('"')):
-                if not value.startswith("(") and not value.isdigit():
-                    # Check if it's a variable reference or function call
-                    # Don't quote if it contains variable-like patterns or method calls
-                    is_variable_reference = (
-                        # Has method calls or property access
-                        any(c in value for c in [".", "(", ")", "+", "-", "*", "/"])
-                        or
-                        # Boolean values
-                        value in ["true", "false", "True", "False"]
-                        or
-                        # None/null values
-                        value in ["null", "None", "NULL"]
-                        or
-                        # Variables that start with lowercase (common convention)
-                        (
-                            value.replace("_", "").replace("-", "").isalnum()
-                            and value[0].islower()
-                            and len(value) > 1
-                        )
-                    )
-
-                    if not is_variable_reference:
-                        value = f'"{value}"'
-
-            return self._get_indent() + f'    "{key}": {value},'
-
-        return self._get_indent() + f"    {line},"
-
-    def _translate_invokeurl_end(self) -> str:
+        colon = self._find(tokens, ":")
+        key_tokens = tokens[:colon]
+        value_tokens = tokens[colon + 1 :]
+        line = tokens[colon][LINE]
+
+        if len(key_tokens) == 1 and key_tokens[0][KIND] == STRING:
+            key = key_tokens[0][VALUE]
+        else:
+            key = f'"{self._render(key_tokens)}"'
+
+        if not value_tokens:
+            value_tokens = [(STRING, '""', line, "")]
+        elif len(value_tokens) == 1 and value_tokens[0][KIND] == NAME:
+            # Bare words are variable references unless they look like constants
+            # (e.g. "type: POST"), which are sent as string literals
+            value = value_tokens[0][VALUE]
+            is_variable_reference = value in _LITERAL_WORDS or (
+                value[0].islower() and len(value) > 1
+            )
+            if not is_variable_reference:
+                value_tokens = [(STRING, f'"{value}"', line, "")]
+
+        return key, value_tokens
+
+    def _translate_invokeurl_end(self, tokens: list[Token]) -> str:
         """End of invokeurl block."""
         self.in_invokeurl = False
+        call = self._invokeurl_call
+        if call is not None:
+            start, target, names, indent = call
+            self._invokeurl_calls.append((start, len(self._python_lines), target, names, indent))
+            self._invokeurl_call = None
         return self._get_indent() + "})"
 
-    def _translate_info(self, line: str) -> str:
+    def _translate_info(self, tokens: list[Token]) -> str:
         """Translate info statement."""
-        content = line[5:].rstrip(";").strip()
+        content = self._render(self._strip_terminator(tokens[1:], ";"))
         return self._get_indent() + f"info({content})"
 
-    def _translate_return(self, line: str) -> str:
+    def _translate_return(self, tokens: list[Token]) -> str:
         """Translate return statement."""
-        content = line[6:].rstrip(";").strip()
-        content = self._wrap_string_literals(content)
+        content = self._render(self._strip_terminator(tokens[1:], ";"), wrap_strings=True)
+        if not content:
+            return self._get_indent() + "return"
         return self._get_indent() + f"return {content}"
 
-    def _translate_statement(self, line: str) -> str:
+    def _translate_statement(self, tokens: list[Token]) -> str:
         """Translate general statement."""
-        line = line.rstrip(";")
-        line = self._translate_string_methods(line)
-        line = self._translate_logical_operators(line)
-        return self._get_indent() + line
-
-    def _translate_logical_operators(self, text: str) -> str:
-        """Translate logical operators from Deluge to Python."""
-        text = text.replace("&&", " and ")
-        text = text.replace("||", " or ")
-        return text
-
-    def _wrap_string_literals(self, text: str) -> str:
-        """Wrap string literals with deluge_string() calls."""
-
-        # Handle double quoted strings with proper escape handling
-        text = re.sub(r'"((?:[^"\\]|\\.)*)\"', lambda m: f'deluge_string("{m.group(1)}")', text)
-
-        # Handle single quoted strings with proper escape handling
-        text = re.sub(r"'((?:[^'\\]|\\.)*)'", lambda m: f"deluge_string('{m.group(1)}')", text)
-
-        return text
-
-    def _translate_string_methods(self, text: str) -> str:
-        """Translate string method calls to use Deluge string methods."""
-        # Common method translations
-        method_map = {
-            ".trim()": ".trim()",
-            ".length()": ".length()",
-            ".contains(": ".contains(",
-            ".startsWith(": ".startsWith(",
-            ".endsWith(": ".endsWith(",
-            ".toLowerCase()": ".toLowerCase()",
-            ".toUpperCase()": ".toUpperCase()",
-            ".substring(": ".substring(",
-            ".subString(": ".subString(",
-            ".subText(": ".subText(",
-            ".indexOf(": ".indexOf(",
-            ".lastIndexOf(": ".lastIndexOf(",
-            ".replaceAll(": ".replaceAll(",
-            ".replaceFirst(": ".replaceFirst(",
-            ".toList(": ".toList(",
-            ".toMap()": ".toMap()",
-            ".size()": ".size()",
-            ".isEmpty()": ".isEmpty()",
-            ".get(": ".get(",
-            ".put(": ".put(",
-            ".add(": ".add(",
-            ".remove(": ".remove(",
-            ".clear()": ".clear()",
-        }
-
-        for deluge_method, python_method in method_map.items():
-            text = text.replace(deluge_method, python_method)
-
-        return text
-
-    def _translate_sendmail_start(self, line: str) -> str:
-        """Start translating a sendmail block."""
-        # Don't set in_sendmail yet - wait for the opening bracket
-        self.sendmail_params = {}
+        return self._get_indent() + self._render(self._strip_terminator(tokens, ";"))
 
+    def _translate_sendmail_start(self, tokens: list[Token]) -> str:
+        """Start translating a sendmail block."""
         # Return the beginning of sendmail function call
-        return "sendmail("
+        return self._get_indent() + "sendmail("
 
-    def _translate_sendmail_param(self, line: str) -> str:
+    def _translate_sendmail_param(self, tokens: list[Token]) -> str:
         """Translate a sendmail parameter line."""
-        line = line.strip()
-
-        if ":" in line:
-            key, value = line.split(":", 1)
-            key = key.strip()
-            value = value.strip()
+        key, value_tokens = self._split_sendmail_param(tokens)
+        value = self._render(value_tokens)
+
+        # Handle Python keywords by using **{} syntax for them
+        if key in _SENDMAIL_RESERVED:
+            return self._get_indent() + f'    **{{"{key}": {value}}},'
+        return self._get_indent() + f"    {key}={value},"
+
+    def _split_sendmail_param(self, tokens: list[Token]) -> tuple[str, list[Token]]:
+        """Split a sendmail parameter into an unquoted key and its value tokens."""
+        tokens = self._strip_terminator(tokens, ",")
+        colon = self._find(tokens, ":")
+        key_tokens = tokens[:colon]
+
+        # Remove quotes from key if present
+        if len(key_tokens) == 1 and key_tokens[0][KIND] == STRING:
+            key = key_tokens[0][VALUE][1:-1]
+        else:
+            key = self._render(key_tokens)
+        return key, tokens[colon + 1 :]
 
-            # Remove quotes from key if present
-            if key.startswith('"') and key.endswith('"'):
-                key = key[1:-1]
+    def _translate_sendmail_end(self, tokens: list[Token]) -> str:
+        """End translating a sendmail block."""
+        self.in_sendmail = False
+        return self._get_indent() + ")"
 
-            # Handle value processing
-            if value.startswith('"') and value.endswith('"'):
-                # String literal
-                processed_value = value
-            else:
-                # Expression that needs evaluation
-                processed_value = self._translate_string_methods(value)
 
-            # Handle Python keywords by using **{} syntax for them
-            if key in ["from", "to", "import", "class", "def", "if", "else", "for", "while"]:
-                return f'    **{{"{key}": {processed_value}}},'
-            else:
-                return f"    {key}={processed_value},"
+def _indent(python_line: str) -> int:
+    """Return the indentation width of a translated line."""
+    return len(python_line) - len(python_line.lstrip(" "))
 
-        return ""
 
-    def _translate_sendmail_end(self) -> str:
-        """End translating a sendmail block."""
-        self.in_sendmail = False
-        return ")"
+# invokeurl types sent through the shared client besides GET and POST
+_OTHER_HTTP_METHODS = frozenset(["PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"])
 
 
 def _invokeurl(params: dict[str, Any]) -> Any:  # pyright: ignore[reportUnusedFunction]
@@ -513,16 +577,22 @@ def _invokeurl(params: dict[str, Any]) -> Any:  # pyright: ignore[reportUnusedFu
         return getUrl(url, headers=headers)
     elif request_type == "POST":
         return postUrl(url, body=request_body, headers=headers)
+    elif request_type in _OTHER_HTTP_METHODS:
+        from .http_client import default_client
+
+        response = default_client.request(request_type, url, json=request_body, headers=headers)
+        return response.text
     else:
-        # For other HTTP methods, use requests directly
-        try:
-            import requests
-
-            method = request_type.lower()
-            if hasattr(requests, method):
-                response = getattr(requests, method)(url, json=request_body, headers=headers)
-                return response.text
-            else:
-                return "Unsupported HTTP method"
-        except ImportError:
-            return "Requests module not available"
+        return "Unsupported HTTP method"
+
+
+def _invokeurl_all(params_list: list[dict[str, Any]]) -> list[Any]:  # pyright: ignore[reportUnusedFunction]
+    """Execute independent invokeurl calls one after another."""
+    return [_invokeurl(params) for params in params_list]
+
+
+def _invokeurl_concurrent(params_list: list[dict[str, Any]]) -> list[Any]:  # pyright: ignore[reportUnusedFunction]
+    """Execute independent invokeurl calls concurrently on the shared client."""
+    from .http_client import default_client
+
+    return default_client.fan_out(_invokeurl, params_list)
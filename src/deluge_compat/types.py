@@ -1,19 +1,128 @@
 """Deluge-compatible data types."""
 
 import json
-import re
+from collections.abc import Iterable
 from datetime import datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any, SupportsIndex
+
+from .dates import parse_date
+from .regex import regex_matches, regex_replace
+
+if TYPE_CHECKING:
+    from .json_stream import JSONListStream
+
+
+_dict_get = dict.get
 
 
 class Map(dict):
-    """Deluge Map type - a dictionary with Deluge-specific methods."""
+    """Deluge Map type - a dictionary with Deluge-specific methods.
+
+    Plain string values are converted to DelugeStrings when they are
+    stored, so ``get`` and item access are plain dictionary lookups.
+
+    The JSON text used for string concatenation is cached until the map or
+    a Map or List nested in it changes.
+    """
+
+    # Set while a cached serialization depends on this map; every mutation
+    # clears it (see _json_text)
+    _json_stamp: object | None = None
+    _json_cache: tuple[str, Any] | None = None
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__()
+        if args or kwargs:
+            self.update(*args, **kwargs)
+
+    def _changed(self) -> None:
+        self._json_stamp = None
+        self._json_cache = None
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        if isinstance(value, str) and not isinstance(value, DelugeString):
+            value = DelugeString(value)
+        dict.__setitem__(self, key, value)
+        if self._json_stamp is not None:
+            self._changed()
+
+    def __delitem__(self, key: Any) -> None:
+        dict.__delitem__(self, key)
+        if self._json_stamp is not None:
+            self._changed()
+
+    def pop(self, key: Any, *default: Any) -> Any:
+        """Remove key and return its value, or default if it is missing."""
+        value = dict.pop(self, key, *default)
+        if self._json_stamp is not None:
+            self._changed()
+        return value
+
+    def popitem(self) -> tuple[Any, Any]:
+        """Remove and return the last inserted key-value pair."""
+        item = dict.popitem(self)
+        if self._json_stamp is not None:
+            self._changed()
+        return item
+
+    def clear(self) -> None:
+        """Remove all key-value pairs."""
+        dict.clear(self)
+        if self._json_stamp is not None:
+            self._changed()
+
+    def update(self, *args: Any, **kwargs: Any) -> None:  # type: ignore[override]
+        """Add key-value pairs, wrapping string values as DelugeStrings."""
+        if len(args) > 1:
+            raise TypeError(f"update expected at most 1 argument, got {len(args)}")
+        # dict.update bypasses __setitem__, so pairs are stored one by one
+        if args:
+            other = args[0]
+            if isinstance(other, LazyMap):
+                # Its raw storage still holds unconverted JSON values
+                pairs = other.items()
+            elif isinstance(other, dict):
+                pairs = dict.items(other)
+            elif hasattr(other, "keys"):
+                pairs = ((key, other[key]) for key in other.keys())
+            else:
+                pairs = other
+            for key, value in pairs:
+                self[key] = value
+        for key, value in kwargs.items():
+            self[key] = value
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        """Insert key with a default value if missing and return its value."""
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def __ior__(self, other: Any) -> "Map":  # type: ignore[override]
+        self.update(other)
+        return self
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Get value by key, or default if it is missing.
+
+        Stored strings are already DelugeStrings, so only a string default
+        needs wrapping; reads without a default go straight to dict.get.
+        """
+        if default is None:
+            return _dict_get(self, key)
+        if isinstance(default, str) and not isinstance(default, DelugeString):
+            default = DelugeString(default)
+        return _dict_get(self, key, default)
 
     def put(self, key: Any, value: Any) -> None:
         """Add a key-value pair to the map."""
-        self[key] = value
+        if isinstance(value, str) and not isinstance(value, DelugeString):
+            value = DelugeString(value)
+        dict.__setitem__(self, key, value)
+        if self._json_stamp is not None:
+            self._changed()
 
-    def putAll(self, other_map: "Map") -> None:
+    def putAll(self, other_map: dict[Any, Any]) -> None:
         """Add all key-value pairs from another map."""
         self.update(other_map)
 
@@ -33,13 +142,6 @@ class Map(dict):
         """Check if the map contains a value."""
         return value in self.values()
 
-    def get(self, key: Any, default: Any = None) -> Any:
-        """Get value by key, wrapping strings as DelugeStrings."""
-        value = super().get(key, default)
-        if isinstance(value, str) and not isinstance(value, DelugeString):
-            return DelugeString(value)
-        return value
-
     def keys(self) -> "List":  # type: ignore[override]
         """Get all keys as a Deluge List."""
         return List(super().keys())
@@ -48,33 +150,137 @@ class Map(dict):
         """Get a value and treat it as JSON."""
         return self.get(key)
 
+    def _json_text(self) -> str:
+        """Serialize the map, reusing the last result while nothing in it changed.
+
+        The cache holds the text and the nested Maps and Lists with their
+        stamps: None until the map is serialized twice without changing,
+        False if it holds plain dicts or lists that cannot be tracked.
+        """
+        cache = self._json_cache
+        nested: Any = None
+        if cache is not None:
+            text, nested = cache
+            if nested:
+                for container, stamp in nested:
+                    if container._json_stamp is not stamp:
+                        nested = None
+                        break
+                else:
+                    return text
+            elif nested is None:
+                # Serialized again unchanged, so nested values are worth
+                # tracking; a map changed before every concatenation never
+                # pays for the walk
+                nested = _json_dependencies(self)
+                if nested is None:
+                    nested = False
+            elif nested == []:
+                return text
+        text = _encode_json(self)
+        if self._json_stamp is None:
+            self._json_stamp = object()
+        self._json_cache = (text, nested)
+        return text
+
     def __add__(self, other: Any) -> "DelugeString":
         """Support Map + string concatenation by converting Map to JSON."""
-        import json
-
         if isinstance(other, str):
-            result = json.dumps(dict(self)) + other
-            return DelugeString(result)
+            return DelugeString(self._json_text() + other)
         return NotImplemented
 
     def __radd__(self, other: Any) -> "DelugeString":
         """Support string + Map concatenation by converting Map to JSON."""
-        import json
-
         if isinstance(other, str):
-            result = other + json.dumps(dict(self))
-            return DelugeString(result)
+            return DelugeString(other + self._json_text())
         return NotImplemented
 
 
 class List(list):
-    """Deluge List type - a list with Deluge-specific methods."""
+    """Deluge List type - a list with Deluge-specific methods.
+
+    Plain strings are converted to DelugeStrings when they are stored, so
+    reading and iterating never allocate and run at native list speed.
+    """
+
+    # Set while a cached Map serialization depends on this list; every
+    # mutation clears it (see Map._json_text)
+    _json_stamp: object | None = None
+
+    def __init__(self, iterable: Iterable[Any] = (), /):
+        super().__init__(map(_wrap_string, iterable))
+
+    def append(self, element: Any) -> None:
+        """Append an element, wrapping strings as DelugeStrings."""
+        if isinstance(element, str) and not isinstance(element, DelugeString):
+            element = DelugeString(element)
+        list.append(self, element)
+        if self._json_stamp is not None:
+            self._json_stamp = None
+
+    def extend(self, iterable: Iterable[Any]) -> None:
+        """Append all elements, wrapping strings as DelugeStrings."""
+        super().extend(map(_wrap_string, iterable))
+        if self._json_stamp is not None:
+            self._json_stamp = None
+
+    def insert(self, index: SupportsIndex, element: Any) -> None:
+        """Insert an element, wrapping strings as DelugeStrings."""
+        super().insert(index, _wrap_string(element))
+        if self._json_stamp is not None:
+            self._json_stamp = None
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        if isinstance(index, slice):
+            super().__setitem__(index, map(_wrap_string, value))
+        else:
+            super().__setitem__(index, _wrap_string(value))
+        if self._json_stamp is not None:
+            self._json_stamp = None
+
+    def __delitem__(self, index: Any) -> None:
+        super().__delitem__(index)
+        if self._json_stamp is not None:
+            self._json_stamp = None
+
+    def __iadd__(self, other: Iterable[Any]) -> "List":  # type: ignore[override]
+        self.extend(other)
+        return self
+
+    def __imul__(self, count: SupportsIndex) -> "List":  # type: ignore[override]
+        super().__imul__(count)
+        if self._json_stamp is not None:
+            self._json_stamp = None
+        return self
+
+    def pop(self, index: SupportsIndex = -1) -> Any:
+        """Remove and return the element at index."""
+        value = super().pop(index)
+        if self._json_stamp is not None:
+            self._json_stamp = None
+        return value
+
+    def remove(self, element: Any) -> None:
+        """Remove the first occurrence of element."""
+        super().remove(element)
+        if self._json_stamp is not None:
+            self._json_stamp = None
+
+    def reverse(self) -> None:
+        """Reverse the list in place."""
+        super().reverse()
+        if self._json_stamp is not None:
+            self._json_stamp = None
 
     def add(self, element: Any) -> None:
         """Add an element to the list."""
-        self.append(element)
+        if isinstance(element, str) and not isinstance(element, DelugeString):
+            element = DelugeString(element)
+        list.append(self, element)
+        if self._json_stamp is not None:
+            self._json_stamp = None
 
-    def addAll(self, other_list: "List") -> None:
+    def addAll(self, other_list: list[Any]) -> None:
         """Add all elements from another list."""
         self.extend(other_list)
 
@@ -85,9 +291,12 @@ class List(list):
 
     def removeAll(self, remove_list: "List") -> None:
         """Remove all elements that are in remove_list."""
-        for item in remove_list:
-            while item in self:
-                self.remove(item)
+        remove_keys = {_membership_key(item) for item in remove_list}
+        if remove_keys:
+            kept = [item for item in self if _membership_key(item) not in remove_keys]
+            list.__setitem__(self, slice(None), kept)
+            if self._json_stamp is not None:
+                self._json_stamp = None
 
     def get(self, index: int) -> Any:
         """Get element at index."""
@@ -110,32 +319,30 @@ class List(list):
     def clear(self) -> None:
         """Remove all elements."""
         super().clear()
+        if self._json_stamp is not None:
+            self._json_stamp = None
 
     def sort(self, ascending: bool = True) -> None:  # type: ignore[override]
         """Sort the list."""
         super().sort(reverse=not ascending)
+        if self._json_stamp is not None:
+            self._json_stamp = None
 
     def distinct(self) -> "List":
-        """Return a new list with unique elements."""
+        """Return a new list with unique elements, keeping first occurrences."""
         seen = set()
         result = List()
         for item in self:
-            if item not in seen:
-                seen.add(item)
-                result.add(item)
+            key = _membership_key(item)
+            if key not in seen:
+                seen.add(key)
+                list.append(result, item)
         return result
 
     def intersect(self, other_list: "List") -> "List":
-        """Return common elements between lists."""
-        return List([item for item in self if item in other_list])
-
-    def __iter__(self):
-        """Iterate over list items, wrapping strings as DelugeStrings."""
-        for item in super().__iter__():
-            if isinstance(item, str) and not isinstance(item, DelugeString):
-                yield DelugeString(item)
-            else:
-                yield item
+        """Return the elements of this list that also occur in other_list."""
+        other_keys = {_membership_key(item) for item in other_list}
+        return List([item for item in self if _membership_key(item) in other_keys])
 
     def sublist(self, start_index: int, end_index: int | None = None) -> "List":
         """Return a sublist."""
@@ -271,16 +478,19 @@ class DelugeString(str):
         return self.lower() == other.lower()
 
     def matches(self, regex: str) -> bool:
-        """Check if string matches regex pattern."""
-        return bool(re.search(regex, self))
+        """Check if the whole string matches a (Java-style) regex pattern."""
+        return regex_matches(self, regex)
 
     def replaceAll(self, search: str, replace: str) -> "DelugeString":
-        """Replace all occurrences."""
-        return DelugeString(self.replace(search, replace))
+        """Replace all matches of the regex search.
+
+        ``$1`` or ``${name}`` in replace refer to groups of the match.
+        """
+        return DelugeString(regex_replace(self, search, replace))
 
     def replaceFirst(self, search: str, replace: str) -> "DelugeString":
-        """Replace first occurrence."""
-        return DelugeString(self.replace(search, replace, 1))
+        """Replace the first match of the regex search."""
+        return DelugeString(regex_replace(self, search, replace, 1))
 
     def toList(self, separator: str = ",") -> List:
         """Split string into a List."""
@@ -288,40 +498,25 @@ class DelugeString(str):
             return List(list(self))
         return List(self.split(separator))
 
-    def toMap(self) -> Map:
-        """Parse string as JSON into a Map."""
-        try:
-            data = json.loads(self)
-            if isinstance(data, dict):
-                result = _convert_json_to_deluge_types(data)
-                if isinstance(result, Map):
-                    return result
-                else:
-                    raise ValueError("Conversion did not produce a Map")
-            else:
-                raise ValueError("String does not represent a JSON object")
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Invalid JSON: {e}") from e
+    def toMap(self, lazy: bool = False) -> Map:
+        """Parse string as JSON into a Map.
+
+        With lazy set, nested objects and arrays are converted only when
+        first read (see :class:`LazyMap`).
+        """
+        result = _decode_lazy_json(self) if lazy else _decode_json(self)
+        if not isinstance(result, Map):
+            raise ValueError("String does not represent a JSON object")
+        return result
 
     def toDate(self) -> datetime:
-        """Parse string as date."""
-        # Try common date formats
-        formats = [
-            "%Y-%m-%d",
-            "%Y-%m-%dT%H:%M:%S",
-            "%Y-%m-%dT%H:%M:%SZ",
-            "%Y-%m-%d %H:%M:%S",
-            "%d-%m-%Y",
-            "%m/%d/%Y",
-        ]
-
-        for fmt in formats:
-            try:
-                return datetime.strptime(self, fmt)
-            except ValueError:
-                continue
+        """Parse string as date.
 
-        raise ValueError(f"Unable to parse date: {self}")
+        Accepts the formats in ``dates.DATE_FORMATS``: ISO dates and
+        date-times (with ``T``, a trailing ``Z`` or a space), ``dd-MM-yyyy``
+        and ``MM/dd/yyyy``.
+        """
+        return parse_date(self)
 
     def toTime(self) -> datetime:
         """Alias for toDate."""
@@ -356,20 +551,26 @@ class DelugeString(str):
             return parsed_json
         return parsed_json.get(key)
 
-    def toJSONList(self) -> List:
-        """Parse string as JSON array into List."""
-        try:
-            data = json.loads(self)
-            if isinstance(data, list):
-                result = _convert_json_to_deluge_types(data)
-                if isinstance(result, List):
-                    return result
-                else:
-                    raise ValueError("Conversion did not produce a List")
-            else:
-                raise ValueError("String does not represent a JSON array")
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Invalid JSON: {e}") from e
+    def toJSONList(self, lazy: bool = False) -> List:
+        """Parse string as JSON array into List.
+
+        With lazy set, elements are converted only when first read (see
+        :class:`LazyList`).
+        """
+        result = _decode_lazy_json(self) if lazy else _decode_json(self)
+        if not isinstance(result, List):
+            raise ValueError("String does not represent a JSON array")
+        return result
+
+    def streamJSONList(self) -> "JSONListStream":
+        """Iterate over a JSON array, converting one element at a time.
+
+        Unlike toJSONList, the converted array is never held in memory as a
+        whole, so ``for each`` over a huge export runs in constant memory.
+        """
+        from .json_stream import JSONListStream
+
+        return JSONListStream(self)
 
     def leftPad(self, pad_char: str, length: int) -> "DelugeString":
         """Pad string on the left."""
@@ -384,6 +585,208 @@ class DelugeString(str):
         return DelugeString(self.strip())
 
 
+class LazyMap(Map):
+    """Map over parsed JSON whose nested values are converted on first read.
+
+    The decoded document is kept as plain dicts, lists and strings; reading
+    a value converts just that value (nested objects become LazyMaps, arrays
+    LazyLists) and stores the result, so only the paths a script touches pay
+    for conversion. Reading all values at once (``values``, ``items``)
+    converts the remaining ones. Serialization works on the raw values
+    directly.
+    """
+
+    __slots__ = ("_pending",)
+
+    @classmethod
+    def _from_json(cls, raw: dict) -> "LazyMap":
+        result = dict.__new__(cls)
+        dict.update(result, raw)
+        result._pending = True
+        return result
+
+    def __getitem__(self, key: Any) -> Any:
+        value = dict.__getitem__(self, key)
+        if value.__class__ in _RAW_JSON and getattr(self, "_pending", False):
+            value = _lazy_json_value(value)
+            dict.__setitem__(self, key, value)
+        return value
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Get value by key, converting it on first read."""
+        if key in self:
+            return self[key]
+        return Map.get(self, key, default)
+
+    def _convert_all(self) -> None:
+        if getattr(self, "_pending", False):
+            for key, value in dict.items(self):
+                if value.__class__ in _RAW_JSON:
+                    dict.__setitem__(self, key, _lazy_json_value(value))
+            self._pending = False
+
+    def values(self):  # type: ignore[override]
+        """Return all values, converting any not yet read."""
+        self._convert_all()
+        return dict.values(self)
+
+    def items(self):  # type: ignore[override]
+        """Return all key-value pairs, converting any value not yet read."""
+        self._convert_all()
+        return dict.items(self)
+
+    def containValue(self, value: Any) -> bool:
+        """Check if the map contains a value."""
+        return value in self.values()
+
+    def pop(self, key: Any, *default: Any) -> Any:
+        """Remove key and return its converted value."""
+        if key in self:
+            value = self[key]
+            del self[key]
+            return value
+        return super().pop(key, *default)
+
+    def popitem(self) -> tuple[Any, Any]:
+        """Remove and return the last inserted key-value pair, converting its value."""
+        key, value = super().popitem()
+        if value.__class__ in _RAW_JSON and getattr(self, "_pending", False):
+            value = _lazy_json_value(value)
+        return key, value
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        """Insert key with a default value if missing and return its converted value."""
+        if key in self:
+            return self[key]
+        return super().setdefault(key, default)
+
+    def copy(self) -> "LazyMap":  # type: ignore[override]
+        """Return a shallow copy that converts lazily as well."""
+        self._convert_all()
+        return LazyMap._from_json(self)
+
+
+class LazyList(List):
+    """List over a parsed JSON array whose elements are converted on first read.
+
+    Indexing converts one element; iteration, slicing and the Deluge list
+    methods built on them convert the whole array once and then run at
+    native speed.
+    """
+
+    __slots__ = ("_pending",)
+
+    @classmethod
+    def _from_json(cls, raw: list) -> "LazyList":
+        result = list.__new__(cls)
+        list.extend(result, raw)
+        result._pending = True
+        return result
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            self._convert_all()
+            return list.__getitem__(self, index)
+        value = list.__getitem__(self, index)
+        if value.__class__ in _RAW_JSON and getattr(self, "_pending", False):
+            value = _lazy_json_value(value)
+            list.__setitem__(self, index, value)
+        return value
+
+    def _convert_all(self) -> None:
+        if getattr(self, "_pending", False):
+            list.__setitem__(self, slice(None), map(_lazy_json_value, list.__iter__(self)))
+            self._pending = False
+
+    def __iter__(self):
+        self._convert_all()
+        return list.__iter__(self)
+
+    def __reversed__(self):
+        self._convert_all()
+        return list.__reversed__(self)
+
+    def pop(self, index: SupportsIndex = -1) -> Any:
+        """Remove and return the converted element at index."""
+        value = self[index]
+        super().pop(index)
+        return value
+
+
+def _wrap_string(value: Any) -> Any:
+    """Return value as a DelugeString if it is a plain string."""
+    if isinstance(value, str) and not isinstance(value, DelugeString):
+        return DelugeString(value)
+    return value
+
+
+# Values that need no tracking when caching a Map's JSON text
+_JSON_SCALARS = frozenset([DelugeString, str, int, float, bool, type(None)])
+
+_JSON_ENCODER = json.JSONEncoder()
+
+
+def _encode_json(value: Map) -> str:
+    """Serialize a Map, with nested Maps, Lists and DelugeStrings, as JSON.
+
+    The encoder handles the dict, list and str subclasses natively, so the
+    map is not copied first. A LazyMap with values still pending is copied
+    so the raw values are written without converting them.
+    """
+    data: dict = value
+    if value.__class__ is LazyMap and getattr(value, "_pending", False):
+        data = dict(value)
+    return _JSON_ENCODER.encode(data)
+
+
+def _json_dependencies(container: Map) -> list[tuple[Any, object]] | None:
+    """Stamp the Maps and Lists nested in container and return them.
+
+    A serialization of container stays valid while every returned
+    ``(container, stamp)`` pair still matches, since mutating a Map or List
+    clears its stamp. Returns None when the tree holds plain dicts, lists or
+    tuples, whose mutations cannot be tracked.
+    """
+    nested: list[tuple[Any, object]] = []
+    pending: list[Any] = [container]
+    while pending:
+        node = pending.pop()
+        for value in dict.values(node) if isinstance(node, dict) else list.__iter__(node):
+            if value.__class__ in _JSON_SCALARS:
+                continue
+            if isinstance(value, (Map, List)):
+                stamp = value._json_stamp
+                if stamp is None:
+                    stamp = value._json_stamp = object()
+                nested.append((value, stamp))
+                pending.append(value)
+            elif isinstance(value, (dict, list, tuple)):
+                return None
+    return nested
+
+
+# Tags fingerprints of unhashable values so they never equal a real element
+_UNHASHABLE = object()
+
+
+def _membership_key(value: Any) -> Any:
+    """Return a hashable key that identifies value for set operations.
+
+    Hashable values are their own key. Unhashable ones such as nested Maps
+    and Lists are keyed by their canonical JSON, so equal structures match.
+    """
+    try:
+        hash(value)
+    except TypeError:
+        try:
+            fingerprint = json.dumps(value, sort_keys=True, default=repr)
+        except TypeError:
+            # Keys that cannot be sorted against each other
+            fingerprint = json.dumps(value, default=repr)
+        return (_UNHASHABLE, fingerprint)
+    return value
+
+
 def deluge_string(s: str) -> DelugeString:
     """Convert a regular string to a Deluge string."""
     return DelugeString(s)
@@ -391,17 +794,84 @@ def deluge_string(s: str) -> DelugeString:
 
 def _convert_json_to_deluge_types(obj: Any) -> Map | List | DelugeString | Any:
     """Recursively convert JSON objects to Deluge types."""
+    # Converted values are already wrapped, so the wrapping setters are skipped
     if isinstance(obj, dict):
         result = Map()
         for key, value in obj.items():
-            result[key] = _convert_json_to_deluge_types(value)
+            dict.__setitem__(result, key, _convert_json_to_deluge_types(value))
         return result
     elif isinstance(obj, list):
         result = List()
-        for item in obj:
-            result.append(_convert_json_to_deluge_types(item))
+        list.extend(result, map(_convert_json_to_deluge_types, obj))
         return result
     elif isinstance(obj, str):
         return DelugeString(obj)
     else:
         return obj
+
+
+# Decoding builds Deluge types while parsing: the decoder hands every JSON
+# object to _json_map as soon as its members are parsed, so the document is
+# never materialized as plain dicts and then converted a second time. Arrays
+# and strings have no hook and are converted as their enclosing object is
+# built.
+
+
+def _json_value(value: Any) -> Any:
+    """Convert a value produced by the decoder to its Deluge type."""
+    cls = value.__class__
+    if cls is str:
+        return DelugeString(value)
+    if cls is list:
+        # Elements are converted already, so the wrapping List.extend is skipped
+        result = list.__new__(List)
+        list.extend(result, map(_json_value, value))
+        return result
+    return value
+
+
+def _json_map(pairs: list[tuple[str, Any]]) -> Map:
+    result = dict.__new__(Map)
+    for key, value in pairs:
+        cls = value.__class__
+        if cls is str:
+            value = DelugeString(value)
+        elif cls is list:
+            value = _json_value(value)
+        dict.__setitem__(result, key, value)
+    return result
+
+
+_JSON_DECODER = json.JSONDecoder(object_pairs_hook=_json_map)
+
+
+def _decode_json(text: str) -> Any:
+    """Parse JSON text straight into Map, List and DelugeString values."""
+    try:
+        return _json_value(_JSON_DECODER.decode(text))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON: {e}") from e
+
+
+# Plain decoded values that LazyMap and LazyList still have to convert
+_RAW_JSON = (dict, list, str)
+
+
+def _lazy_json_value(value: Any) -> Any:
+    """Convert one decoded value, leaving its children unconverted."""
+    cls = value.__class__
+    if cls is str:
+        return DelugeString(value)
+    if cls is dict:
+        return LazyMap._from_json(value)
+    if cls is list:
+        return LazyList._from_json(value)
+    return value
+
+
+def _decode_lazy_json(text: str) -> Any:
+    """Parse JSON text into plain values wrapped in LazyMap or LazyList."""
+    try:
+        return _lazy_json_value(json.loads(text))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON: {e}") from e
@@ -0,0 +1,75 @@
+"""Shared fixtures for the test suite."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Echo requests back as JSON, optionally after ?delay=<seconds>.
+
+    Each record has the monotonic times the request started and finished
+    being handled, so tests can check that requests overlapped without
+    depending on wall-clock totals. Requests to /login are answered with a
+    session cookie.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode("utf-8") if length else ""
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        started = time.monotonic()
+        delay = float(query.get("delay", ["0"])[0])
+        if delay:
+            time.sleep(delay)
+
+        record = {
+            "method": self.command,
+            "path": url.path,
+            "run": query.get("run", [None])[0],
+            "started": started,
+            "finished": time.monotonic(),
+            "body": body,
+            "client_port": self.client_address[1],
+            "cookie": self.headers.get("Cookie"),
+        }
+        self.server.requests.append(record)  # type: ignore[attr-defined]
+
+        payload = json.dumps(record).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        if url.path == "/login":
+            self.send_header("Set-Cookie", "session=tenantA; Path=/")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    # Room for many clients connecting at once
+    request_queue_size = 128
+
+
+@pytest.fixture
+def stub_server():
+    """Run a local HTTP/1.1 server that records and echoes requests."""
+    server = StubServer(("127.0.0.1", 0), StubHandler)
+    server.requests = []  # type: ignore[attr-defined]
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"  # type: ignore[attr-defined]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
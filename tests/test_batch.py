@@ -0,0 +1,75 @@
+"""Test running one script over many contexts."""
+
+import itertools
+
+import pytest
+
+from deluge_compat import BatchResult, run_deluge_batch
+from deluge_compat.runtime import DelugeRuntimeError
+
+SCRIPT = """
+if(n < 0) {
+    x = missing_var;
+}
+result = Map();
+result.put("square", n * n);
+return result;
+"""
+
+
+class TestRunDelugeBatch:
+    """Test the batch executor."""
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_results_in_input_order(self, workers):
+        """Test that results come back in order with their indexes."""
+        results = list(run_deluge_batch(SCRIPT, ({"n": i} for i in range(50)), workers, 8))
+
+        assert [r.index for r in results] == list(range(50))
+        assert [r.result.get("square") for r in results] == [i * i for i in range(50)]
+        assert all(isinstance(r, BatchResult) and r.ok for r in results)
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_errors_are_captured_per_item(self, workers):
+        """Test that a failing context does not abort the batch."""
+        contexts = [{"n": 1}, {"n": -1}, {"n": 2}]
+        results = list(run_deluge_batch(SCRIPT, contexts, workers=workers))
+
+        assert [r.ok for r in results] == [True, False, True]
+        assert results[1].error is not None
+        assert "missing_var" in results[1].error
+        assert results[2].result.get("square") == 4
+
+    def test_unordered_results(self):
+        """Test that unordered mode still yields every item exactly once."""
+        results = run_deluge_batch(
+            SCRIPT, [{"n": i} for i in range(100)], workers=2, chunksize=7, ordered=False
+        )
+        assert sorted(r.index for r in results) == list(range(100))
+
+    def test_inputs_are_consumed_lazily(self):
+        """Test that only a bounded number of contexts is read ahead."""
+        consumed = 0
+
+        def contexts():
+            nonlocal consumed
+            for i in itertools.count():
+                consumed += 1
+                yield {"n": i}
+
+        results = run_deluge_batch(SCRIPT, contexts(), workers=2, chunksize=10)
+        first = next(results)
+        assert first.index == 0
+        # Two chunks per worker in flight plus the replacement chunk
+        assert consumed <= 10 * 5 + 1
+        results.close()
+
+    def test_compile_error_raised_up_front(self):
+        """Test that invalid scripts fail before any context is consumed."""
+        with pytest.raises(DelugeRuntimeError, match="Error compiling"):
+            list(run_deluge_batch("this is not deluge", [{}], workers=2))
+
+    def test_invalid_chunksize(self):
+        """Test that chunksize must be positive."""
+        with pytest.raises(ValueError, match="chunksize"):
+            list(run_deluge_batch(SCRIPT, [], chunksize=0))
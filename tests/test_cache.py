@@ -0,0 +1,284 @@
+"""Test compiled script caching."""
+
+import os
+import time
+import traceback
+
+import pytest
+
+from deluge_compat.cache import CompiledScriptCache, DiskCodeCache, code_size, script_key
+from deluge_compat.runtime import DelugeRuntime, DelugeRuntimeError, run_deluge_file
+
+
+class TestCompiledScriptCache:
+    """Test the in-process compiled script cache."""
+
+    def test_script_key_is_content_addressed(self):
+        """Test that identical scripts share a key and different ones don't."""
+        assert script_key("return 1;") == script_key("return 1;")
+        assert script_key("return 1;") != script_key("return 2;")
+
+    def test_hit_and_miss_counters(self):
+        """Test that lookups update the hit/miss counters."""
+        cache = CompiledScriptCache(maxsize=4)
+        code = compile("x = 1", "<test>", "exec")
+
+        assert cache.get("a") is None
+        cache.put("a", code)
+        assert cache.get("a") is code
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["size"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = CompiledScriptCache(maxsize=2)
+        code = compile("x = 1", "<test>", "exec")
+
+        cache.put("a", code)
+        cache.put("b", code)
+        cache.get("a")  # "b" is now least recently used
+        cache.put("c", code)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert len(cache) == 2
+
+    def test_zero_maxsize_disables_caching(self):
+        """Test that a zero-sized cache never stores entries."""
+        cache = CompiledScriptCache(maxsize=0)
+        cache.put("a", compile("x = 1", "<test>", "exec"))
+        assert len(cache) == 0
+
+    def test_clear(self):
+        """Test that clear drops entries and resets counters."""
+        cache = CompiledScriptCache()
+        cache.put("a", compile("x = 1", "<test>", "exec"))
+        cache.get("a")
+        cache.clear()
+
+        assert len(cache) == 0
+        assert cache.stats()["hits"] == 0
+
+
+class TestRuntimeCaching:
+    """Test that the runtime reuses compiled scripts."""
+
+    def test_repeated_execution_hits_cache(self):
+        """Test that running the same script twice compiles it once."""
+        cache = CompiledScriptCache()
+        runtime = DelugeRuntime(cache=cache)
+        script = """
+        result = Map();
+        result.put("value", 42);
+        return result;
+        """
+
+        first = runtime.execute(script)
+        second = runtime.execute(script)
+
+        assert first.get("value") == 42
+        assert second.get("value") == 42
+        assert cache.misses == 1
+        assert cache.hits == 1
+
+    def test_cache_shared_between_runtimes(self):
+        """Test that separate runtimes share a cache they are given."""
+        cache = CompiledScriptCache()
+        DelugeRuntime(cache=cache).execute("return 1;")
+        assert DelugeRuntime(cache=cache).execute("return 1;") == 1
+        assert cache.hits == 1
+
+    def test_cached_script_sees_new_context(self):
+        """Test that cached code runs against the current context."""
+        cache = CompiledScriptCache()
+        runtime = DelugeRuntime(cache=cache)
+        script = "return name;"
+
+        runtime.update_context({"name": "Alice"})
+        assert runtime.execute(script) == "Alice"
+        runtime.update_context({"name": "Bob"})
+        assert runtime.execute(script) == "Bob"
+
+    def test_cached_code_keeps_each_filename(self, tmp_path):
+        """Test that identical scripts compiled under different names keep their own."""
+        source = 'x = missing_var;\nreturn "never";'
+        paths = [tmp_path / "a.dg", tmp_path / "b.dg"]
+        for path in paths:
+            path.write_text(source, encoding="utf-8")
+        disk_cache = DiskCodeCache(tmp_path / "cache")
+        cache = CompiledScriptCache()
+        runtime = DelugeRuntime(cache=cache, disk_cache=disk_cache)
+
+        first, second = (runtime.compile_file(str(path)) for path in paths)
+        inline = runtime.compile(source)
+        # A fresh in-memory cache loads the entry a.dg wrote to disk
+        reloaded = DelugeRuntime(cache=CompiledScriptCache(), disk_cache=disk_cache)
+        from_disk = reloaded.compile_file(str(paths[1]))
+
+        assert cache.misses == 1
+        assert first.code.co_filename == str(paths[0])
+        assert second.code.co_filename == str(paths[1])
+        assert inline.code.co_filename == "<deluge>"
+        assert from_disk.code.co_filename == str(paths[1])
+        for script, name in [(second, str(paths[1])), (from_disk, str(paths[1]))]:
+            assert script._function_code.co_filename == name
+            with pytest.raises(DelugeRuntimeError) as info:
+                script.run()
+            cause = info.value.__cause__
+            assert cause is not None
+            frames = traceback.extract_tb(cause.__traceback__)
+            assert frames[-1].filename == name
+
+    def test_translation_errors_not_cached(self):
+        """Test that scripts failing to translate are not cached."""
+        cache = CompiledScriptCache()
+        runtime = DelugeRuntime(cache=cache)
+
+        for _ in range(2):
+            with pytest.raises(DelugeRuntimeError):
+                runtime.execute("this is not deluge")
+
+        assert len(cache) == 0
+
+
+class TestDiskCodeCache:
+    """Test the persistent on-disk code cache."""
+
+    def test_store_and_load_roundtrip(self, tmp_path):
+        """Test that a stored code object can be loaded back."""
+        cache = DiskCodeCache(tmp_path)
+        code = compile("x = 41 + 1", "<test>", "exec")
+
+        cache.store("abc", code)
+        loaded = cache.load("abc")
+
+        assert loaded is not None
+        namespace = {}
+        exec(loaded, namespace)
+        assert namespace["x"] == 42
+
+    def test_missing_entry(self, tmp_path):
+        """Test that a missing entry loads as None."""
+        assert DiskCodeCache(tmp_path).load("missing") is None
+
+    def test_corrupt_entry_ignored(self, tmp_path):
+        """Test that corrupt or foreign files are treated as misses."""
+        cache = DiskCodeCache(tmp_path)
+        cache.path_for("bad").write_bytes(b"not a code object")
+        assert cache.load("bad") is None
+
+    def test_no_temporary_files_left_behind(self, tmp_path):
+        """Test that atomic writes clean up after themselves."""
+        cache = DiskCodeCache(tmp_path)
+        cache.store("abc", compile("x = 1", "<test>", "exec"))
+        assert [p.name for p in tmp_path.iterdir()] == [cache.path_for("abc").name]
+
+    def stored(self, cache: DiskCodeCache, keys: list[str]) -> None:
+        """Store an entry per key, each newer than the one before."""
+        for age, key in enumerate(reversed(keys), 1):
+            cache.store(key, compile(f"x = {age}", "<test>", "exec"))
+            os.utime(cache.path_for(key), ns=(0, time.time_ns() - age * 10**9))
+
+    def test_prune_keeps_most_recent(self, tmp_path):
+        """Test that pruning removes the least recently used files beyond the cap."""
+        cache = DiskCodeCache(tmp_path, max_entries=3)
+        self.stored(cache, ["a", "b", "c", "d", "e"])
+
+        assert cache.prune() == 2
+        assert sorted(p.name[0] for p in tmp_path.glob("*.dgc")) == ["c", "d", "e"]
+        assert cache.prune() == 0
+
+    def test_load_marks_entry_used(self, tmp_path):
+        """Test that a loaded entry survives pruning over newer unused ones."""
+        cache = DiskCodeCache(tmp_path, max_entries=2)
+        self.stored(cache, ["a", "b", "c"])
+        assert cache.load("a") is not None
+
+        cache.prune()
+        assert cache.load("a") is not None
+        assert cache.load("b") is None
+
+    def test_store_prunes(self, tmp_path):
+        """Test that a process's first store trims the directory to the cap."""
+        self.stored(DiskCodeCache(tmp_path, max_entries=None), ["a", "b", "c", "d"])
+
+        cache = DiskCodeCache(tmp_path, max_entries=2)
+        cache.store("new", compile("x = 0", "<test>", "exec"))
+        assert sorted(p.name.split(".")[0] for p in tmp_path.glob("*.dgc")) == ["d", "new"]
+
+    def test_unwritable_directory_is_ignored(self, tmp_path):
+        """Test that failing to write the cache doesn't raise."""
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        DiskCodeCache(blocker / "cache").store("abc", compile("x = 1", "<test>", "exec"))
+
+    def test_env_configuration(self, tmp_path, monkeypatch):
+        """Test that the environment can relocate or disable the cache."""
+        monkeypatch.setenv("DELUGE_COMPAT_CACHE_DIR", str(tmp_path))
+        cache = DiskCodeCache.from_env()
+        assert cache is not None
+        assert cache.directory == tmp_path
+
+        monkeypatch.setenv("DELUGE_COMPAT_NO_CACHE", "1")
+        assert DiskCodeCache.from_env() is None
+
+    def test_execute_file_populates_disk_cache(self, tmp_path, monkeypatch):
+        """Test that a fresh process-level cache loads code from disk."""
+        script_file = tmp_path / "script.dg"
+        script_file.write_text('return "from disk";', encoding="utf-8")
+        disk_cache = DiskCodeCache(tmp_path / "cache")
+
+        first = DelugeRuntime(cache=CompiledScriptCache(), disk_cache=disk_cache)
+        assert first.execute_file(str(script_file)) == "from disk"
+        assert len(list((tmp_path / "cache").glob("*.dgc"))) == 1
+
+        # Simulate a new process: empty in-memory cache, translator must not run
+        second = DelugeRuntime(cache=CompiledScriptCache(), disk_cache=disk_cache)
+
+        def fail_translate(code):
+            raise AssertionError("script should have been loaded from disk")
+
+        monkeypatch.setattr(second.translator, "translate_script", fail_translate)
+        assert second.execute_file(str(script_file)) == "from disk"
+
+    def test_execute_file_without_disk_cache(self, tmp_path):
+        """Test that the disk cache can be disabled per runtime."""
+        script_file = tmp_path / "script.dg"
+        script_file.write_text("return 1;", encoding="utf-8")
+
+        runtime = DelugeRuntime(cache=CompiledScriptCache(), disk_cache=False)
+        assert runtime.disk_cache is None
+        assert runtime.execute_file(str(script_file)) == 1
+
+    def test_run_deluge_file_cache_dir(self, tmp_path):
+        """Test that run_deluge_file honours a custom cache directory."""
+        script_file = tmp_path / "script.dg"
+        script_file.write_text("return 7 * 6;", encoding="utf-8")
+
+        assert run_deluge_file(str(script_file), cache_dir=str(tmp_path / "c")) == 42
+        assert list((tmp_path / "c").glob("*.dgc"))
+
+
+class TestCodeSize:
+    """Test estimating the memory held by compiled scripts."""
+
+    def test_grows_with_script(self):
+        """Test that longer scripts and their constants are charged more."""
+        runtime = DelugeRuntime(cache=CompiledScriptCache(), disk_cache=False)
+        small = runtime.compile("return 1;").code
+        large = runtime.compile(
+            "\n".join(f'x{n} = "a constant string number {n}";' for n in range(50)) + "\nreturn x1;"
+        ).code
+        assert 0 < code_size(small) < code_size(large)
+        assert code_size(large) > 50 * len("a constant string number 10")
+
+    def test_shared_objects_counted_once(self):
+        """Test that a constant reachable twice is counted once."""
+        code = compile("a = ('x' * 1000,)\nb = a", "<test>", "exec")
+        doubled = compile("a = ('x' * 1000,)\nb = ('x' * 1000,)", "<test>", "exec")
+        assert code_size(code) <= code_size(doubled)
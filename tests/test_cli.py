@@ -0,0 +1,122 @@
+"""Test the deluge-run and deluge-serve command line interfaces."""
+
+import json
+
+import pytest
+
+pytest.importorskip("typer")
+
+from typer.testing import CliRunner  # noqa: E402
+
+from deluge_compat.cli import run_app  # noqa: E402
+from deluge_compat.cli_serve import serve_app  # noqa: E402
+
+SCRIPT = """
+if(n < 0) {
+    x = missing_var;
+}
+result = Map();
+result.put("square", n * n);
+return result;
+"""
+
+runner = CliRunner()
+
+
+def output_records(output: str) -> list[dict]:
+    return [json.loads(line) for line in output.splitlines() if line.startswith("{")]
+
+
+class TestRunBatch:
+    """Test deluge-run --input batch mode."""
+
+    @pytest.fixture
+    def script_file(self, tmp_path):
+        path = tmp_path / "square.dg"
+        path.write_text(SCRIPT, encoding="utf-8")
+        return path
+
+    @pytest.mark.parametrize("workers", ["1", "2"])
+    def test_jsonl_file(self, tmp_path, script_file, workers):
+        """Test that each input line produces one result line in order."""
+        input_file = tmp_path / "input.jsonl"
+        input_file.write_text("".join(f'{{"n": {i}}}\n' for i in range(10)), encoding="utf-8")
+
+        result = runner.invoke(
+            run_app, [str(script_file), "--input", str(input_file), "--workers", workers]
+        )
+
+        assert result.exit_code == 0
+        records = output_records(result.stdout)
+        assert records == [{"index": i, "result": {"square": i * i}} for i in range(10)]
+        assert "Processed 10 records" in result.output
+
+    def test_stdin_and_item_errors(self, script_file):
+        """Test reading stdin, skipping blank lines and reporting failed items."""
+        result = runner.invoke(
+            run_app, [str(script_file), "-i", "-"], input='{"n": 2}\n\n{"n": -1}\n'
+        )
+
+        assert result.exit_code == 1
+        first, second = output_records(result.stdout)
+        assert first == {"index": 0, "result": {"square": 4}}
+        assert second["index"] == 1
+        assert "missing_var" in second["error"]
+
+    def test_values_are_deluge_types(self, tmp_path):
+        """Test that input values support Deluge string, map and list methods."""
+        script_file = tmp_path / "upper.dg"
+        script_file.write_text(
+            'return name.toUpperCase() + " " + tags.get(1) + " " + address.get("city");',
+            encoding="utf-8",
+        )
+        line = {"name": "alice", "tags": ["a", "b"], "address": {"city": "Lisbon"}}
+
+        result = runner.invoke(run_app, [str(script_file), "-i", "-"], input=json.dumps(line))
+
+        assert result.exit_code == 0
+        assert output_records(result.stdout) == [{"index": 0, "result": "ALICE b Lisbon"}]
+
+    def test_missing_input_file(self, tmp_path, script_file):
+        """Test that a missing input file is reported without a traceback."""
+        result = runner.invoke(
+            run_app, [str(script_file), "--input", str(tmp_path / "missing.jsonl")]
+        )
+
+        assert result.exit_code == 1
+        assert "missing.jsonl" in result.output
+        assert not isinstance(result.exception, FileNotFoundError)
+
+    def test_invalid_json_line(self, script_file):
+        """Test that malformed input stops the batch with its line number."""
+        result = runner.invoke(run_app, [str(script_file), "-i", "-"], input='{"n": 1}\n[1]\n')
+
+        assert result.exit_code == 1
+        assert "line 2" in result.output
+
+
+class TestServeCommand:
+    """Test deluge-serve startup errors."""
+
+    def test_compile_error(self, tmp_path):
+        """Test that a script that does not compile stops the server from starting."""
+        script_file = tmp_path / "bad.dg"
+        script_file.write_text("this is not deluge", encoding="utf-8")
+
+        result = runner.invoke(serve_app, [str(script_file), "--port", "0"])
+
+        assert result.exit_code == 1
+        assert "Error starting server" in result.output
+
+    def test_duplicate_names(self, tmp_path):
+        """Test that two scripts with the same name are rejected."""
+        (tmp_path / "a").mkdir()
+        for path in (tmp_path / "bot.dg", tmp_path / "a" / "bot.dg"):
+            path.write_text("return 1;", encoding="utf-8")
+
+        result = runner.invoke(
+            serve_app, [str(tmp_path / "bot.dg"), str(tmp_path / "a" / "bot.dg"), "--port", "0"]
+        )
+
+        assert result.exit_code == 1
+        assert "Duplicate script name" in result.output
@@ -0,0 +1,100 @@
+"""Test the date parser behind DelugeString.toDate."""
+
+from datetime import datetime
+
+import pytest
+
+from deluge_compat import dates
+from deluge_compat.dates import DATE_FORMATS, parse_date
+from deluge_compat.types import deluge_string
+
+
+def strptime_in_order(text: str) -> datetime | None:
+    """The reference behavior: strptime with each format in turn."""
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+class TestParseDate:
+    """Test parse_date against strptime."""
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("2024-01-15", datetime(2024, 1, 15)),
+            ("2024-1-5", datetime(2024, 1, 5)),
+            ("2024-01-15T10:30:00", datetime(2024, 1, 15, 10, 30)),
+            ("2024-01-15t10:30:00", datetime(2024, 1, 15, 10, 30)),
+            ("2024-01-15T10:30:00Z", datetime(2024, 1, 15, 10, 30)),
+            ("2024-01-15 10:30:00", datetime(2024, 1, 15, 10, 30)),
+            ("2024-01-15\t10:30:00", datetime(2024, 1, 15, 10, 30)),
+            ("15-01-2024", datetime(2024, 1, 15)),
+            ("5-1-2024", datetime(2024, 1, 5)),
+            ("01/15/2024", datetime(2024, 1, 15)),
+            ("1/5/2024", datetime(2024, 1, 5)),
+        ],
+    )
+    def test_formats(self, text, expected):
+        """Test every supported format."""
+        assert parse_date(text) == expected
+        assert parse_date(text) == strptime_in_order(text)
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "2024-1-5T1:2:3",
+            "2024-01-15  10:30:00",
+            " 5-01-2024",
+            "２０２４-01-15",
+        ],
+    )
+    def test_strptime_fallback(self, text):
+        """Test variants only strptime handles."""
+        assert parse_date(text) == strptime_in_order(text)
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "",
+            "not a date",
+            "2024-02-30",
+            "2024-13-01",
+            "2024-00-10",
+            "2024-01-15T24:00:00",
+            "2024-01-15T10:30:60",
+            "2024-01-15T10:30:00.5",
+            "2024-01-15T10:30:00+00:00",
+            "2024-01-15 ",
+            "20240115",
+            "15/01/2024",
+            "2024/01/15",
+        ],
+    )
+    def test_invalid(self, text):
+        """Test strings none of the formats accept."""
+        assert strptime_in_order(text) is None
+        with pytest.raises(ValueError, match="Unable to parse date"):
+            parse_date(text)
+
+    def test_last_format_is_tried_first(self, monkeypatch):
+        """Test that the format that succeeded last is memoized."""
+        monkeypatch.setattr(dates, "_last_parser", 0)
+        parse_date("01/15/2024")
+        assert dates._PARSERS[dates._last_parser] is dates._month_day_year
+
+        calls = []
+        original = dates._iso_date
+        parsers = list(dates._PARSERS)
+        parsers[0] = lambda text: calls.append(text) or original(text)
+        monkeypatch.setattr(dates, "_PARSERS", parsers)
+        assert parse_date("02/20/2024") == datetime(2024, 2, 20)
+        assert calls == []
+
+    def test_to_date(self):
+        """Test DelugeString.toDate and toTime."""
+        assert deluge_string("2024-01-15T10:30:00Z").toDate() == datetime(2024, 1, 15, 10, 30)
+        assert deluge_string("1/5/2024").toTime() == datetime(2024, 1, 5)
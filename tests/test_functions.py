@@ -41,7 +41,7 @@ from deluge_compat.types import Map
 class TestHttpFunctions:
     """Test HTTP-related functions."""
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_getUrl_simple(self, mock_get):
         """Test getUrl with simple response."""
         mock_response = Mock()
@@ -52,7 +52,7 @@ class TestHttpFunctions:
         assert str(result) == "Hello World"
         assert result.__class__.__name__ == "DelugeString"
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_getUrl_complex(self, mock_get):
         """Test getUrl with complex response."""
         mock_response = Mock()
@@ -66,7 +66,7 @@ class TestHttpFunctions:
         assert result.get("status_code") == 200
         assert result.get("text") == "Response body"
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_postUrl(self, mock_post):
         """Test postUrl function."""
         mock_response = Mock()
@@ -0,0 +1,242 @@
+"""Test the pooled HTTP client behind the HTTP builtins."""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+import pytest
+from requests.adapters import HTTPAdapter
+
+from deluge_compat import DelugeRuntime, functions, http_client, run_deluge_script
+from deluge_compat.functions import getUrl, postUrl
+from deluge_compat.http_client import DEFAULT_TIMEOUT, HttpClient
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Install a fresh default client for the duration of a test."""
+    client = HttpClient()
+    monkeypatch.setattr(http_client, "default_client", client)
+    monkeypatch.setattr(functions, "default_client", client)
+    yield client
+    client.close()
+
+
+class TestHttpClient:
+    """Test session management and configuration."""
+
+    def test_session_created_lazily(self):
+        """Test that no session exists until the first request."""
+        client = HttpClient()
+        assert client._session is None
+        session = client.session
+        assert client.session is session
+        client.close()
+        assert client._session is None
+
+    def test_default_timeout_applied(self):
+        """Test that requests get the default timeout unless one is given."""
+        session = Mock()
+        client = HttpClient(session=session)
+
+        client.get("http://example.com")
+        assert session.get.call_args.kwargs["timeout"] == DEFAULT_TIMEOUT
+
+        client.request("PUT", "http://example.com", timeout=3)
+        assert session.request.call_args.kwargs["timeout"] == 3
+
+    def test_application_session_is_not_closed(self):
+        """Test that a supplied session is used as-is and left open."""
+        session = Mock()
+        client = HttpClient(session=session)
+        assert client.session is session
+
+        client.configure(pool_maxsize=20)
+        session.close.assert_not_called()
+        assert client.session is not session
+        assert client.pool_maxsize == 20
+        client.close()
+
+    def test_configure_keeps_timeout_unless_given(self):
+        """Test that configure only changes the timeout when asked to."""
+        client = HttpClient(timeout=5)
+        client.configure(pool_connections=2)
+        assert client.timeout == 5
+        client.configure(timeout=None)
+        assert client.timeout is None
+
+    def test_host_pool_sizes(self):
+        """Test that per-host pool sizes mount dedicated adapters."""
+        client = HttpClient(pool_maxsize=4, host_pool_sizes={"https://crm.example.com": 32})
+        session = client.session
+
+        crm = session.get_adapter("https://crm.example.com/v2")
+        other = session.get_adapter("https://other.example.com/")
+        assert isinstance(crm, HTTPAdapter) and isinstance(other, HTTPAdapter)
+        assert crm._pool_maxsize == 32
+        assert other._pool_maxsize == 4
+        client.close()
+
+
+class TestConnectionReuse:
+    """Test that the HTTP builtins share pooled connections."""
+
+    def test_builtins_reuse_one_connection(self, client, stub_server):
+        """Test that repeated calls to one host reuse a kept-alive connection."""
+        getUrl(f"{stub_server.url}/a")
+        postUrl(f"{stub_server.url}/b", body={"k": "v"})
+        getUrl(f"{stub_server.url}/c")
+
+        ports = {request["client_port"] for request in stub_server.requests}
+        assert len(stub_server.requests) == 3
+        assert len(ports) == 1
+
+    def test_cookies_not_kept(self, client, stub_server):
+        """Test that a cookie set for one call is not sent with the next."""
+        getUrl(f"{stub_server.url}/login")
+        getUrl(f"{stub_server.url}/other")
+
+        assert [request["cookie"] for request in stub_server.requests] == [None, None]
+        assert len(client.session.cookies) == 0
+
+    def test_invokeurl_other_methods(self, client, stub_server):
+        """Test that invokeurl PUT requests go through the shared client."""
+        script = f"""
+        body = Map();
+        body.put("name", "Ada");
+        resp = invokeurl [
+            url: "{stub_server.url}/items/1"
+            type: PUT
+            body: body
+        ];
+        return resp;
+        """
+        echoed = json.loads(str(run_deluge_script(script)))
+        assert echoed["method"] == "PUT"
+        assert json.loads(echoed["body"]) == {"name": "Ada"}
+
+    def test_application_session_used_by_builtins(self, client, stub_server):
+        """Test that getUrl goes through an application-supplied session."""
+        import requests
+
+        session = requests.Session()
+        session.headers["X-App"] = "1"
+        client.configure(session=session)
+
+        assert "/ping" in str(getUrl(f"{stub_server.url}/ping"))
+        assert client.session is session
+        session.close()
+
+
+FAN_OUT_SCRIPT = """
+contact = invokeurl [
+    url: base + "/contact?delay=0.3"
+    type: GET
+];
+deal = invokeurl [
+    url: base + "/deal?delay=0.3"
+    type: GET
+];
+tickets = invokeurl [
+    url: base + "/tickets?delay=0.3"
+    type: GET
+];
+return contact.toMap().get("path") + deal.toMap().get("path") + tickets.toMap().get("path");
+"""
+
+
+def overlapping(requests):
+    """Return whether the stub server was handling all the requests at once."""
+    return max(r["started"] for r in requests) < min(r["finished"] for r in requests)
+
+
+class TestFanOut:
+    """Test concurrent execution of independent invokeurl calls."""
+
+    def test_fan_out_preserves_order(self):
+        """Test that results come back in item order."""
+        client = HttpClient(max_workers=4)
+        assert client.fan_out(lambda n: n * 2, [3, 1, 2]) == [6, 2, 4]
+        client.close()
+
+    def test_fan_out_raises_first_failure(self):
+        """Test that the first failing item's exception is raised."""
+        client = HttpClient(max_workers=4)
+
+        def check(n):
+            if n > 1:
+                raise ValueError(f"bad {n}")
+            return n
+
+        with pytest.raises(ValueError, match="bad 2"):
+            client.fan_out(check, [1, 2, 3])
+        client.close()
+
+    def test_parallel_runtime_overlaps_calls(self, client, stub_server):
+        """Test that independent calls take the time of the slowest one."""
+        runtime = DelugeRuntime(parallel_invokeurl=True)
+        runtime.update_context({"base": stub_server.url})
+
+        result = runtime.execute(FAN_OUT_SCRIPT)
+
+        assert str(result) == "/contact/deal/tickets"
+        assert len(stub_server.requests) == 3
+        assert overlapping(stub_server.requests)
+
+    def test_first_call_in_calling_thread(self):
+        """Test that the caller makes the first call instead of only waiting."""
+        import threading
+
+        client = HttpClient(max_workers=4)
+        caller = threading.get_ident()
+        threads = client.fan_out(lambda n: threading.get_ident(), [1, 2, 3])
+        assert threads[0] == caller
+        assert caller not in threads[1:]
+        client.close()
+
+    def test_parallel_under_concurrent_load(self, client, stub_server):
+        """Test that many scripts fanning out at once still overlap their calls."""
+        runtime = DelugeRuntime(parallel_invokeurl=True)
+        runtime.update_context({"base": stub_server.url})
+        script = runtime.compile(
+            """
+            a = invokeurl [
+                url: base + "/a?delay=0.3&run=" + run
+                type: GET
+            ];
+            b = invokeurl [
+                url: base + "/b?delay=0.3&run=" + run
+                type: GET
+            ];
+            return a.toMap().get("path") + b.toMap().get("path");
+            """
+        )
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(lambda n: script.run(run=str(n)), range(16)))
+
+        assert results == ["/a/b"] * 16
+        runs: dict[str, list[dict]] = {}
+        for request in stub_server.requests:
+            runs.setdefault(request["run"], []).append(request)
+        assert len(runs) == 16
+        assert all(overlapping(requests) for requests in runs.values())
+
+    def test_sequential_by_default(self, client, stub_server):
+        """Test that calls are sent one after another unless enabled."""
+        runtime = DelugeRuntime()
+        runtime.update_context({"base": stub_server.url})
+
+        start = time.perf_counter()
+        result = runtime.execute(FAN_OUT_SCRIPT)
+        elapsed = time.perf_counter() - start
+
+        assert str(result) == "/contact/deal/tickets"
+        assert elapsed >= 0.9
+        assert [request["path"] for request in stub_server.requests] == [
+            "/contact",
+            "/deal",
+            "/tickets",
+        ]
+        assert not overlapping(stub_server.requests[:2])
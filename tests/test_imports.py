@@ -0,0 +1,42 @@
+"""Test that the core runtime stays off heavy optional imports."""
+
+import subprocess
+import sys
+
+HEAVY_MODULES = ["faker", "requests", "urllib3"]
+
+
+def loaded_modules(code: str) -> set[str]:
+    """Run code in a fresh interpreter and return the heavy modules it loaded."""
+    probe = f"{code}\nimport sys\nprint(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", probe], capture_output=True, text=True, check=True
+    )
+    return set(result.stdout.split())
+
+
+class TestLazyImports:
+    """Test lazy loading of optional dependencies."""
+
+    def test_running_a_script_skips_heavy_modules(self):
+        """Test that executing a script does not import faker or requests."""
+        code = "from deluge_compat import run_deluge_script\nrun_deluge_script('return 1;')"
+        assert loaded_modules(code) == set()
+
+    def test_salesiq_functions_skip_mocks(self):
+        """Test that the SalesIQ session helpers do not load the mock sources."""
+        code = "from deluge_compat.salesiq import visitorsession_get, Visitor"
+        assert loaded_modules(code) == set()
+
+    def test_mock_sources_load_on_access(self):
+        """Test that mock sources are still importable from the package."""
+        code = "from deluge_compat.salesiq import MockManager\nassert MockManager"
+        assert "faker" in loaded_modules(code)
+
+    def test_http_builtins_load_requests_on_call(self):
+        """Test that requests is imported when an HTTP builtin is used."""
+        code = (
+            "from deluge_compat.functions import getUrl\n"
+            "try:\n    getUrl('http://127.0.0.1:9/')\nexcept Exception:\n    pass"
+        )
+        assert "requests" in loaded_modules(code)
@@ -5,6 +5,7 @@ from unittest.mock import Mock, patch
 import pytest
 
 from deluge_compat import List, Map, run_deluge_script
+from deluge_compat.http_client import DEFAULT_TIMEOUT
 from deluge_compat.runtime import DelugeRuntimeError
 
 # Integration tests for complete Deluge compatibility scenarios
@@ -156,7 +157,7 @@ class TestIntegrationScenarios:
         assert "brown" in long_words
         assert "jumps" in long_words
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_api_integration_scenario(self, mock_get):
         """Test API integration scenario."""
         # Mock API response
@@ -201,7 +202,9 @@ class TestIntegrationScenarios:
         result = run_deluge_script(script)
 
         assert isinstance(result, Map)
-        mock_get.assert_called_once_with("https://api.example.com/users", headers={})
+        mock_get.assert_called_once_with(
+            "https://api.example.com/users", headers={}, timeout=DEFAULT_TIMEOUT
+        )
 
     def test_mathematical_computation_scenario(self):
         """Test mathematical computations."""
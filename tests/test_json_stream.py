@@ -0,0 +1,127 @@
+"""Test streaming iteration over JSON arrays."""
+
+import io
+import json
+import tracemalloc
+
+import pytest
+
+from deluge_compat.json_stream import JSONListStream
+from deluge_compat.runtime import DelugeRuntime
+from deluge_compat.types import DelugeString, List, Map, deluge_string
+
+DOCUMENTS = [
+    [],
+    [1],
+    [123456789, -2.5e10, 0.125, "text", None, True, False],
+    [{"id": 1, "tags": ["a", "b"], "owner": {"name": "Ada"}}, [[]], {}],
+    [{"id": n, "note": "x" * (n % 50)} for n in range(200)],
+]
+
+
+class TestJSONListStream:
+    """Test JSONListStream over text and files."""
+
+    @pytest.mark.parametrize("document", DOCUMENTS)
+    @pytest.mark.parametrize("indent", [None, 2])
+    def test_matches_json_loads(self, document, indent):
+        """Test that streamed elements equal the parsed array."""
+        text = json.dumps(document, indent=indent)
+        assert list(deluge_string(text).streamJSONList()) == document
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64])
+    def test_elements_spanning_chunks(self, chunk_size):
+        """Test numbers, strings and objects split across file reads."""
+        document = DOCUMENTS[2] + DOCUMENTS[3] + DOCUMENTS[4]
+        stream = JSONListStream.from_file(io.StringIO(json.dumps(document)), chunk_size)
+        assert list(stream) == document
+
+    def test_elements_are_deluge_types(self):
+        """Test that elements are converted like toJSONList."""
+        text = deluge_string('[{"name": "Ada", "tags": ["x"]}, "plain", [1]]')
+        record, plain, numbers = text.streamJSONList()
+
+        assert type(record) is Map
+        assert type(record.get("name")) is DelugeString
+        assert type(record.get("tags")) is List
+        assert type(plain) is DelugeString
+        assert type(numbers) is List
+        assert list(text.streamJSONList()) == text.toJSONList()
+
+    def test_text_and_path_streams_can_be_repeated(self, tmp_path):
+        """Test that text and path streams restart on every iteration."""
+        path = tmp_path / "records.json"
+        path.write_text('[{"n": 1}, {"n": 2}]', encoding="utf-8")
+
+        for stream in [JSONListStream('[{"n": 1}, {"n": 2}]'), JSONListStream.from_file(path)]:
+            assert [record.get("n") for record in stream] == [1, 2]
+            assert [record.get("n") for record in stream] == [1, 2]
+
+    def test_open_file_is_read_once(self):
+        """Test that a stream over an open file refuses a second pass."""
+        stream = JSONListStream.from_file(io.StringIO("[1, 2]"))
+        assert list(stream) == [1, 2]
+        with pytest.raises(ValueError, match="only be iterated once"):
+            list(stream)
+
+    def test_to_list(self):
+        """Test collecting the stream into a List."""
+        result = JSONListStream('["a", 1]').toList()
+        assert type(result) is List
+        assert result == ["a", 1]
+
+    @pytest.mark.parametrize("text", ['{"a": 1}', "", "  ", "42"])
+    def test_not_an_array(self, text):
+        """Test that other JSON values are rejected."""
+        with pytest.raises(ValueError, match="does not represent a JSON array"):
+            list(JSONListStream(text))
+
+    @pytest.mark.parametrize("text", ["[1,]", "[1 2]", "[1", '["abc', "[{]"])
+    def test_invalid_json(self, text):
+        """Test that malformed arrays raise ValueError."""
+        with pytest.raises(ValueError, match="Invalid JSON"):
+            list(JSONListStream.from_file(io.StringIO(text), chunk_size=2))
+
+    def test_elements_before_an_error_are_yielded(self):
+        """Test that records before a malformed one are processed."""
+        seen = []
+        with pytest.raises(ValueError):
+            for record in JSONListStream("[1, 2, oops]"):
+                seen.append(record)
+        assert seen == [1, 2]
+
+    def test_constant_memory(self, tmp_path):
+        """Test that memory does not grow with the number of records."""
+
+        def peak(records: int) -> int:
+            path = tmp_path / f"{records}.json"
+            path.write_text(
+                json.dumps([{"id": n, "email": f"user{n}@example.com"} for n in range(records)])
+            )
+            tracemalloc.start()
+            try:
+                for _ in JSONListStream.from_file(path, chunk_size=4096):
+                    pass
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        assert peak(20_000) < 2 * peak(1_000)
+
+    def test_for_each_in_script(self):
+        """Test the stream in a translated for each loop."""
+        script = DelugeRuntime(disk_cache=False).compile("""
+records = payload.streamJSONList();
+total = 0;
+names = List();
+for each record in records {
+    total = total + record.get("score");
+    names.add(record.get("name").toUpperCase());
+}
+result = Map();
+result.put("names", names);
+result.put("total", total);
+return result;
+""")
+        payload = deluge_string('[{"name": "ada", "score": 2}, {"name": "bob", "score": 3}]')
+        assert script.run(payload=payload) == {"names": ["ADA", "BOB"], "total": 5}
@@ -0,0 +1,89 @@
+"""Test the Deluge tokenizer."""
+
+from deluge_compat.lexer import ERRORTOKEN, NAME, NUMBER, OP, STRING, VALUE, render, tokenize
+
+
+def values(line):
+    """Return the token values of a tokenized line."""
+    return [token[VALUE] for token in line]
+
+
+class TestTokenize:
+    """Test tokenizing Deluge source."""
+
+    def test_basic_statement(self):
+        """Test token kinds and values for a simple assignment."""
+        (line,) = tokenize('name = "John";')
+        assert line == [
+            (NAME, "name", 1, ""),
+            (OP, "=", 1, " "),
+            (STRING, '"John"', 1, " "),
+            (OP, ";", 1, ""),
+        ]
+
+    def test_multi_character_operators(self):
+        """Test that compound operators are single tokens."""
+        (line,) = tokenize("a == b && c != d || e <= f >= g; x += 1;")
+        assert "==" in values(line)
+        assert "&&" in values(line)
+        assert "!=" in values(line)
+        assert "||" in values(line)
+        assert "<=" in values(line)
+        assert ">=" in values(line)
+        assert "+=" in values(line)
+
+    def test_numbers(self):
+        """Test integer, decimal and exponent literals."""
+        (line,) = tokenize("x = 1 + 2.5 + 3e10;")
+        numbers = [token[VALUE] for token in line if token[0] == NUMBER]
+        assert numbers == ["1", "2.5", "3e10"]
+
+    def test_comments_are_dropped(self):
+        """Test that line, hash and block comments produce no tokens."""
+        lines = tokenize(
+            """
+            // full line comment
+            a = 1; // trailing comment
+            # hash comment
+            /* block
+               comment */
+            b = 2;
+            """
+        )
+        assert [values(line) for line in lines] == [["a", "=", "1", ";"], ["b", "=", "2", ";"]]
+
+    def test_line_numbers_survive_block_comments(self):
+        """Test that tokens keep their original line numbers."""
+        lines = tokenize("a = 1;\n/* one\ntwo\nthree */\nb = 2;")
+        assert lines[0][0][2] == 1
+        assert lines[1][0][2] == 5
+
+    def test_comment_markers_inside_strings(self):
+        """Test that // and # inside strings are not comments."""
+        (line,) = tokenize('url = "https://example.com/#top"; // real comment')
+        assert values(line) == ["url", "=", '"https://example.com/#top"', ";"]
+
+    def test_escaped_quotes(self):
+        """Test that escaped quotes don't terminate a string."""
+        (line,) = tokenize(r'msg = "say \"hi\"";')
+        assert line[2] == (STRING, r'"say \"hi\""', 1, " ")
+
+    def test_unterminated_quote(self):
+        """Test that a quote without a closing quote is an error token."""
+        (line,) = tokenize('return ";')
+        assert line[1] == (ERRORTOKEN, '"', 1, " ")
+
+    def test_closing_brace_else_split(self):
+        """Test that '} else {' is split into two logical lines."""
+        lines = tokenize("} else {")
+        assert [values(line) for line in lines] == [["}"], ["else", "{"]]
+
+    def test_else_inside_string_not_split(self):
+        """Test that '} else {' inside a string is left alone."""
+        (line,) = tokenize('x = "} else {";')
+        assert values(line) == ["x", "=", '"} else {"', ";"]
+
+    def test_render_preserves_spacing(self):
+        """Test that rendering tokens reproduces the source text."""
+        (line,) = tokenize('   result.put("key",  value);   // comment')
+        assert render(line) == 'result.put("key",  value);'
@@ -0,0 +1,212 @@
+"""Test the Java-style regex support behind the Deluge string functions."""
+
+import re
+import traceback
+
+import pytest
+
+from deluge_compat import run_deluge_script
+from deluge_compat.functions import replaceAll
+from deluge_compat.regex import RegexCache, java_replacement, java_to_python_regex
+from deluge_compat.types import DelugeString, deluge_string
+
+
+class TestJavaToPythonRegex:
+    """Test translating Java pattern syntax."""
+
+    @pytest.mark.parametrize(
+        "java, python",
+        [
+            (r"\d+-\w*", r"\d+-\w*"),
+            (r"(?<year>\d{4})-\k<year>", r"(?P<year>\d{4})-(?P=year)"),
+            (r"(?<=a)b(?<!c)", r"(?<=a)b(?<!c)"),
+            (r"\p{Alpha}+\P{Digit}", r"[a-zA-Z]+[^0-9]"),
+            (r"[\p{Upper}_]+", r"[A-Z_]+"),
+            (r"\p{IsPunct}", r"[!-/:-@\[-`{-~]"),
+            (r"\Qa.b*\E+", r"a\.b\*+"),
+            (r"[a-c[x-z]]", r"[a-cx-z]"),
+            (r"\z|\Z", r"\Z|(?=\n?\Z)"),
+            (r"\x{41}\0101\e", r"\U00000041\x41\x1b"),
+            (r"[]a]", r"[\]a]"),
+            (r"\(?\d+\)?", r"\(?\d+\)?"),
+            (r"a+?b*?", r"a+?b*?"),
+        ],
+    )
+    def test_translation(self, java, python):
+        """Test constructs whose spelling differs between the dialects."""
+        assert java_to_python_regex(java) == python
+
+    def test_possessive_quantifiers(self):
+        """Test that possessive quantifiers still compile and match."""
+        pattern = re.compile(java_to_python_regex(r"a*+b|x{2}+"))
+        assert pattern.fullmatch("aaab")
+        assert pattern.fullmatch("xx")
+
+    @pytest.mark.parametrize("java", [r"\x{zz}", r"\x{}"])
+    def test_invalid_hex_escape(self, java):
+        """Test that a malformed \\x{...} escape is a regex error."""
+        with pytest.raises(re.error, match="hexadecimal"):
+            java_to_python_regex(java)
+
+    @pytest.mark.parametrize("java", [r"[a-z&&[^aeiou]]", r"\Ga", r"[\P{Digit}]"])
+    def test_unsupported(self, java):
+        """Test that constructs without a Python equivalent are rejected."""
+        with pytest.raises(re.error, match="unsupported"):
+            java_to_python_regex(java)
+
+
+class TestJavaReplacement:
+    """Test translating Java replacement strings."""
+
+    @pytest.mark.parametrize(
+        "java, python",
+        [
+            ("plain", "plain"),
+            ("$1-$2", r"\g<1>-\g<2>"),
+            ("${last}, ${first}", r"\g<last>, \g<first>"),
+            (r"\$5", "$5"),
+            (r"a\\b", r"a\\b"),
+            (r"\"", '"'),
+        ],
+    )
+    def test_translation(self, java, python):
+        """Test group references and escapes."""
+        assert java_replacement(java) == python
+
+    @pytest.mark.parametrize("java", ["$", "cost $x", "trailing\\"])
+    def test_invalid(self, java):
+        """Test replacements Java rejects."""
+        with pytest.raises(ValueError):
+            java_replacement(java)
+
+
+class TestRegexStringFunctions:
+    """Test matches, replaceAll and replaceFirst."""
+
+    def test_matches_whole_string(self):
+        """Test that matches requires the entire string to match, as in Java."""
+        s = deluge_string("hello123")
+        assert s.matches(r"hello\d+") is True
+        assert s.matches(r"hello") is False
+        assert s.matches(r".*\d.*") is True
+        assert deluge_string("say hello123").matches(r"hello\d+") is False
+
+    def test_matches_is_ascii_by_default(self):
+        """Test that \\w and \\d only match ASCII, as in Java."""
+        assert deluge_string("abc_1").matches(r"\w+")
+        assert not deluge_string("héllo").matches(r"\w+")
+        assert deluge_string("héllo").matches(r"\p{L}+")
+
+    def test_replace_all_regex(self):
+        """Test regex patterns and group references in replaceAll."""
+        assert deluge_string("+1 (555) 010-9999").replaceAll("[^0-9]", "") == "15550109999"
+        date = deluge_string("2024-01-15").replaceAll(r"(\d{4})-(\d\d)-(\d\d)", "$3/$2/$1")
+        assert date == "15/01/2024"
+        name = deluge_string("Ada Lovelace").replaceAll(
+            r"(?<first>\w+) (?<last>\w+)", "${last}, ${first}"
+        )
+        assert name == "Lovelace, Ada"
+        assert isinstance(date, DelugeString)
+
+    def test_replace_first_regex(self):
+        """Test that replaceFirst replaces only the first match."""
+        assert deluge_string("a1b2c3").replaceFirst(r"\d", "#") == "a#b2c3"
+        assert deluge_string("a.b.c").replaceFirst(r"\.", "-") == "a-b.c"
+
+    def test_dot_is_a_metacharacter(self):
+        """Test that an unescaped dot matches any character."""
+        assert deluge_string("a.b").replaceAll(".", "-") == "---"
+        assert deluge_string("a.b").replaceAll("\\.", "-") == "a-b"
+
+    def test_invalid_pattern_replaced_literally(self):
+        """Test that patterns that do not compile are replaced as plain text."""
+        assert deluge_string("f(x)").replaceAll("(", "[") == "f[x)"
+        assert deluge_string("a\\b\\c").replaceFirst("\\", "/") == "a/b\\c"
+
+    def test_invalid_hex_escape_replaced_literally(self):
+        """Test that a malformed hex escape falls back to plain-text replacement."""
+        assert deluge_string("a\\x{zz}b").replaceAll("\\x{zz}", "-") == "a-b"
+        with pytest.raises(re.error):
+            deluge_string("x").matches("\\x{zz}")
+
+    def test_invalid_pattern_in_matches(self):
+        """Test that matches reports invalid patterns."""
+        with pytest.raises(re.error):
+            deluge_string("x").matches("(")
+
+    def test_replace_all_function(self):
+        """Test the replaceAll builtin."""
+        assert replaceAll("a1b22", r"\d+", "#") == "a#b#"
+
+    def test_in_script(self):
+        """Test the regex functions from a Deluge script."""
+        result = run_deluge_script("""
+phone = "+1 (555) 010-9999";
+digits = phone.replaceAll("[^0-9]", "");
+result = Map();
+result.put("digits", digits);
+result.put("valid", digits.matches("[0-9]{11}"));
+return result;
+""")
+        assert result == {"digits": "15550109999", "valid": True}
+
+
+class TestRegexCache:
+    """Test the compiled pattern cache."""
+
+    def test_hits_and_misses(self):
+        """Test that a pattern is compiled once."""
+        cache = RegexCache(maxsize=4)
+        first = cache.compile(r"\d+")
+        assert cache.compile(r"\d+") is first
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["size"] == 1
+        assert stats["maxsize"] == 4
+        assert stats["hit_rate"] == 0.5
+
+    def test_bounded(self):
+        """Test that the least recently used patterns are evicted."""
+        cache = RegexCache(maxsize=2)
+        cache.compile("a")
+        cache.compile("b")
+        cache.compile("a")
+        cache.compile("c")
+        assert len(cache) == 2
+        cache.compile("a")
+        assert cache.stats()["hits"] == 2
+
+    def test_invalid_pattern_cached(self):
+        """Test that compile errors are cached and raised every time."""
+        cache = RegexCache()
+        for _ in range(2):
+            with pytest.raises(re.error):
+                cache.compile("(")
+        assert cache.stats()["misses"] == 1
+
+    def test_invalid_pattern_error_does_not_grow(self):
+        """Test that each failure raises a new error with a short traceback."""
+        cache = RegexCache()
+        errors = []
+        for _ in range(5):
+            with pytest.raises(re.error) as info:
+                cache.compile("(")
+            errors.append(info.value)
+
+        assert len({id(error) for error in errors}) == 5
+        depths = {len(traceback.extract_tb(error.__traceback__)) for error in errors}
+        assert len(depths) == 1
+        assert str(errors[-1]) == "missing ), unterminated subpattern at position 0"
+
+    def test_clear(self):
+        """Test dropping entries and counters."""
+        cache = RegexCache()
+        cache.compile("a")
+        cache.clear()
+        assert cache.stats() == {"hits": 0, "misses": 0, "size": 0, "maxsize": 512, "hit_rate": 0.0}
+
+    def test_negative_maxsize(self):
+        """Test that a negative size is rejected."""
+        with pytest.raises(ValueError):
+            RegexCache(maxsize=-1)
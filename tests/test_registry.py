@@ -0,0 +1,336 @@
+"""Test the hot-reloading and multi-tenant script registries."""
+
+import http.client
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import pytest
+
+from deluge_compat.cache import CompiledScriptCache, DiskCodeCache
+from deluge_compat.registry import ScriptRegistry, TenantScriptRegistry
+from deluge_compat.runtime import DelugeRuntime, DelugeRuntimeError
+from deluge_compat.server import ScriptServer
+
+
+def write(path, text: str) -> None:
+    """Write a script and move its modification time forward."""
+    previous = path.stat().st_mtime_ns if path.exists() else 0
+    path.write_text(text, encoding="utf-8")
+    mtime = max(path.stat().st_mtime_ns, previous + 1_000_000)
+    os.utime(path, ns=(mtime, mtime))
+
+
+class TestScriptRegistry:
+    """Test reloading changed script files."""
+
+    @pytest.fixture
+    def runtime(self):
+        return DelugeRuntime(cache=CompiledScriptCache(), disk_cache=False)
+
+    @pytest.fixture
+    def script_file(self, tmp_path):
+        path = tmp_path / "greet.dg"
+        write(path, 'return "v1";')
+        return path
+
+    @pytest.fixture
+    def registry(self, runtime, script_file):
+        registry = ScriptRegistry(runtime)
+        registry.add(script_file)
+        return registry
+
+    def test_add_and_run(self, registry):
+        """Test that scripts are served under their file stem."""
+        assert list(registry) == ["greet"]
+        assert "greet" in registry
+        assert registry.run("greet") == "v1"
+        assert registry.version("greet") == 1
+        assert registry.check() == []
+
+    def test_reload_changed_file(self, registry, script_file):
+        """Test that a changed file is recompiled and swapped in."""
+        old = registry["greet"]
+        write(script_file, 'return "v2";')
+
+        assert registry.check() == []
+        assert registry.check() == ["greet"]
+        assert registry["greet"] is not old
+        assert registry.run("greet") == "v2"
+        assert registry.version("greet") == 2
+        assert registry.reloads == 1
+        assert old.run() == "v1"
+
+    def test_touched_file_is_not_reloaded(self, registry, script_file):
+        """Test that a new modification time alone does not swap the script."""
+        old = registry["greet"]
+        write(script_file, 'return "v1";')
+
+        assert registry.check() == []
+        assert registry.check() == []
+        assert registry["greet"] is old
+        assert registry.version("greet") == 1
+
+    def test_failed_compile_keeps_previous_version(self, runtime, script_file):
+        """Test that a broken new version is rejected and reported."""
+        events = []
+        registry = ScriptRegistry(runtime, on_reload=lambda name, error: events.append(error))
+        registry.add(script_file)
+
+        write(script_file, "this is not deluge")
+        assert registry.check() == []
+        assert registry.check() == []
+        assert registry.run("greet") == "v1"
+        error = registry.error("greet")
+        assert error is not None
+        assert "Error compiling Deluge script" in error
+        assert registry.failures == 1
+        assert isinstance(events[0], DelugeRuntimeError)
+
+        write(script_file, 'return "fixed";')
+        registry.check()
+        assert registry.check() == ["greet"]
+        assert registry.run("greet") == "fixed"
+        assert registry.error("greet") is None
+        assert events[1] is None
+
+    def test_file_caught_mid_write(self, registry, script_file):
+        """Test that a file still being written is not served."""
+        full = 'greeting = "hello";\nreturn greeting + " world";'
+        # Cut off at a statement boundary, the partial file compiles
+        write(script_file, full.split("\n")[0])
+        assert registry.check() == []
+        write(script_file, full)
+        assert registry.check() == []
+        assert registry.run("greet") == "v1"
+
+        assert registry.check() == ["greet"]
+        assert registry.run("greet") == "hello world"
+        assert registry.version("greet") == 2
+
+    def test_deleted_file_keeps_previous_version(self, registry, script_file):
+        """Test that a script keeps being served after its file is removed."""
+        script_file.unlink()
+        assert registry.check() == []
+        assert registry.run("greet") == "v1"
+        assert "greet.dg" in registry.error("greet")
+        registry.check()
+        assert registry.failures == 1
+
+    def test_in_flight_run_finishes_on_old_code(self, runtime, tmp_path):
+        """Test that a reload does not disturb executions already running."""
+        release = threading.Event()
+        started = threading.Event()
+
+        def wait():
+            started.set()
+            release.wait(10)
+
+        runtime.update_context({"wait": wait})
+        path = tmp_path / "slow.dg"
+        write(path, 'wait();\nreturn "old";')
+        registry = ScriptRegistry(runtime)
+        registry.add(path)
+
+        results = []
+        thread = threading.Thread(target=lambda: results.append(registry.run("slow")))
+        thread.start()
+        assert started.wait(5)
+
+        write(path, 'return "new";')
+        registry.check()
+        assert registry.check() == ["slow"]
+        assert registry.run("slow") == "new"
+
+        release.set()
+        thread.join()
+        assert results == ["old"]
+
+    def test_watcher_thread(self, runtime, script_file):
+        """Test that the watcher thread picks up changes on its own."""
+        with ScriptRegistry(runtime, poll_interval=0.02) as registry:
+            registry.add(script_file)
+            write(script_file, 'return "v2";')
+            deadline = time.monotonic() + 5
+            while registry.version("greet") == 1 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert registry.run("greet") == "v2"
+
+    def test_duplicate_names(self, registry, tmp_path):
+        """Test that two files can't share a name."""
+        other = tmp_path / "other"
+        other.mkdir()
+        write(other / "greet.dg", "return 1;")
+        with pytest.raises(ValueError, match="Duplicate"):
+            registry.add(other / "greet.dg")
+
+    def test_served_by_script_server(self, registry, script_file):
+        """Test that the webhook server serves the reloaded version."""
+        with ScriptServer(registry, port=0, workers=2) as server:
+            connection = http.client.HTTPConnection(urlparse(server.url).netloc, timeout=10)
+
+            def post():
+                connection.request("POST", "/greet", b"{}")
+                response = connection.getresponse()
+                return json.loads(response.read())
+
+            assert post() == "v1"
+            write(script_file, 'return "v2";')
+            registry.check()
+            registry.check()
+            assert post() == "v2"
+            assert "deluge_serve_reloads_total 1" in server.render_metrics()
+
+
+def tenant_script(n: int) -> str:
+    """A small script whose result identifies it."""
+    return f'greeting = "tenant {n} says hello";\nreturn greeting + " to " + name;'
+
+
+class TestTenantScriptRegistry:
+    """Test the memory-bounded registry of scripts by id and version."""
+
+    @pytest.fixture
+    def entry_size(self):
+        """Estimated size of one tenant script."""
+        registry = TenantScriptRegistry()
+        registry.add("probe", "1", tenant_script(0))
+        return registry.stats()["resident_bytes"]
+
+    def test_add_and_get(self):
+        """Test that resident scripts are served from memory."""
+        registry = TenantScriptRegistry()
+        registry.add("acme", "1", tenant_script(1))
+        assert registry.run("acme", "1", name="Ada") == "tenant 1 says hello to Ada"
+        assert registry.get("acme", "1") is registry.get("acme", "1")
+        assert ("acme", "1") in registry
+        stats = registry.stats()
+        assert stats["hits"] == 3
+        assert stats["misses"] == 0
+        assert stats["compiles"] == 1
+        assert stats["hit_rate"] == 1.0
+        assert stats["resident_bytes"] == sum(registry.sizes().values()) > 0
+
+    def test_versions_are_separate(self):
+        """Test that each version of a script is its own entry."""
+        registry = TenantScriptRegistry()
+        registry.add("acme", "1", 'return "v1";')
+        registry.add("acme", "2", 'return "v2";')
+        assert registry.run("acme", "1") == "v1"
+        assert registry.run("acme", "2") == "v2"
+        assert len(registry) == 2
+
+    def test_lru_eviction_by_bytes(self, entry_size):
+        """Test that the least recently used scripts are evicted to fit the budget."""
+        registry = TenantScriptRegistry(max_bytes=entry_size * 3 + entry_size // 2)
+        for n in range(3):
+            registry.add(f"t{n}", "1", tenant_script(n))
+        registry.get("t0", "1")
+        registry.add("t3", "1", tenant_script(3))
+
+        assert list(registry.sizes()) == [("t2", "1"), ("t0", "1"), ("t3", "1")]
+        assert registry.stats()["evictions"] == 1
+        assert registry.stats()["resident_bytes"] <= registry.max_bytes
+
+    def test_evicted_script_is_recompiled(self, entry_size):
+        """Test that an evicted script comes back from its kept source."""
+        registry = TenantScriptRegistry(max_bytes=entry_size)
+        registry.add("t0", "1", tenant_script(0))
+        registry.add("t1", "1", tenant_script(1))
+        assert ("t0", "1") not in registry
+
+        assert registry.run("t0", "1", name="Bo") == "tenant 0 says hello to Bo"
+        stats = registry.stats()
+        assert stats["misses"] == 1
+        assert stats["compiles"] == 3
+        assert stats["known"] == 2
+
+    def test_single_script_over_budget_is_kept(self):
+        """Test that a script larger than the budget stays while it is alone."""
+        registry = TenantScriptRegistry(max_bytes=1)
+        registry.add("big", "1", tenant_script(0))
+        assert ("big", "1") in registry
+        registry.add("next", "1", tenant_script(1))
+        assert list(registry.sizes()) == [("next", "1")]
+
+    def test_loader(self, entry_size):
+        """Test fetching sources on demand from a loader."""
+        calls = []
+
+        def loader(script_id, version):
+            calls.append((script_id, version))
+            return tenant_script(int(script_id[1:]))
+
+        registry = TenantScriptRegistry(loader, max_bytes=entry_size)
+        assert registry.run("t5", "1", name="Cy") == "tenant 5 says hello to Cy"
+        registry.get("t5", "1")
+        registry.get("t6", "1")
+        registry.get("t5", "1")
+        assert calls == [("t5", "1"), ("t6", "1"), ("t5", "1")]
+
+    def test_unknown_script(self):
+        """Test that unknown scripts raise KeyError without a loader."""
+        with pytest.raises(KeyError):
+            TenantScriptRegistry().get("nobody", "1")
+
+    def test_spill_to_disk_cache(self, tmp_path, entry_size, monkeypatch):
+        """Test that evicted scripts are written to disk and loaded back untranslated."""
+        disk_cache = DiskCodeCache(tmp_path / "cache")
+        registry = TenantScriptRegistry(max_bytes=entry_size, disk_cache=disk_cache)
+        registry.add("t0", "1", tenant_script(0))
+        registry.add("t1", "1", tenant_script(1))
+        assert len(list((tmp_path / "cache").glob("*.dgc"))) == 1
+
+        def fail_translate(code):
+            raise AssertionError("evicted script should be loaded from disk")
+
+        monkeypatch.setattr(registry.runtime.translator, "translate_script", fail_translate)
+        assert registry.run("t0", "1", name="Di") == "tenant 0 says hello to Di"
+        stats = registry.stats()
+        assert stats["disk_loads"] == 1
+        assert stats["compiles"] == 2
+
+        # t1 is spilled in turn; t0 is already on disk and is not written again
+        registry.get("t1", "1")
+        assert len(list((tmp_path / "cache").glob("*.dgc"))) == 2
+
+    def test_same_source_keeps_each_name(self, tmp_path, entry_size):
+        """Test that tenants sharing a script see their own name in tracebacks."""
+        disk_cache = DiskCodeCache(tmp_path / "cache")
+        registry = TenantScriptRegistry(max_bytes=entry_size, disk_cache=disk_cache)
+        registry.add("acme", "1", tenant_script(0))
+        registry.add("globex", "3", tenant_script(0))
+        registry.add("other", "1", tenant_script(1))
+
+        assert registry.get("acme", "1").code.co_filename == "<acme@1>"
+        assert registry.get("globex", "3").code.co_filename == "<globex@3>"
+        assert registry.stats()["disk_loads"] == 2
+
+    def test_remove(self):
+        """Test forgetting a script version."""
+        registry = TenantScriptRegistry()
+        registry.add("acme", "1", tenant_script(1))
+        registry.remove("acme", "1")
+        assert len(registry) == 0
+        assert registry.stats()["resident_bytes"] == 0
+        with pytest.raises(KeyError):
+            registry.get("acme", "1")
+
+    def test_concurrent_gets(self, entry_size):
+        """Test many threads fetching scripts while they are evicted."""
+        registry = TenantScriptRegistry(
+            lambda script_id, version: tenant_script(int(script_id)), max_bytes=entry_size * 4
+        )
+
+        def run(n):
+            return registry.run(str(n % 12), "1", name="Ed")
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(run, range(300)))
+        assert results == [f"tenant {n % 12} says hello to Ed" for n in range(300)]
+        stats = registry.stats()
+        assert stats["size"] <= 4
+        assert stats["resident_bytes"] == sum(registry.sizes().values())
@@ -1,8 +1,19 @@
 """Test Deluge runtime environment."""
 
+import asyncio
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
-from deluge_compat.runtime import DelugeRuntime, DelugeRuntimeError, run_deluge_script
+from deluge_compat.cache import CompiledScriptCache
+from deluge_compat.runtime import (
+    SCRIPT_BUILTINS,
+    DelugeRuntime,
+    DelugeRuntimeError,
+    run_deluge_script,
+)
 from deluge_compat.types import List, Map
 
 
@@ -305,3 +316,304 @@ class TestRuntimeErrorCases:
 
         with pytest.raises(DelugeRuntimeError):
             run_deluge_script(script)
+
+    @pytest.mark.parametrize("script", ['return ";', 'x = ";\nreturn x;'])
+    def test_unterminated_string(self, script):
+        """Test that a lone quote is a syntax error, not an empty string."""
+        runtime = DelugeRuntime(cache=CompiledScriptCache(), disk_cache=False)
+        with pytest.raises(DelugeRuntimeError) as excinfo:
+            runtime.execute(script)
+        assert isinstance(excinfo.value.__cause__, SyntaxError)
+
+    def test_dangling_else(self):
+        """Test that an else without an if is rejected."""
+        with pytest.raises(DelugeRuntimeError):
+            run_deluge_script("x = 1;\nelse {\n}")
+
+
+class TestRuntimeLineNumbers:
+    """Test that errors point into the Deluge script."""
+
+    def setup_method(self):
+        """Set up runtime for each test."""
+        self.runtime = DelugeRuntime(cache=CompiledScriptCache(), disk_cache=False)
+
+    def test_traceback_points_at_deluge_line(self, tmp_path):
+        """Test that a failing statement is reported at its script line."""
+        script_file = tmp_path / "script.dg"
+        script_file.write_text(
+            "x = 1;\n// comment\nif(x == 1) {\n    y = missing_var + 1;\n}\nreturn y;\n",
+            encoding="utf-8",
+        )
+
+        with pytest.raises(DelugeRuntimeError) as excinfo:
+            self.runtime.execute_file(str(script_file))
+
+        error = excinfo.value
+        while isinstance(error, DelugeRuntimeError):
+            error = error.__cause__
+        assert isinstance(error, NameError)
+        frame = traceback.extract_tb(error.__traceback__)[-1]
+        assert frame.filename == str(script_file)
+        assert frame.lineno == 4
+        assert frame.line == "y = missing_var + 1;"
+
+    def test_first_line(self):
+        """Test that an error on the first line is reported at line 1."""
+        with pytest.raises(DelugeRuntimeError) as excinfo:
+            self.runtime.execute("y = missing_var;")
+        error = excinfo.value.__cause__
+        assert error is not None
+        assert traceback.extract_tb(error.__traceback__)[-1].lineno == 1
+
+    def test_syntax_errors_report_deluge_line(self):
+        """Test that invalid expressions are reported at their Deluge line."""
+        with pytest.raises(DelugeRuntimeError) as excinfo:
+            self.runtime.compile("a = 1;\n\nb = (2;", filename="script.dg")
+        error = excinfo.value.__cause__
+        assert isinstance(error, SyntaxError)
+        assert error.filename == "script.dg"
+        assert error.lineno == 3
+
+
+class TestCompiledScript:
+    """Test compiling a script once and running it many times."""
+
+    def setup_method(self):
+        """Set up runtime for each test."""
+        self.runtime = DelugeRuntime(cache=CompiledScriptCache(), disk_cache=False)
+
+    def test_run_with_different_contexts(self):
+        """Test that each run sees only its own context variables."""
+        script = self.runtime.compile('return "Hello " + name;')
+
+        assert script.run(name="Alice") == "Hello Alice"
+        assert script.run(name="Bob") == "Hello Bob"
+
+    def test_run_does_not_leak_variables(self):
+        """Test that variables from one run don't reach the next."""
+        script = self.runtime.compile(
+            """
+            if(extra != null) {
+                return extra;
+            }
+            return "none";
+            """
+        )
+
+        assert script.run(extra="first") == "first"
+        assert script.run(extra=None) == "none"
+        with pytest.raises(DelugeRuntimeError):
+            script.run()
+
+    def test_run_uses_runtime_context(self):
+        """Test that runs see the runtime context, including later updates."""
+        script = self.runtime.compile("return greeting;")
+
+        self.runtime.update_context({"greeting": "hi"})
+        assert script.run() == "hi"
+        assert script.run(greeting="hello") == "hello"
+        assert self.runtime.context["greeting"] == "hi"
+
+    def test_compile_translates_once(self, monkeypatch):
+        """Test that running a compiled script never translates again."""
+        script = self.runtime.compile("x = List();\nx.add(n);\nreturn x.size();")
+
+        def fail_translate(code):
+            raise AssertionError("compiled script should not be translated again")
+
+        monkeypatch.setattr(self.runtime.translator, "translate_script", fail_translate)
+        assert [script.run(n=i) for i in range(3)] == [1, 1, 1]
+
+    def test_compile_file(self, tmp_path):
+        """Test compiling a script file for repeated execution."""
+        script_file = tmp_path / "double.dg"
+        script_file.write_text("return n * 2;", encoding="utf-8")
+        script = self.runtime.compile_file(str(script_file))
+        assert [script.run(n=n) for n in range(3)] == [0, 2, 4]
+        assert script.code.co_filename == str(script_file)
+
+        with pytest.raises(DelugeRuntimeError, match="not found"):
+            self.runtime.compile_file(str(tmp_path / "missing.dg"))
+
+    def test_compile_error(self):
+        """Test that invalid scripts fail at compile time."""
+        with pytest.raises(DelugeRuntimeError, match="Error compiling Deluge script"):
+            self.runtime.compile("this is not deluge")
+
+    def test_runtime_error(self):
+        """Test that errors raised while running are wrapped."""
+        script = self.runtime.compile("return missing_var;")
+        with pytest.raises(DelugeRuntimeError, match="missing_var"):
+            script.run()
+
+
+class TestLayeredGlobals:
+    """Test the shared builtins, runtime and per-run layers of script globals."""
+
+    def setup_method(self):
+        """Set up a runtime with a private cache for each test."""
+        self.runtime = DelugeRuntime(cache=CompiledScriptCache(), disk_cache=False)
+
+    def test_builtins_are_shared(self):
+        """Test that runtimes share one read-only builtins layer."""
+        other = DelugeRuntime(disk_cache=False)
+        assert self.runtime.context.maps[1] is other.context.maps[1] is SCRIPT_BUILTINS
+        assert "Map" not in self.runtime.context.maps[0]
+        with pytest.raises(TypeError):
+            SCRIPT_BUILTINS["Map"] = dict  # type: ignore[index]
+
+    def test_runtime_context_shadows_builtins(self):
+        """Test that runtime variables take precedence over builtins per runtime."""
+        other = DelugeRuntime(disk_cache=False)
+        self.runtime.update_context({"info": lambda *args: "shadowed"})
+        assert self.runtime.execute('return info("x");') == "shadowed"
+        assert other.execute("x = Map();\nreturn x.size();") == 0
+        assert SCRIPT_BUILTINS["info"] is not self.runtime.context["info"]
+
+    def test_run_variables_are_isolated(self):
+        """Test that run variables shadow the runtime layer without modifying it."""
+        self.runtime.update_context({"greeting": "hi"})
+        script = self.runtime.compile("return greeting;")
+        assert script.run(greeting="hello") == "hello"
+        assert script.run() == "hi"
+        assert self.runtime.context["greeting"] == "hi"
+
+    def test_script_variables_do_not_leak(self):
+        """Test that assignments in a run are not visible to later runs."""
+        self.runtime.update_context({"total": 1})
+        script = self.runtime.compile("total = 5;\nreturn total;")
+        assert script.run() == 5
+        assert self.runtime.execute("return total;") == 1
+        assert self.runtime.context["total"] == 1
+
+
+class TestThreadSafety:
+    """Test sharing one runtime between threads."""
+
+    def setup_method(self):
+        """Set up a runtime with a private cache for each test."""
+        self.runtime = DelugeRuntime(cache=CompiledScriptCache(), disk_cache=False)
+
+    def test_execute_variables_are_per_call(self):
+        """Test that variables passed to execute only apply to that call."""
+        assert self.runtime.execute("return n * 2;", n=21) == 42
+        assert "n" not in self.runtime.context
+
+    def test_execute_file_variables_are_per_call(self, tmp_path):
+        """Test that variables passed to execute_file only apply to that call."""
+        script_file = tmp_path / "greet.dg"
+        script_file.write_text('return "hi " + name;')
+        assert self.runtime.execute_file(str(script_file), name="Ada") == "hi Ada"
+        assert "name" not in self.runtime.context
+
+    def test_concurrent_compile_and_execute(self):
+        """Test many threads translating and running scripts on one runtime."""
+        scripts = [
+            f"""
+            result = List();
+            for each item in items {{
+                if(item % {n + 2} == 0) {{
+                    result.add(item + n);
+                }}
+            }}
+            return result;
+            """
+            for n in range(40)
+        ]
+
+        def run(index):
+            n = index % len(scripts)
+            return self.runtime.execute(scripts[n], items=list(range(30)), n=n)
+
+        expected = [
+            [item + n for item in range(30) if item % (n + 2) == 0] for n in range(len(scripts))
+        ]
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(run, range(400)))
+        assert results == [expected[index % len(scripts)] for index in range(400)]
+        assert len(self.runtime.cache) == len(scripts)
+
+    def test_concurrent_runs_of_compiled_script(self):
+        """Test that threads running one compiled script keep their own variables."""
+        script = self.runtime.compile(
+            """
+            total = 0;
+            for each item in items {
+                total = total + item;
+            }
+            result = Map();
+            result.put(name, total);
+            return result;
+            """
+        )
+
+        def run(n):
+            return script.run(name=f"worker{n}", items=list(range(n)))
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(run, range(200)))
+        assert results == [{f"worker{n}": sum(range(n))} for n in range(200)]
+
+
+class TestExecuteAsync:
+    """Test asyncio execution of Deluge scripts."""
+
+    def setup_method(self):
+        """Set up a runtime with a private cache for each test."""
+        self.runtime = DelugeRuntime(cache=CompiledScriptCache(), disk_cache=False)
+
+    def test_execute_async_returns_result(self):
+        """Test that execute_async returns the script result."""
+        result = asyncio.run(self.runtime.execute_async("return n * 2;", n=21))
+        assert result == 42
+
+    def test_context_is_per_execution(self):
+        """Test that concurrent executions keep their own variables."""
+
+        async def run_all():
+            return await asyncio.gather(
+                *(self.runtime.execute_async("return n;", n=i) for i in range(20))
+            )
+
+        assert asyncio.run(run_all()) == list(range(20))
+        assert "n" not in self.runtime.context
+
+    def test_errors_are_wrapped(self):
+        """Test that compile and runtime errors surface as DelugeRuntimeError."""
+        with pytest.raises(DelugeRuntimeError, match="Error executing Deluge script"):
+            asyncio.run(self.runtime.execute_async("this is not deluge"))
+        with pytest.raises(DelugeRuntimeError, match="missing_var"):
+            asyncio.run(self.runtime.execute_async("return missing_var;"))
+
+    def test_compiled_script_run_async(self):
+        """Test running a compiled script from a coroutine."""
+        script = self.runtime.compile('return "hi " + name;')
+        assert asyncio.run(script.run_async(name="Ada")) == "hi Ada"
+
+    def test_http_does_not_block_event_loop(self, stub_server):
+        """Test that slow HTTP calls in many scripts overlap with the loop."""
+        script = 'return getUrl(base + "/slow?delay=0.3");'
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        async def run_all():
+            tick_task = asyncio.create_task(ticker())
+            results = await asyncio.gather(
+                *(self.runtime.execute_async(script, base=stub_server.url) for _ in range(20))
+            )
+            tick_task.cancel()
+            return results
+
+        start = time.perf_counter()
+        results = asyncio.run(run_all())
+        elapsed = time.perf_counter() - start
+
+        assert all("/slow" in str(result) for result in results)
+        assert elapsed < 1.5
+        assert ticks >= 10
@@ -0,0 +1,238 @@
+"""Test the SalesIQ webhook server behind deluge-serve."""
+
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlparse
+
+import pytest
+
+from deluge_compat.cache import CompiledScriptCache
+from deluge_compat.runtime import DelugeRuntime
+from deluge_compat.server import ScriptServer, load_scripts, webhook_context
+
+GREETER = """
+response = Map();
+name = visitor.getJSON("name");
+text = message.get("text");
+if(text.contains("agent")) {
+    response.put("action", "forward");
+} else {
+    response.put("action", "reply");
+}
+replies = List();
+replies.add("Hi " + name + ", you said " + text);
+response.put("replies", replies);
+response.put("handler", payload.get("handler"));
+return response;
+"""
+
+BLOCKING = """
+wait();
+return "done";
+"""
+
+
+def connect(server: ScriptServer) -> http.client.HTTPConnection:
+    return http.client.HTTPConnection(urlparse(server.url).netloc, timeout=10)
+
+
+def post(connection: http.client.HTTPConnection, path: str, payload) -> tuple[int, dict]:
+    body = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+    connection.request("POST", path, body, {"Content-Type": "application/json"})
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+class TestWebhookContext:
+    """Test building script variables from a webhook payload."""
+
+    def test_visitor_and_message(self):
+        """Test that payload objects become Visitor and Message objects."""
+        context = webhook_context(
+            {
+                "handler": "message",
+                "visitor": {"name": "Ada", "email": "ada@example.com"},
+                "message": {"text": "hello", "type": "text"},
+            }
+        )
+        assert context["visitor"].getJSON("name") == "Ada"
+        assert context["visitor"].getJSON("channel") == "Website"
+        assert context["message"].get("text") == "hello"
+        assert context["message"].get("type") == "text"
+        assert context["payload"].get("handler") == "message"
+
+    def test_plain_message_and_missing_visitor(self):
+        """Test a message given as a string and a payload without a visitor."""
+        context = webhook_context({"message": "hi"})
+        assert context["message"].getText() == "hi"
+        assert context["visitor"].getJSON("name") == ""
+
+
+class TestScriptServer:
+    """Test serving scripts over HTTP."""
+
+    @pytest.fixture
+    def runtime(self):
+        return DelugeRuntime(cache=CompiledScriptCache(), disk_cache=False)
+
+    @pytest.fixture
+    def server(self, runtime):
+        scripts = {"greeter": runtime.compile(GREETER)}
+        with ScriptServer(scripts, port=0, workers=4) as server:
+            yield server
+
+    def test_webhook(self, server):
+        """Test that a webhook payload runs the script and returns its result."""
+        connection = connect(server)
+        status, result = post(
+            connection,
+            "/greeter",
+            {"handler": "message", "visitor": {"name": "Ada"}, "message": {"text": "hello"}},
+        )
+        assert status == 200
+        assert result == {
+            "action": "reply",
+            "replies": ["Hi Ada, you said hello"],
+            "handler": "message",
+        }
+
+    def test_keep_alive(self, server):
+        """Test that several requests share one connection."""
+        connection = connect(server)
+        post(connection, "/greeter", {"message": {"text": "one"}})
+        sock = connection.sock
+        assert sock is not None
+        for text in ["two", "talk to an agent"]:
+            status, result = post(connection, "/greeter", {"message": {"text": text}})
+            assert status == 200
+            assert connection.sock is sock
+        assert result["action"] == "forward"
+
+    def test_errors(self, server):
+        """Test the status codes of requests that can't run the script."""
+        connection = connect(server)
+        assert post(connection, "/missing", {})[0] == 404
+        assert post(connection, "/greeter", b"{not json")[0] == 400
+        assert post(connection, "/greeter", [1, 2])[0] == 400
+
+        connection.request("GET", "/greeter")
+        response = connection.getresponse()
+        response.read()
+        assert response.status == 405
+        assert response.getheader("Allow") == "POST"
+
+    def test_script_error(self, runtime):
+        """Test that a failing script is answered with 500."""
+        scripts = {"broken": runtime.compile("return missing_var;")}
+        with ScriptServer(scripts, port=0, workers=2) as server:
+            status, result = post(connect(server), "/broken", {})
+        assert status == 500
+        assert "missing_var" in result["error"]
+        assert server.metrics.requests("broken", 500) == 1
+
+    def test_body_too_large(self, runtime):
+        """Test that oversized bodies are refused and the connection closed."""
+        scripts = {"greeter": runtime.compile(GREETER)}
+        with ScriptServer(scripts, port=0, workers=2, max_body_size=64) as server:
+            connection = connect(server)
+            status, _ = post(connection, "/greeter", {"message": {"text": "x" * 100}})
+        assert status == 413
+
+    def test_concurrent_requests(self, server):
+        """Test many clients posting at once."""
+        results: dict[int, tuple[int, dict]] = {}
+
+        def client(n):
+            results[n] = post(connect(server), "/greeter", {"message": {"text": f"m{n}"}})
+
+        threads = [threading.Thread(target=client, args=(n,)) for n in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert all(status == 200 for status, _ in results.values())
+        assert {result["replies"][0] for _, result in results.values()} == {
+            f"Hi , you said m{n}" for n in range(20)
+        }
+
+    def test_concurrency_limit(self, runtime):
+        """Test that requests over the limit are refused with 503."""
+        release = threading.Event()
+        runtime.update_context({"wait": lambda: release.wait(10)})
+        scripts = {"slow": runtime.compile(BLOCKING)}
+
+        with ScriptServer(scripts, port=0, workers=4, max_concurrency=1) as server:
+            first: list[tuple[int, dict]] = []
+            thread = threading.Thread(
+                target=lambda: first.append(post(connect(server), "/slow", {}))
+            )
+            thread.start()
+            deadline = time.monotonic() + 5
+            while server.metrics.in_flight == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            connection = connect(server)
+            connection.request("POST", "/slow", b"{}")
+            response = connection.getresponse()
+            response.read()
+            assert response.status == 503
+            assert response.getheader("Retry-After") == "1"
+
+            release.set()
+            thread.join()
+            assert first == [(200, "done")]
+            metrics = server.render_metrics()
+
+        assert 'deluge_serve_requests_total{script="slow",status="200"} 1' in metrics
+        assert 'deluge_serve_requests_total{script="slow",status="503"} 1' in metrics
+        assert "deluge_serve_rejected_total 1" in metrics
+        assert "deluge_serve_max_concurrency 1" in metrics
+
+    def test_shutdown_closes_idle_connections(self, runtime):
+        """Test that idle keep-alive connections don't hold up shutdown."""
+        scripts = {"greeter": runtime.compile(GREETER)}
+        server = ScriptServer(scripts, port=0, workers=2, keep_alive_timeout=30)
+        server.start()
+        connection = connect(server)
+        assert post(connection, "/greeter", {})[0] == 200
+
+        start = time.monotonic()
+        server.shutdown()
+        assert time.monotonic() - start < 5
+        with pytest.raises((http.client.HTTPException, OSError)):
+            post(connection, "/greeter", {})
+
+    def test_metrics_endpoint(self, server):
+        """Test the Prometheus metrics endpoint."""
+        connection = connect(server)
+        post(connection, "/greeter", {"message": {"text": "hello"}})
+        connection.request("GET", "/metrics")
+        response = connection.getresponse()
+        body = response.read().decode("utf-8")
+        assert response.status == 200
+        assert response.getheader("Content-Type", "").startswith("text/plain")
+        assert 'deluge_serve_requests_total{script="greeter",status="200"} 1' in body
+        assert 'deluge_serve_request_duration_seconds_count{script="greeter"} 1' in body
+        assert "deluge_serve_in_flight 0" in body
+
+
+class TestLoadScripts:
+    """Test compiling script files for serving."""
+
+    def test_named_after_files(self, tmp_path):
+        """Test that scripts are named after their file stem."""
+        (tmp_path / "hello.dg").write_text('return "hello";')
+        (tmp_path / "bye.dg").write_text('return "bye";')
+        scripts = load_scripts([tmp_path / "hello.dg", tmp_path / "bye.dg"])
+        assert sorted(scripts) == ["bye", "hello"]
+        assert scripts["hello"].run() == "hello"
+
+    def test_duplicate_names(self, tmp_path):
+        """Test that two files with the same name are rejected."""
+        (tmp_path / "a").mkdir()
+        (tmp_path / "a" / "bot.dg").write_text("return 1;")
+        (tmp_path / "bot.dg").write_text("return 2;")
+        with pytest.raises(ValueError, match="Duplicate"):
+            load_scripts([tmp_path / "bot.dg", tmp_path / "a" / "bot.dg"])
@@ -1,5 +1,7 @@
 """Test Deluge to Python translator."""
 
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
 from deluge_compat.translator import DelugeTranslator, _invokeurl
@@ -181,16 +183,16 @@ class TestInvokeUrl:
 
         class MockRequests:
             @staticmethod
-            def get(url, headers=None):
+            def get(url, headers=None, timeout=None):
                 return MockResponse(f"GET {url}")
 
             @staticmethod
-            def post(url, json=None, headers=None):
+            def post(url, json=None, headers=None, timeout=None):
                 return MockResponse(f"POST {url}")
 
-        # Patch the requests module in the _invokeurl function
-        monkeypatch.setattr("requests.get", MockRequests.get)
-        monkeypatch.setattr("requests.post", MockRequests.post)
+        # Patch the shared session used by _invokeurl
+        monkeypatch.setattr("requests.Session.get", staticmethod(MockRequests.get))
+        monkeypatch.setattr("requests.Session.post", staticmethod(MockRequests.post))
         return MockRequests
 
     def test_invokeurl_get(self, mock_requests):
@@ -217,3 +219,217 @@ class TestInvokeUrl:
 
         result = _invokeurl(params)
         assert "GET https://api.example.com" in str(result)
+
+
+class TestTranslatorTokenHandling:
+    """Test translation cases that depend on proper tokenization."""
+
+    def setup_method(self):
+        """Set up translator for each test."""
+        self.translator = DelugeTranslator()
+
+    def test_multi_line_block_comment(self):
+        """Test that every line of a block comment is skipped."""
+        deluge_code = """
+        /*
+           this line would not translate
+        */
+        x = 1;
+        """
+        assert self.translator.translate(deluge_code) == "x = 1"
+
+    def test_else_if_with_method_call(self):
+        """Test '} else if(...)' where the condition contains parentheses."""
+        deluge_code = """
+        if(a > 1) {
+            x = 1;
+        } else if(text.length() > 3) {
+            x = 2;
+        } else {
+            x = 3;
+        }
+        """
+        python_code = self.translator.translate(deluge_code)
+        assert "elif text.length() > 3:" in python_code
+        assert "else:" in python_code
+
+    def test_while_loop(self):
+        """Test while loop condition extraction."""
+        python_code = self.translator.translate("while(count < 10) {\ncount = count + 1;\n}")
+        assert python_code.startswith("while count < 10:")
+
+    def test_string_contents_untouched(self):
+        """Test that strings containing quotes or keywords are kept intact."""
+        deluge_code = """
+        a = "it's 'quoted'";
+        if(a == "is true && more") {
+            b = 1;
+        }
+        """
+        python_code = self.translator.translate(deluge_code)
+        assert "a = deluge_string(\"it's 'quoted'\")" in python_code
+        assert 'if a == "is true && more":' in python_code
+
+    def test_null_checks_and_logical_operators(self):
+        """Test null comparison and logical operator translation."""
+        python_code = self.translator.translate("if(a==null&&b != NULL) {\n}")
+        assert python_code == "if a is None and b is not None:"
+
+    def test_return_prefixed_identifier(self):
+        """Test that identifiers starting with 'return' are not return statements."""
+        python_code = self.translator.translate("returnValue = 5;")
+        assert python_code == "returnValue = 5"
+
+
+class TestTranslatorThreadSafety:
+    """Test sharing one translator between threads."""
+
+    def test_translator_is_unchanged_by_translate(self):
+        """Test that translating leaves no state on the translator."""
+        translator = DelugeTranslator()
+        translator.translate("if(x) {\nfor each item in items {\ny = 1;")
+        assert translator.indent_level == 0
+        assert translator.brace_stack == []
+        assert translator.translate("x = 1;") == "x = 1"
+
+    def test_concurrent_translations(self):
+        """Test that concurrent translations match serial ones."""
+        translator = DelugeTranslator()
+        scripts = [
+            f"""
+            total = 0;
+            for each item in items {{
+                if(item > {n}) {{
+                    total = total + item;
+                }} else {{
+                    info "skip {n}";
+                }}
+            }}
+            return total;
+            """
+            for n in range(50)
+        ]
+        expected = [DelugeTranslator().translate(script) for script in scripts]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for _ in range(4):
+                assert list(pool.map(translator.translate, scripts)) == expected
+
+
+SCRIPTS = [
+    'name = "John";\nreturn name;',
+    'response = Map();\nresponse.put("k", list());\nreturn response;',
+    'if(a == null || b != NULL && c == true) {\n    info "yes", a;\n}',
+    "if(a > 1) {\nx = 1;\n} else if(text.length() > 3) {\nx = 2;\n} else {\nx = 3;\n}",
+    'for each item in items {\n    total += item.get("n");\n}\nreturn total;',
+    "while(i < 10 && (j > 2 || k)) {\ni = i + 1;\n}",
+    'resp = invokeurl [\n    url: "https://example.com"\n    type: POST\n    headers: h\n];',
+    'sendmail [\n    from: zoho.adminuserid\n    to: "a@b.com"\n    subject: "Hi"\n]',
+    "return;",
+]
+
+
+class TestTranslateScript:
+    """Test the module source the runtime compiles."""
+
+    def setup_method(self):
+        """Set up translator for each test."""
+        self.translator = DelugeTranslator()
+
+    def source_lines(self, deluge_code):
+        return self.translator.translate_script(deluge_code).split("\n")
+
+    @pytest.mark.parametrize("deluge_code", SCRIPTS)
+    def test_module_compiles(self, deluge_code):
+        """Test that translated scripts compile to a function and its call."""
+        lines = self.source_lines(deluge_code)
+        compile("\n".join(lines), "<test>", "exec")
+        assert lines[0] == "def _deluge_script():"
+        assert lines[-1] == "_result = _deluge_script()"
+
+    def test_statements_follow_deluge_lines(self):
+        """Test that each statement sits one line below its Deluge line."""
+        lines = self.source_lines(
+            "a = 1;\n// comment\n/* block\n   comment */\nif(a == 1) {\n    b = 2;\n}\n"
+        )
+        assert lines[1] == "    a = 1"
+        assert lines[5] == "    if a == 1:"
+        assert lines[6] == "        b = 2"
+
+    def test_invokeurl_parameters_keep_their_lines(self):
+        """Test that multi-line invokeurl parameters stay on their own lines."""
+        lines = self.source_lines('resp = invokeurl [\n    url: "u"\n    type: GET\n];')
+        assert lines[2].strip() == '"url": "u",'
+        assert lines[3].strip() == '"type": "GET",'
+
+    def test_empty_blocks_get_a_body(self):
+        """Test that empty Deluge blocks compile."""
+        source = self.translator.translate_script("if(x) {\n} else {\n}\nfor each i in items {\n}")
+        compile(source, "<test>", "exec")
+
+    def test_empty_script(self):
+        """Test that a script with only comments compiles."""
+        assert self.source_lines("// nothing here")[1] == "    pass"
+
+
+class TestInvokeurlGrouping:
+    """Test merging of independent invokeurl blocks."""
+
+    def setup_method(self):
+        """Set up translator for each test."""
+        self.translator = DelugeTranslator()
+
+    def statements(self, deluge_code):
+        source = self.translator.translate_script(deluge_code)
+        return [line.strip() for line in source.split("\n") if "=" in line]
+
+    def test_independent_calls_are_grouped(self):
+        """Test that consecutive independent calls become one _invokeurl_all."""
+        deluge_code = (
+            'a = invokeurl [\n url: "x/a"\n];\nb = invokeurl [\n url: base + id\n];\nreturn b;'
+        )
+        source = self.translator.translate_script(deluge_code)
+        namespace = {"_invokeurl_all": lambda params: [p["url"] for p in params]}
+        exec(source, {"base": "x/", "id": "b", **namespace}, namespace)
+        assert namespace["_result"] == "x/b"
+        assert "a, b = _invokeurl_all([{" in source
+        assert "_invokeurl(" not in source
+
+    def test_dependent_calls_stay_sequential(self):
+        """Test that a call using an earlier result starts a new run."""
+        statements = self.statements(
+            'a = invokeurl [\n url: "x"\n];\nb = invokeurl [\n url: a.get("next")\n];'
+        )
+        assert statements[:2] == ["a = _invokeurl({", "b = _invokeurl({"]
+
+    def test_attribute_names_are_not_dependencies(self):
+        """Test that an attribute named like an earlier target is not a use of it."""
+        statements = self.statements(
+            'a = invokeurl [\n url: "x"\n];\nb = invokeurl [\n url: zoho.a\n];'
+        )
+        assert statements[0] == "a, b = _invokeurl_all([{"
+
+    def test_other_statements_break_runs(self):
+        """Test that only adjacent calls are grouped, also inside blocks."""
+        statements = self.statements(
+            "if(x) {\n"
+            'a = invokeurl [\n url: "a"\n];\n'
+            'info "between";\n'
+            'b = invokeurl [\n url: "b"\n];\n'
+            'c = invokeurl [\n url: "c"\n];\n'
+            "}"
+        )
+        assert statements[:2] == ["a = _invokeurl({", "b, c = _invokeurl_all([{"]
+
+    def test_blocks_at_different_depths_not_grouped(self):
+        """Test that a call inside a block is not grouped with one after it."""
+        statements = self.statements(
+            'if(x) {\na = invokeurl [\n url: "a"\n];\n}\nb = invokeurl [\n url: "b"\n];'
+        )
+        assert statements[:2] == ["a = _invokeurl({", "b = _invokeurl({"]
+
+    def test_repeated_target_not_grouped(self):
+        """Test that assigning the same variable twice keeps both calls."""
+        statements = self.statements(
+            'a = invokeurl [\n url: "1"\n];\na = invokeurl [\n url: "2"\n];'
+        )
+        assert statements[:2] == ["a = _invokeurl({", "a = _invokeurl({"]
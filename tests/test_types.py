@@ -1,10 +1,11 @@
 """Test Deluge data types."""
 
+import json
 from datetime import datetime
 
 import pytest
 
-from deluge_compat.types import DelugeString, List, Map, deluge_string
+from deluge_compat.types import DelugeString, LazyList, LazyMap, List, Map, deluge_string
 
 
 class TestMap:
@@ -94,6 +95,59 @@ class TestMap:
         assert m1.get("c") == 3
 
 
+class TestMapNormalization:
+    """Test that Map stores string values as DelugeStrings."""
+
+    def test_values_wrapped_on_write(self):
+        """Test every way of storing a value."""
+        m = Map({"a": "1"}, b="2")
+        m.put("c", "3")
+        m["d"] = "4"
+        m.putAll({"e": "5"})
+        m.update([("f", "6")], g="7")
+        m.setdefault("h", "8")
+        m |= {"i": "9"}
+
+        assert m == {k: str(n) for n, k in enumerate("abcdefghi", 1)}
+        assert all(type(value) is DelugeString for value in dict.values(m))
+
+    def test_get_is_a_plain_lookup(self):
+        """Test that get returns the stored object itself."""
+        m = Map({"name": "Ada", "count": 3})
+        assert m.get("name") is m.get("name")
+        assert m.get("name") is dict.__getitem__(m, "name")
+        assert m.get("count") == 3
+        assert m.get("missing") is None
+
+    def test_get_wraps_string_default(self):
+        """Test that a string default comes back as a DelugeString."""
+        m = Map({"name": "Ada"})
+        assert type(m.get("missing", "none")) is DelugeString
+        assert m.get("missing", "none").length() == 4
+        assert m.get("missing", 0) == 0
+        assert type(m.get("name", "none")) is DelugeString
+        lazy = deluge_string('{"a": 1}').toMap(lazy=True)
+        assert type(lazy.get("missing", "none")) is DelugeString
+
+    def test_keys_are_not_wrapped(self):
+        """Test that only values are converted."""
+        m = Map({"key": "value"})
+        assert type(next(iter(dict.keys(m)))) is str
+
+    def test_json_values_are_wrapped(self):
+        """Test that parsed JSON maps hold DelugeStrings at every level."""
+        m = deluge_string('{"a": "x", "b": {"c": ["y"]}}').toMap()
+        assert type(dict.__getitem__(m, "a")) is DelugeString
+        nested = dict.__getitem__(m, "b")
+        assert isinstance(nested, Map)
+        assert type(list.__getitem__(dict.__getitem__(nested, "c"), 0)) is DelugeString
+
+    def test_update_rejects_extra_arguments(self):
+        """Test that update keeps dict's signature."""
+        with pytest.raises(TypeError):
+            Map().update({}, {})
+
+
 class TestList:
     """Test Deluge List type."""
 
@@ -219,6 +273,79 @@ class TestList:
         assert list.indexOf("c") == -1
         assert list.lastindexOf("c") == -1
 
+    def test_strings_wrapped_on_write(self):
+        """Test that every way of storing a string stores a DelugeString."""
+        items = List(["a"])
+        items.add("b")
+        items.append("c")
+        items.addAll(["d"])
+        items.extend(["e"])
+        items.insert(0, "f")
+        items += ["g"]
+        items[0] = "h"
+        items[1:2] = ["i", "j"]
+
+        assert items == ["h", "i", "j", "b", "c", "d", "e", "g"]
+        assert all(type(item) is DelugeString for item in items)
+        assert type(list.__getitem__(items, 0)) is DelugeString
+
+    def test_iteration_is_native(self):
+        """Test that iterating yields the stored objects without copying."""
+        items = List(["a", 1, None])
+        assert type(iter(items)) is type(iter([]))
+        assert next(iter(items)) is list.__getitem__(items, 0)
+
+
+class TestListSetOperations:
+    """Test removeAll, intersect and distinct."""
+
+    def test_distinct_keeps_first_occurrences_in_order(self):
+        """Test that distinct preserves the order of first occurrences."""
+        assert List(["b", "a", "b", "c", "a"]).distinct() == ["b", "a", "c"]
+
+    def test_distinct_with_unhashable_members(self):
+        """Test that nested Maps and Lists are deduplicated by content."""
+        items = List([Map({"id": 1, "tags": ["x"]}), Map({"tags": ["x"], "id": 1}), [1, 2], [1, 2]])
+        items.add(Map({"id": 2}))
+
+        result = items.distinct()
+        assert result == [{"id": 1, "tags": ["x"]}, [1, 2], {"id": 2}]
+        assert result[0] is list.__getitem__(items, 0)
+
+    def test_remove_all(self):
+        """Test that every occurrence of every listed element is removed."""
+        items = List(["a", "b", "a", "c", 1, Map({"k": "v"})])
+        items.removeAll(List(["a", 1, Map({"k": "v"}), "missing"]))
+        assert items == ["b", "c"]
+
+    def test_remove_all_empty(self):
+        """Test that removing nothing keeps the list unchanged."""
+        items = List([1, 2])
+        items.removeAll(List())
+        assert items == [1, 2]
+
+    def test_intersect_keeps_order_and_duplicates(self):
+        """Test that intersect follows this list's order."""
+        left = List([3, 1, 2, 3, Map({"a": 1})])
+        right = List([Map({"a": 1}), 3, 2])
+        assert left.intersect(right) == [3, 2, 3, {"a": 1}]
+
+    def test_unhashable_fingerprint_is_not_a_string(self):
+        """Test that a Map never matches a string equal to its JSON."""
+        items = List([Map({"a": 1}), '{"a": 1}'])
+        assert items.distinct().size() == 2
+        items.removeAll(List(['{"a": 1}']))
+        assert items == [{"a": 1}]
+
+    def test_large_lists(self):
+        """Test that set operations on large lists run in linear time."""
+        contacts = List(f"user{n}@example.com" for n in range(50_000))
+        others = List(f"user{n}@example.com" for n in range(25_000, 75_000))
+
+        assert contacts.intersect(others).size() == 25_000
+        contacts.removeAll(others)
+        assert contacts.size() == 25_000
+
 
 class TestDelugeString:
     """Test Deluge String type."""
@@ -420,3 +547,255 @@ class TestDelugeString:
 
         assert s.matches(r"hello\d+") is True
         assert s.matches(r"world\d+") is False
+
+
+class TestJsonDecoding:
+    """Test decoding JSON straight into Deluge types."""
+
+    def test_nested_types(self):
+        """Test that every level is built as Map, List and DelugeString."""
+        m = deluge_string('{"a": [["x", {"b": "y"}], 1.5, null, true], "c": {"d": []}}').toMap()
+
+        outer = dict.__getitem__(m, "a")
+        inner = list.__getitem__(outer, 0)
+        assert type(outer) is List and type(inner) is List
+        assert type(list.__getitem__(inner, 0)) is DelugeString
+        assert type(list.__getitem__(inner, 1)) is Map
+        assert type(dict.__getitem__(list.__getitem__(inner, 1), "b")) is DelugeString
+        assert outer[1:] == [1.5, None, True]
+        assert type(m.get("c").get("d")) is List
+
+    def test_json_list_of_lists(self):
+        """Test that top-level arrays convert nested arrays too."""
+        items = deluge_string('[["a"], "b"]').toJSONList()
+        assert type(items) is List
+        assert type(list.__getitem__(items, 0)) is List
+        assert type(list.__getitem__(list.__getitem__(items, 0), 0)) is DelugeString
+
+    def test_duplicate_keys_keep_last(self):
+        """Test that duplicate keys behave like json.loads."""
+        assert deluge_string('{"a": 1, "a": 2}').toMap() == {"a": 2}
+
+    def test_wrong_top_level_type(self):
+        """Test that toMap and toJSONList check the document type."""
+        with pytest.raises(ValueError, match="JSON object"):
+            deluge_string("[1]").toMap()
+        with pytest.raises(ValueError, match="JSON array"):
+            deluge_string('{"a": 1}').toJSONList()
+
+    def test_invalid_json(self):
+        """Test that malformed documents raise ValueError."""
+        with pytest.raises(ValueError, match="Invalid JSON"):
+            deluge_string('{"a": ').toMap()
+
+
+LAZY_DOCUMENT = (
+    '{"data": [{"id": "1", "owner": {"name": "Ada"}, "tags": ["a", "b"]}, {"id": "2"}],'
+    ' "info": {"count": 2, "more": false}, "status": "ok"}'
+)
+
+
+class TestLazyJson:
+    """Test lazily converted JSON maps and lists."""
+
+    def test_behaves_like_eager_map(self):
+        """Test get, keys, size, iteration, equality and concatenation."""
+        lazy = deluge_string(LAZY_DOCUMENT).toMap(lazy=True)
+        eager = deluge_string(LAZY_DOCUMENT).toMap()
+
+        assert isinstance(lazy, LazyMap) and isinstance(lazy, Map)
+        assert lazy == eager
+        assert lazy.size() == eager.size() == 3
+        assert lazy.keys() == eager.keys()
+        assert list(lazy) == list(eager)
+        assert lazy.get("status") == "ok" and type(lazy.get("status")) is DelugeString
+        assert lazy.get("missing", 5) == 5
+        assert lazy.get("data").get(0).get("owner").get("name") == "Ada"
+        assert lazy + "" == eager + ""
+        assert dict(lazy.items()) == dict(eager.items())
+
+    def test_only_read_paths_are_converted(self):
+        """Test that untouched subtrees stay plain decoded values."""
+        lazy = deluge_string(LAZY_DOCUMENT).toMap(lazy=True)
+        assert type(dict.__getitem__(lazy, "data")) is list
+
+        records = lazy.get("data")
+        assert type(records) is LazyList
+        assert type(dict.__getitem__(lazy, "data")) is LazyList
+        first = records.get(0)
+        assert type(first) is LazyMap
+        assert type(list.__getitem__(records, 1)) is dict
+        assert type(dict.__getitem__(first, "owner")) is dict
+        assert type(dict.__getitem__(lazy, "info")) is dict
+
+    def test_values_convert_everything(self):
+        """Test that reading all values converts the remaining ones."""
+        lazy = deluge_string(LAZY_DOCUMENT).toMap(lazy=True)
+        assert [type(value) for value in lazy.values()] == [LazyList, LazyMap, DelugeString]
+        assert lazy.containValue("ok")
+
+    def test_lazy_list(self):
+        """Test indexing, iteration, slicing and Deluge list methods."""
+        items = deluge_string('[{"a": 1}, "x", [1, 2], "x"]').toJSONList(lazy=True)
+
+        assert type(items) is LazyList
+        assert items.size() == 4
+        assert type(items[1]) is DelugeString
+        assert [type(item) for item in items] == [LazyMap, DelugeString, LazyList, DelugeString]
+        assert items[1:3] == ["x", [1, 2]]
+        assert items.distinct() == [{"a": 1}, "x", [1, 2]]
+        assert items.indexOf("x") == 1
+        assert items.pop() == "x"
+
+    def test_mutations_are_kept(self):
+        """Test that changes to converted children show up when serializing."""
+        lazy = deluge_string(LAZY_DOCUMENT).toMap(lazy=True)
+        lazy.get("info").put("count", 3)
+        lazy.get("data").add(Map({"id": "3"}))
+        lazy.put("status", "changed")
+
+        reparsed = deluge_string(lazy + "").toMap()
+        assert reparsed.get("info").get("count") == 3
+        assert reparsed.get("data").size() == 3
+        assert reparsed.get("status") == "changed"
+
+    def test_setdefault_and_popitem_convert(self):
+        """Test that values read through setdefault and popitem are converted."""
+        lazy = deluge_string(LAZY_DOCUMENT).toMap(lazy=True)
+        data = lazy.setdefault("data", None)
+        assert type(data) is LazyList
+        assert data is lazy.get("data")
+        assert lazy.setdefault("extra", "x") == "x"
+        assert type(lazy.get("extra")) is DelugeString
+
+        lazy.pop("extra")
+        key, value = lazy.popitem()
+        assert key == "status"
+        assert type(value) is DelugeString
+        key, value = lazy.popitem()
+        assert key == "info"
+        assert type(value) is LazyMap
+
+    def test_copied_into_map(self):
+        """Test that Map(), putAll and update convert a lazy map's values."""
+        by_constructor = Map(deluge_string(LAZY_DOCUMENT).toMap(lazy=True))
+        by_put_all = Map()
+        by_put_all.putAll(deluge_string(LAZY_DOCUMENT).toMap(lazy=True))
+        by_update = Map({"extra": 1})
+        by_update.update(deluge_string(LAZY_DOCUMENT).toMap(lazy=True))
+
+        for target in (by_constructor, by_put_all, by_update):
+            assert target.get("data").size() == 2
+            assert target.get("data").get(0).get("tags").size() == 2
+            assert target.get("info").get("count") == 2
+            assert type(target.get("status")) is DelugeString
+
+    def test_pickle_round_trip(self):
+        """Test that lazy maps survive being sent to worker processes."""
+        import pickle
+
+        lazy = deluge_string(LAZY_DOCUMENT).toMap(lazy=True)
+        restored = pickle.loads(pickle.dumps(lazy))
+        assert type(restored) is LazyMap
+        assert restored == lazy
+        assert restored.get("data").get(0).get("id") == "1"
+
+
+class TestMapJsonCache:
+    """Test the cached JSON text used for Map + string concatenation."""
+
+    def build(self) -> tuple[Map, List, Map]:
+        owner = Map({"name": "Ada"})
+        tags = List(["vip", owner])
+        body = Map({"status": "open", "tags": tags})
+        return body, tags, owner
+
+    def test_unchanged_map_reuses_text(self):
+        """Test that repeated concatenations serialize once."""
+        body, _, _ = self.build()
+        first = body + ""
+        assert body + "" == first
+        assert body._json_cache is not None
+        text = body._json_cache[0]
+        assert body + "x" == text + "x"
+        assert "x" + body == "x" + text
+        assert body._json_cache is not None
+        assert body._json_cache[0] is text
+
+    @pytest.mark.parametrize(
+        "mutate",
+        [
+            lambda body, tags, owner: body.put("status", "closed"),
+            lambda body, tags, owner: body.__setitem__("page", 2),
+            lambda body, tags, owner: body.update({"page": 2}),
+            lambda body, tags, owner: body.pop("status"),
+            lambda body, tags, owner: body.popitem(),
+            lambda body, tags, owner: body.__delitem__("status"),
+            lambda body, tags, owner: body.clear(),
+            lambda body, tags, owner: tags.add("new"),
+            lambda body, tags, owner: tags.insert(0, "new"),
+            lambda body, tags, owner: tags.extend(["new"]),
+            lambda body, tags, owner: tags.pop(),
+            lambda body, tags, owner: tags.remove("vip"),
+            lambda body, tags, owner: tags.removeAll(List(["vip"])),
+            lambda body, tags, owner: tags.__setitem__(0, "other"),
+            lambda body, tags, owner: tags.__delitem__(0),
+            lambda body, tags, owner: tags.reverse(),
+            lambda body, tags, owner: tags.clear(),
+            lambda body, tags, owner: owner.put("name", "Grace"),
+            lambda body, tags, owner: owner.clear(),
+        ],
+    )
+    def test_mutation_invalidates(self, mutate):
+        """Test that mutating the map or anything nested in it is seen."""
+        body, tags, owner = self.build()
+        for _ in range(3):
+            _ = body + ""
+        mutate(body, tags, owner)
+        assert body + "" == json.dumps(body)
+        assert body + "" == json.dumps(body)
+
+    def test_nested_map_with_its_own_cache(self):
+        """Test a nested map that is also concatenated on its own."""
+        body, _, owner = self.build()
+        for _ in range(3):
+            _ = body + ""
+            _ = owner + ""
+        owner.put("name", "Grace")
+        assert owner + "" == '{"name": "Grace"}'
+        assert '"Grace"' in body + ""
+
+    def test_shared_list_in_two_maps(self):
+        """Test that a list nested in two maps invalidates both."""
+        tags = List(["a"])
+        first, second = Map({"tags": tags}), Map({"also": tags})
+        for _ in range(3):
+            _ = first + ""
+            _ = second + ""
+        tags.add("b")
+        assert first + "" == '{"tags": ["a", "b"]}'
+        assert second + "" == '{"also": ["a", "b"]}'
+
+    def test_plain_containers_are_never_cached(self):
+        """Test that plain dicts and lists, which cannot be tracked, are reserialized."""
+        settings = {"retries": 1}
+        body = Map()
+        body.put("settings", settings)
+        for _ in range(3):
+            _ = body + ""
+        settings["retries"] = 2
+        assert body + "" == '{"settings": {"retries": 2}}'
+
+    def test_lazy_map(self):
+        """Test concatenating a lazily converted map."""
+        lazy = deluge_string('{"a": {"b": [1, "x"]}, "c": "d"}').toMap(lazy=True)
+        for _ in range(3):
+            assert lazy + "" == '{"a": {"b": [1, "x"]}, "c": "d"}'
+        lazy.get("a").get("b").add(2)
+        assert lazy + "" == '{"a": {"b": [1, "x", 2]}, "c": "d"}'
+
+    def test_unserializable_value(self):
+        """Test that values JSON cannot represent still raise."""
+        body = Map({"when": datetime(2024, 1, 1)})
+        with pytest.raises(TypeError):
+            _ = body + ""